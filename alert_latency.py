@@ -0,0 +1,43 @@
+"""
+Tiempo hasta la alerta: desde la respuesta upstream que trae el cambio
+hasta la entrega confirmada por cada canal del notificador.
+Etapas (segundos desde la respuesta upstream):
+    detected   el monitor detecta la transición a plazas disponibles
+    enqueued   la alerta se entrega al notificador
+    <canal>    el canal confirma la entrega (telegram, email, whatsapp)
+"""
+
+import time
+
+STAGES = ('detected', 'enqueued')
+
+
+class AlertTrace:
+    def __init__(self, upstream_at=None):
+        """upstream_at: time.monotonic() de la respuesta upstream (ahora si no se conoce)"""
+        self.upstream_at = upstream_at if upstream_at is not None else time.monotonic()
+        self.marks = {}
+        self.deliveries = {}
+
+    def mark(self, stage):
+        self.marks[stage] = time.monotonic()
+
+    def delivered(self, channel):
+        """El canal confirmó la entrega (respuesta OK de la API o del servidor SMTP)"""
+        self.deliveries[channel] = time.monotonic()
+
+    def summary(self):
+        """{'stages': {etapa: s}, 'channels': {canal: s}, 'first_delivery': s o None}"""
+        channels = {channel: at - self.upstream_at for channel, at in self.deliveries.items()}
+        return {
+            'stages': {stage: self.marks[stage] - self.upstream_at for stage in STAGES if stage in self.marks},
+            'channels': channels,
+            'first_delivery': min(channels.values()) if channels else None
+        }
+
+
+def format_alert_latency(summary):
+    """'detectado 0.4s · telegram 1.1s · email 3.2s'"""
+    parts = [f"detectado {summary['stages']['detected']:.1f}s"] if 'detected' in summary['stages'] else []
+    parts += [f"{channel} {seconds:.1f}s" for channel, seconds in sorted(summary['channels'].items(), key=lambda item: item[1])]
+    return " · ".join(parts) or "sin entregas"
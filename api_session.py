@@ -0,0 +1,170 @@
+"""
+Sesión API compartida por los scrapers optimizado e híbrido
+Caché de sesión en disco, llamadas a las APIs de plazas y calendario
+y extracción de plazas de la respuesta
+"""
+
+import json
+import logging
+import time
+from config import TARGET_DATE, SITE_ORIGIN, RESERVA_URL, PLAZAS_API_URL, CALENDARIO_API_URL
+from session_bootstrap import is_error_response
+from response_fingerprint import ResponseTracker
+from phase_timer import timed
+
+
+class ApiSessionMixin:
+    """
+    Requiere en la instancia: session, csrf_token, session_cache, session_cached,
+    cookie_bridge, response_tracker, rejections, upstream_at y timer.
+    upstream_at guarda el time.monotonic() de la última respuesta de la API
+    (referencia del tiempo hasta la alerta).
+    Las llamadas a la API devuelven None si el sitio rechaza la petición o responde
+    con error; los fallos de transporte y las respuestas que no son JSON se propagan
+    para que la política de reintentos (retry_policy.classify_error) los clasifique
+    """
+
+    def restore_cached_session(self):
+        """Reutilizar una sesión cacheada en disco"""
+        csrf_token = self.session_cache.restore(SITE_ORIGIN, self.session)
+        if csrf_token:
+            self.csrf_token = csrf_token
+            self.session_cached = True
+            return True
+        return False
+
+    def remember_session(self):
+        """Guardar en disco la sesión actual si todavía no está cacheada"""
+        if not self.session_cached and self.csrf_token:
+            self.session_cache.store(SITE_ORIGIN, self.session, self.csrf_token)
+            self.session_cached = True
+
+    def invalidate_session(self):
+        """Descartar la sesión actual (en memoria y en disco)"""
+        self.session_cache.invalidate(SITE_ORIGIN)
+        self.session_cached = False
+
+    @timed('cookie_sync')
+    def copy_driver_cookies(self):
+        """Copiar cookies del navegador actual a la sesión de requests (solo si han cambiado)"""
+        self.cookie_bridge.browser_to_session()
+
+    def api_headers(self, **extra):
+        """Headers de las llamadas XHR a la API (con CSRF token si lo hay)"""
+        headers = {
+            'Content-Type': 'application/x-www-form-urlencoded; charset=UTF-8',
+            'Origin': SITE_ORIGIN,
+            'Referer': RESERVA_URL,
+            **extra
+        }
+        if self.csrf_token:
+            headers['X-CSRF-TOKEN'] = self.csrf_token
+        return headers
+
+    @timed('api_plazas')
+    def call_plazas_api(self, fecha=None, num_plazas='1', id_isla='1', id_tipo_cupo=''):
+        """Llamar a la API de plazas con la sesión establecida"""
+        if not fecha:
+            fecha = TARGET_DATE
+
+        # Datos del formulario
+        data = {
+            'fecha': fecha,
+            'numPlazas': str(num_plazas),
+            'idIsla': str(id_isla),  # 1 = Islas Cíes
+            'idTipoCupo': id_tipo_cupo
+        }
+
+        # Copiar cookies de Selenium a requests (solo si la sesión viene del navegador)
+        self.copy_driver_cookies()
+
+        logging.info(f"📡 Llamando a API de plazas para fecha: {fecha} (isla {id_isla}, {num_plazas} plazas)")
+
+        response = self.session.post(PLAZAS_API_URL, data=data, headers=self.api_headers())
+        self.upstream_at = time.monotonic()
+
+        # Una redirección a la página de aceptación invalida la sesión
+        if is_error_response(response):
+            self.rejections += 1
+            logging.error("Error en API: redirigido a página de aceptación")
+            self.invalidate_session()
+            return None
+
+        if response.status_code == 200:
+            try:
+                # Solo se parsea y registra la respuesta si cambió respecto a la anterior
+                result, changed = self.response_tracker.parse(
+                    ResponseTracker.make_key(PLAZAS_API_URL, data), response.content, json.loads
+                )
+                if changed:
+                    logging.info(f"✅ Respuesta API recibida: {result}")
+                self.remember_session()
+                return result
+            except json.JSONDecodeError:
+                logging.error(f"Error al decodificar JSON: {response.text}")
+                self.invalidate_session()
+                raise
+        else:
+            logging.error(f"Error en API: {response.status_code} - {response.text}")
+            self.invalidate_session()
+            return None
+
+    @timed('api_calendario')
+    def call_calendario_api(self, ano, mes, num_plazas='1', id_isla='1', id_tipo_cupo=''):
+        """Llamar a la API de calendario: estado de todos los días de un mes en una petición"""
+        data = {
+            'numPlazas': str(num_plazas),
+            'idIsla': str(id_isla),  # 1 = Islas Cíes
+            'idTipoCupo': id_tipo_cupo,
+            'ano': str(ano),
+            'mes': str(mes)
+        }
+
+        self.copy_driver_cookies()
+
+        logging.info(f"📡 Llamando a API de calendario para {mes:02d}/{ano} (isla {id_isla}, {num_plazas} plazas)")
+
+        response = self.session.post(CALENDARIO_API_URL, data=data,
+                                     headers=self.api_headers(Accept='text/plain, */*; q=0.01'))
+        self.upstream_at = time.monotonic()
+
+        if is_error_response(response):
+            self.rejections += 1
+            logging.error("Error en API de calendario: redirigido a página de aceptación")
+            self.invalidate_session()
+            return None
+
+        if response.status_code == 200:
+            try:
+                # La respuesta llega como text/plain pero contiene JSON (solo se parsea si cambió)
+                result, _ = self.response_tracker.parse(
+                    ResponseTracker.make_key(CALENDARIO_API_URL, data), response.content, json.loads
+                )
+                self.remember_session()
+                return result
+            except json.JSONDecodeError:
+                logging.error(f"Error al decodificar JSON de calendario: {response.text[:200]}")
+                self.invalidate_session()
+                raise
+        else:
+            logging.error(f"Error en API de calendario: {response.status_code} - {response.text[:200]}")
+            self.invalidate_session()
+            return None
+
+    def extract_slots(self, api_result, source):
+        """Extraer el número de plazas de la respuesta de la API (-1 si no es válida)"""
+        if not api_result:
+            return -1
+
+        if api_result.get('existenDatos'):
+            plazas_ocupadas = api_result.get('plazasOcupadas', '0')
+            try:
+                slots = int(plazas_ocupadas)
+                logging.info(f"✅ Plazas disponibles obtenidas via {source}: {slots}")
+                return slots
+            except ValueError:
+                logging.error(f"Error al convertir plazas: {plazas_ocupadas}")
+                return -1
+        else:
+            logging.warning("API indica que no existen datos")
+            return -1
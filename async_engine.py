@@ -0,0 +1,153 @@
+"""
+Motor asíncrono de consultas a la API
+Lanza en paralelo los barridos de calendario y las confirmaciones de plazas
+de una tanda, con un semáforo que limita las peticiones simultáneas.
+
+Las llamadas siguen siendo las del scraper (requests + cookies y CSRF compartidos);
+cada una corre en un hilo del ejecutor propio y asyncio aplica el límite de
+concurrencia, el plazo por petición y el plazo total de la tanda.
+"""
+
+import asyncio
+import functools
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from calendar_sweep import build_availability, days_to_confirm, log_availability, format_fecha
+from config import API_MAX_CONCURRENCY, API_REQUEST_DEADLINE, API_CYCLE_DEADLINE
+
+
+class AsyncQueryEngine:
+    def __init__(self, scraper, concurrency=API_MAX_CONCURRENCY,
+                 request_deadline=API_REQUEST_DEADLINE, cycle_deadline=API_CYCLE_DEADLINE):
+        """
+        scraper: objeto con ensure_api_session(), call_calendario_api(), call_plazas_api() y extract_slots()
+        concurrency: peticiones upstream simultáneas como máximo
+        request_deadline: segundos antes de abandonar una petición
+        cycle_deadline: segundos antes de cancelar lo que quede de la tanda
+        """
+        self.scraper = scraper
+        self.concurrency = max(1, concurrency)
+        self.request_deadline = request_deadline
+        self.cycle_deadline = cycle_deadline
+        self.executor = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix='cies-api')
+        self.semaphore = None
+        self.stats = {'requests': 0, 'timeouts': 0, 'cancelled': 0, 'max_in_flight': 0, 'unchanged_sweeps': 0}
+        self.in_flight = 0
+        # Último barrido por (consulta, año, mes): respuestas crudas y disponibilidad derivada
+        self.last_sweeps = {}
+        self.changed_days = {}
+        self.received_at = {}  # time.monotonic() de las últimas respuestas de cada barrido (tiempo hasta alerta)
+        self.errors = []  # excepciones de las peticiones de la última tanda (las clasifica la política de reintentos)
+
+    async def call(self, func, *args, **kwargs):
+        """
+        Ejecutar una llamada bloqueante del scraper respetando el semáforo y el plazo.
+        Si la llamada lanza una excepción se guarda en self.errors y se devuelve None.
+        """
+        async with self.semaphore:
+            self.stats['requests'] += 1
+            self.in_flight += 1
+            self.stats['max_in_flight'] = max(self.stats['max_in_flight'], self.in_flight)
+            loop = asyncio.get_running_loop()
+            future = loop.run_in_executor(self.executor, functools.partial(func, *args, **kwargs))
+            try:
+                return await asyncio.wait_for(future, self.request_deadline)
+            except asyncio.TimeoutError:
+                # El hilo termina por su cuenta (requests no se puede interrumpir); su resultado se descarta
+                self.stats['timeouts'] += 1
+                logging.warning(f"⏱️ Petición {func.__name__} abandonada tras {self.request_deadline}s")
+                return None
+            except Exception as e:
+                self.errors.append(e)
+                logging.error(f"Error en la petición {func.__name__}: {e}")
+                return None
+            finally:
+                self.in_flight -= 1
+
+    async def sweep(self, query, year, month, days=None):
+        """
+        Barrer un mes: una petición de calendario y, en paralelo, recuperarPlazasTotales
+        solo para los días reservables (days: fechas a confirmar, por defecto todas).
+        Si todas las respuestas son las mismas que en el barrido anterior (el scraper
+        devuelve el mismo objeto cuando la respuesta no cambió) se reutiliza la
+        disponibilidad anterior sin parsear ni registrar nada.
+        """
+        key = (query, year, month)
+        params = query.api_params() if query else {}
+        calendar = await self.call(self.scraper.call_calendario_api, year, month, **params)
+        if calendar is None:
+            self.changed_days.pop(key, None)
+            return None
+
+        previous = self.last_sweeps.get(key)
+        same_calendar = previous is not None and calendar is previous['calendar']
+        base = previous['base'] if same_calendar else build_availability(calendar)
+
+        pending = days_to_confirm(base, days)
+        api_results = await asyncio.gather(
+            *(self.call(self.scraper.call_plazas_api, format_fecha(day), **params) for day in pending)
+        )
+        plazas = dict(zip(pending, api_results))
+        self.received_at[key] = time.monotonic()
+
+        if same_calendar and plazas.keys() == previous['plazas'].keys() and all(
+                result is previous['plazas'][day] for day, result in plazas.items()):
+            self.stats['unchanged_sweeps'] += 1
+            self.changed_days[key] = set()
+            return previous['availability']
+
+        availability = {day: dict(info) for day, info in base.items()}
+        for day, api_result in plazas.items():
+            availability[day]['available_slots'] = self.scraper.extract_slots(api_result, f"API ({format_fecha(day)})")
+
+        old = previous['availability'] if previous else {}
+        self.changed_days[key] = {day for day, info in availability.items() if old.get(day) != info}
+        self.last_sweeps[key] = {'calendar': calendar, 'base': base, 'plazas': plazas, 'availability': availability}
+        log_availability(year, month, availability)
+        return availability
+
+    def day_changed(self, key, day):
+        """Indicar si el día cambió en el último barrido de esa consulta y mes"""
+        changed = self.changed_days.get(key)
+        return changed is None or day in changed
+
+    async def run_batch_async(self, batch):
+        """
+        Ejecutar una tanda [((consulta, año, mes), días), ...] en paralelo (días None = todo el mes).
+        Devuelve {(consulta, año, mes): availability}; los barridos fallidos,
+        caducados o cancelados no aparecen en el resultado.
+        """
+        self.semaphore = asyncio.Semaphore(self.concurrency)
+        tasks = {
+            asyncio.create_task(self.sweep(query, year, month, set(days) if days is not None else None)): (query, year, month)
+            for (query, year, month), days in batch
+        }
+
+        done, pending = await asyncio.wait(tasks, timeout=self.cycle_deadline)
+        for task in pending:
+            task.cancel()
+        if pending:
+            self.stats['cancelled'] += len(pending)
+            logging.warning(f"⏱️ Tanda cortada tras {self.cycle_deadline}s: {len(pending)} barridos cancelados")
+            await asyncio.gather(*pending, return_exceptions=True)
+
+        results = {}
+        for task in done:
+            if task.exception():
+                self.errors.append(task.exception())
+                logging.error(f"Error en barrido {tasks[task]}: {task.exception()}")
+            elif task.result() is not None:
+                results[tasks[task]] = task.result()
+        return results
+
+    def run_batch(self, batch):
+        """Punto de entrada síncrono: prepara la sesión una vez y ejecuta la tanda"""
+        self.errors = []
+        if not batch or not self.scraper.ensure_api_session():
+            return {}
+        return asyncio.run(self.run_batch_async(batch))
+
+    def close(self):
+        """Liberar los hilos del ejecutor sin esperar a peticiones abandonadas"""
+        self.executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,375 @@
+#!/usr/bin/env python3
+"""
+Benchmark de extremo a extremo de los tres scrapers contra el servidor de replay
+Para cada scraper (en un proceso aparte, para que el pico de memoria sea solo suyo):
+- Arranque en frío: crear el scraper y completar la primera verificación
+- Latencia por verificación p50/p95/p99 (verificaciones 2..N)
+- Pico de RSS de Python y de Chrome (suma de los procesos hijos)
+- Comandos WebDriver y peticiones upstream por verificación
+Los resultados se guardan en JSON y se comparan con una línea base guardada.
+
+Uso:
+    python benchmark.py --scrapers optimized,hybrid --iterations 20 --latency 0.05
+    python benchmark.py --save-baseline          # fijar la línea base actual
+Sale con código 1 si alguna métrica empeora más de --tolerance frente a la línea base.
+"""
+
+import argparse
+import importlib
+import json
+import logging
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+from urllib.request import urlopen
+
+from har_replay_server import ReplayState, start_replay_server, STATS_PATH
+from config import BENCHMARK_ITERATIONS, BENCHMARK_RESULTS_FILE, BENCHMARK_BASELINE_FILE, BENCHMARK_TOLERANCE
+
+# Nombre -> (módulo, clase, método de verificación)
+SCRAPERS = {
+    'classic': ('scraper', 'CiesScraper', 'check_availability'),
+    'optimized': ('scraper_optimized', 'OptimizedCiesScraper', 'check_availability_optimized'),
+    'hybrid': ('scraper_hybrid', 'HybridCiesScraper', 'check_availability_hybrid'),
+}
+
+# Métricas comparadas con la línea base (todas: más alto es peor)
+COMPARED_METRICS = (
+    'cold_start', 'p50', 'p95', 'p99', 'requests_per_check',
+    'webdriver_commands_per_check', 'python_peak_rss_mb', 'chrome_peak_rss_mb'
+)
+
+
+def percentile(values, p):
+    """Percentil p (0-100) con interpolación lineal"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * p / 100
+    low = int(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def python_peak_rss_mb():
+    """Pico de RSS de este proceso (ru_maxrss: KB en Linux, bytes en macOS)"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def children_rss_mb(pid=None):
+    """RSS actual de todos los descendientes del proceso (Chrome y chromedriver); None fuera de Linux"""
+    if not os.path.isdir('/proc'):
+        return None
+    pid = pid or os.getpid()
+
+    parents = {}
+    for entry in os.listdir('/proc'):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f'/proc/{entry}/stat') as f:
+                # El nombre va entre paréntesis y puede contener espacios
+                fields = f.read().rsplit(')', 1)[1].split()
+            parents.setdefault(int(fields[1]), []).append(int(entry))
+        except (OSError, IndexError):
+            continue
+
+    total_kb = 0
+    pending = list(parents.get(pid, []))
+    while pending:
+        child = pending.pop()
+        pending.extend(parents.get(child, []))
+        try:
+            with open(f'/proc/{child}/status') as f:
+                for line in f:
+                    if line.startswith('VmRSS:'):
+                        total_kb += int(line.split()[1])
+                        break
+        except OSError:
+            continue
+    return total_kb / 1024
+
+
+class ChildMemorySampler:
+    """Muestrea en segundo plano el RSS de los procesos hijos y guarda el pico"""
+
+    def __init__(self, interval=0.2):
+        self.interval = interval
+        self.peak_mb = 0.0
+        self.supported = children_rss_mb() is not None
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self.run, name='bench-rss', daemon=True)
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            self.sample()
+
+    def sample(self):
+        current = children_rss_mb()
+        if current is not None:
+            self.peak_mb = max(self.peak_mb, current)
+
+    def start(self):
+        if self.supported:
+            self.thread.start()
+
+    def stop(self):
+        self.stopped.set()
+        self.sample()
+        return self.peak_mb if self.supported else None
+
+
+class WebDriverCommandCounter:
+    """Cuenta los comandos enviados a chromedriver parcheando RemoteConnection.execute"""
+
+    def __init__(self):
+        self.count = 0
+        self.installed = False
+        try:
+            from selenium.webdriver.remote.remote_connection import RemoteConnection
+        except ImportError:
+            return
+
+        original = RemoteConnection.execute
+        counter = self
+
+        def execute(connection, command, params):
+            counter.count += 1
+            return original(connection, command, params)
+
+        RemoteConnection.execute = execute
+        self.installed = True
+
+
+def upstream_request_count(origin):
+    """Peticiones recibidas por el servidor de replay (las de estadísticas no cuentan)"""
+    with urlopen(f"{origin}{STATS_PATH}", timeout=5) as response:
+        return sum(json.load(response).values())
+
+
+def is_successful(result):
+    return bool(result) and not result.get('detection_error')
+
+
+def bench_scraper(factory, check, iterations, origin, close=None):
+    """
+    Ejecutar `iterations` verificaciones y medir. factory() crea el scraper,
+    check(scraper) hace una verificación y close(scraper) lo libera.
+    """
+    commands = WebDriverCommandCounter()
+    memory = ChildMemorySampler()
+    memory.start()
+
+    latencies = []
+    requests_per_check = []
+    commands_per_check = []
+    phase_totals = {}
+    errors = 0
+    cold_start = None
+
+    start = time.perf_counter()
+    scraper = factory()
+    construct_time = time.perf_counter() - start
+    try:
+        for iteration in range(iterations):
+            requests_before = upstream_request_count(origin)
+            commands_before = commands.count
+            check_start = time.perf_counter()
+
+            result = check(scraper)
+
+            elapsed = time.perf_counter() - check_start
+            requests_per_check.append(upstream_request_count(origin) - requests_before)
+            commands_per_check.append(commands.count - commands_before)
+            if not is_successful(result):
+                errors += 1
+            for phase, seconds in ((result or {}).get('timings') or {}).items():
+                phase_totals[phase] = phase_totals.get(phase, 0.0) + seconds
+
+            if iteration == 0:
+                cold_start = construct_time + elapsed
+            else:
+                latencies.append(elapsed)
+    finally:
+        if close:
+            close(scraper)
+
+    chrome_peak = memory.stop()
+    return {
+        'iterations': iterations,
+        'errors': errors,
+        'cold_start': cold_start,
+        'p50': percentile(latencies, 50),
+        'p95': percentile(latencies, 95),
+        'p99': percentile(latencies, 99),
+        'mean': sum(latencies) / len(latencies) if latencies else None,
+        'requests_per_check': sum(requests_per_check) / iterations,
+        'webdriver_commands_per_check': sum(commands_per_check) / iterations if commands.installed else None,
+        'python_peak_rss_mb': python_peak_rss_mb(),
+        'chrome_peak_rss_mb': chrome_peak,
+        # Media por verificación de las fases que mide el propio scraper (phase_timer.py)
+        'phases': {phase: total / iterations for phase, total in sorted(phase_totals.items())},
+    }
+
+
+def run_worker(name, iterations, origin):
+    """Proceso hijo: importar el scraper (ya con SITE_ORIGIN del replay) y medirlo"""
+    module_name, class_name, method_name = SCRAPERS[name]
+    scraper_class = getattr(importlib.import_module(module_name), class_name)
+    return bench_scraper(
+        factory=scraper_class,
+        check=lambda scraper: getattr(scraper, method_name)(),
+        iterations=iterations,
+        origin=origin,
+        close=lambda scraper: scraper.close_driver()
+    )
+
+
+def run_in_subprocess(name, iterations, origin):
+    """Lanzar un proceso por scraper con SITE_ORIGIN y una caché de sesión vacía"""
+    with tempfile.TemporaryDirectory(prefix='cies-bench-') as tmp_dir:
+        env = dict(os.environ, SITE_ORIGIN=origin,
+                   SESSION_CACHE_FILE=os.path.join(tmp_dir, 'session_cache.json'))
+        output_file = os.path.join(tmp_dir, 'result.json')
+        command = [sys.executable, os.path.abspath(__file__), '--worker', name,
+                   '--iterations', str(iterations), '--origin', origin, '--worker-output', output_file]
+
+        completed = subprocess.run(command, env=env, cwd=os.path.dirname(os.path.abspath(__file__)))
+        if completed.returncode != 0 or not os.path.exists(output_file):
+            logging.error(f"❌ Benchmark de {name} fallido (código {completed.returncode})")
+            return None
+        with open(output_file) as f:
+            return json.load(f)
+
+
+def compare_with_baseline(results, baseline, tolerance=BENCHMARK_TOLERANCE):
+    """Lista de empeoramientos [(scraper, métrica, base, actual)] por encima de la tolerancia"""
+    regressions = []
+    for name, metrics in results['scrapers'].items():
+        base_metrics = baseline.get('scrapers', {}).get(name)
+        if not metrics or not base_metrics:
+            continue
+        for metric in COMPARED_METRICS:
+            current, base = metrics.get(metric), base_metrics.get(metric)
+            if current is None or base is None:
+                continue
+            if current > base * (1 + tolerance) and current - base > 1e-9:
+                regressions.append((name, metric, base, current))
+    return regressions
+
+
+def format_metric(value, unit=''):
+    if value is None:
+        return 'n/d'
+    if unit == 's':
+        return f"{value * 1000:.0f}ms"
+    return f"{value:.1f}{unit}"
+
+
+def log_results(results):
+    for name, metrics in results['scrapers'].items():
+        if not metrics:
+            logging.info(f"📊 {name}: sin resultados")
+            continue
+        logging.info(
+            f"📊 {name}: frío {format_metric(metrics['cold_start'], 's')}, "
+            f"p50 {format_metric(metrics['p50'], 's')}, p95 {format_metric(metrics['p95'], 's')}, "
+            f"p99 {format_metric(metrics['p99'], 's')}, errores {metrics['errors']}/{metrics['iterations']}"
+        )
+        logging.info(
+            f"   RSS Python {format_metric(metrics['python_peak_rss_mb'], 'MB')}, "
+            f"Chrome {format_metric(metrics['chrome_peak_rss_mb'], 'MB')}, "
+            f"WebDriver {format_metric(metrics['webdriver_commands_per_check'])}/verificación, "
+            f"upstream {format_metric(metrics['requests_per_check'])}/verificación"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de los scrapers contra el servidor de replay")
+    parser.add_argument('--scrapers', default=','.join(SCRAPERS), help="Lista separada por comas")
+    parser.add_argument('--iterations', type=int, default=BENCHMARK_ITERATIONS)
+    parser.add_argument('--latency', type=float, default=0.0, help="Latencia simulada por respuesta del replay")
+    parser.add_argument('--scenario', help="Escenario de eventos para el servidor de replay")
+    parser.add_argument('--output', default=BENCHMARK_RESULTS_FILE)
+    parser.add_argument('--baseline', default=BENCHMARK_BASELINE_FILE)
+    parser.add_argument('--save-baseline', action='store_true', help="Guardar estos resultados como línea base")
+    parser.add_argument('--tolerance', type=float, default=BENCHMARK_TOLERANCE)
+    parser.add_argument('--worker', choices=sorted(SCRAPERS), help=argparse.SUPPRESS)
+    parser.add_argument('--worker-output', help=argparse.SUPPRESS)
+    parser.add_argument('--origin', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    if args.worker:
+        metrics = run_worker(args.worker, args.iterations, args.origin)
+        with open(args.worker_output, 'w') as f:
+            json.dump(metrics, f)
+        return 0
+
+    if args.iterations < 2:
+        parser.error("--iterations debe ser al menos 2 (la primera es el arranque en frío)")
+
+    names = [name.strip() for name in args.scrapers.split(',') if name.strip()]
+    unknown = [name for name in names if name not in SCRAPERS]
+    if unknown:
+        parser.error(f"Scrapers desconocidos: {', '.join(unknown)}")
+
+    results = {
+        'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        'iterations': args.iterations,
+        'latency': args.latency,
+        'scrapers': {}
+    }
+    for name in names:
+        # Servidor nuevo por scraper: mismas condiciones de partida para todos
+        state = ReplayState(latency=args.latency)
+        if args.scenario:
+            state.load_scenario(args.scenario)
+        server = start_replay_server(state)
+        try:
+            logging.info(f"🏁 Benchmark de {name} ({args.iterations} verificaciones)...")
+            results['scrapers'][name] = run_in_subprocess(name, args.iterations, server.origin)
+        finally:
+            server.shutdown()
+            server.server_close()
+
+    log_results(results)
+    with open(args.output, 'w') as f:
+        json.dump(results, f, indent=2)
+    logging.info(f"💾 Resultados guardados en {args.output}")
+
+    failed = [name for name, metrics in results['scrapers'].items() if not metrics]
+    if failed:
+        logging.error(f"❌ Sin resultados para: {', '.join(failed)}; no se compara ni se guarda línea base")
+        return 1
+
+    if args.save_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(results, f, indent=2)
+        logging.info(f"📌 Línea base actualizada: {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        logging.info("ℹ️ Sin línea base para comparar (usa --save-baseline)")
+        return 0
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    regressions = compare_with_baseline(results, baseline, args.tolerance)
+    for name, metric, base, current in regressions:
+        logging.warning(f"📉 {name}: {metric} empeora de {base:.4g} a {current:.4g}")
+    if regressions:
+        return 1
+    logging.info(f"✅ Sin empeoramientos frente a la línea base (tolerancia {args.tolerance:.0%})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
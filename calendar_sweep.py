@@ -0,0 +1,65 @@
+"""
+Barrido mensual de disponibilidad con recuperarCalendario
+Una sola petición devuelve el estado de todos los días del mes;
+solo se consulta recuperarPlazasTotales para los días que parecen reservables
+"""
+
+import json
+import logging
+from datetime import datetime
+from zoneinfo import ZoneInfo
+from config import SITE_TIMEZONE, CALENDAR_BOOKABLE_STATUSES
+
+SITE_TZ = ZoneInfo(SITE_TIMEZONE)
+
+
+def parse_calendar_response(payload):
+    """
+    Convertir la respuesta de recuperarCalendario en {date: disponible}.
+    Las claves 'date' son epoch en milisegundos (medianoche en hora local del sitio).
+    """
+    if isinstance(payload, (str, bytes)):
+        payload = json.loads(payload)
+
+    days = {}
+    for entry in payload:
+        try:
+            day = datetime.fromtimestamp(int(entry['date']) / 1000, tz=SITE_TZ).date()
+            days[day] = str(entry.get('disponible'))
+        except (KeyError, TypeError, ValueError) as e:
+            logging.warning(f"⚠️ Entrada de calendario no válida {entry}: {e}")
+    return days
+
+
+def is_bookable(status):
+    """Indicar si el estado de un día del calendario parece reservable"""
+    return status in CALENDAR_BOOKABLE_STATUSES
+
+
+def format_fecha(day):
+    """Formato de fecha que espera la API (DD/MM/YYYY)"""
+    return day.strftime('%d/%m/%Y')
+
+
+def build_availability(calendar):
+    """Mapa por día a partir del calendario; las plazas quedan a None en los días reservables"""
+    availability = {}
+    for day, status in sorted(parse_calendar_response(calendar).items()):
+        bookable = is_bookable(status)
+        availability[day] = {
+            'disponible': status,
+            'bookable': bookable,
+            'available_slots': 0 if not bookable else None
+        }
+    return availability
+
+
+def days_to_confirm(availability, days=None):
+    """Días reservables que hay que confirmar con recuperarPlazasTotales"""
+    return [day for day, info in availability.items() if info['bookable'] and (days is None or day in days)]
+
+
+def log_availability(year, month, availability):
+    bookable_days = [format_fecha(d) for d, info in availability.items() if info['bookable']]
+    logging.info(f"📅 Calendario {month:02d}/{year}: {len(availability)} días, reservables: {bookable_days or 'ninguno'}")
+
@@ -0,0 +1,210 @@
+"""
+Perfiles de Chrome en memoria y binarios resueltos una sola vez
+- Los binarios de Chrome y chromedriver se buscan una vez por proceso
+  (CHROME_BINARY / CHROMEDRIVER_PATH, PATH, rutas habituales y, para
+  chromedriver, webdriver-manager) y el resultado queda en caché.
+- Se crea una vez un perfil plantilla (preferencias sin primera ejecución,
+  notificaciones ni ventanas emergentes) y cada navegador arranca con una
+  copia en un directorio en RAM (/dev/shm): sin escrituras a disco y sin
+  que Chrome tenga que generar un perfil desde cero.
+- El perfil de cada navegador se borra al cerrarlo y al arrancar se limpian
+  los que dejaron procesos que ya no existen.
+"""
+
+import atexit
+import functools
+import json
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import uuid
+from selenium import webdriver
+from selenium.webdriver.chrome.service import Service
+from config import CHROME_BINARY, CHROMEDRIVER_PATH, CHROME_PROFILE_ROOT
+
+PROFILE_PREFIX = 'cies-chrome-'
+TEMPLATE_NAME = 'cies-chrome-template'
+CHROME_CANDIDATES = ('google-chrome', 'google-chrome-stable', 'chromium', 'chromium-browser', 'chrome')
+CHROME_PATHS = (
+    '/Applications/Google Chrome.app/Contents/MacOS/Google Chrome',
+    '/opt/google/chrome/chrome',
+    '/usr/bin/google-chrome'
+)
+TEMPLATE_PREFERENCES = {
+    'profile': {
+        'default_content_setting_values': {'notifications': 2, 'geolocation': 2, 'media_stream': 2},
+        'default_content_settings': {'popups': 0},
+        'exit_type': 'Normal',
+        'exited_cleanly': True
+    },
+    'browser': {'check_default_browser': False, 'has_seen_welcome_page': True},
+    'distribution': {'skip_first_run_ui': True, 'suppress_first_run_default_browser_prompt': True},
+    'translate': {'enabled': False}
+}
+
+
+@functools.lru_cache(maxsize=None)
+def resolve_binaries():
+    """(chrome, chromedriver) una vez por proceso; None deja la búsqueda a Selenium"""
+    chrome = CHROME_BINARY or next(filter(None, (shutil.which(name) for name in CHROME_CANDIDATES)), None)
+    if not chrome:
+        chrome = next((path for path in CHROME_PATHS if os.path.exists(path)), None)
+
+    chromedriver = CHROMEDRIVER_PATH or shutil.which('chromedriver')
+    if not chromedriver:
+        try:
+            from webdriver_manager.chrome import ChromeDriverManager
+            chromedriver = ChromeDriverManager().install()
+        except Exception as e:
+            logging.warning(f"⚠️ webdriver-manager no pudo resolver chromedriver, se usará Selenium Manager: {e}")
+
+    logging.info(f"🧭 Chrome: {chrome or 'automático'} · chromedriver: {chromedriver or 'automático'}")
+    return chrome, chromedriver
+
+
+def default_root():
+    """/dev/shm si existe y se puede escribir; si no, el directorio temporal del sistema"""
+    if CHROME_PROFILE_ROOT and os.path.isdir(CHROME_PROFILE_ROOT) and os.access(CHROME_PROFILE_ROOT, os.W_OK):
+        return CHROME_PROFILE_ROOT
+    return tempfile.gettempdir()
+
+
+def pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class ProfileManager:
+    def __init__(self, root=None):
+        self.root = root or default_root()
+        self.template = os.path.join(self.root, TEMPLATE_NAME)
+        self.active = set()
+        self.lock = threading.Lock()
+        self.template_ready = False
+
+    def ensure_template(self):
+        """Crear el perfil plantilla si no existe (en un temporal y con rename: otros procesos ven uno completo)"""
+        if self.template_ready or os.path.isdir(self.template):
+            self.template_ready = True
+            return self.template
+        building = tempfile.mkdtemp(prefix='.cies-template-', dir=self.root)
+        try:
+            os.makedirs(os.path.join(building, 'Default'))
+            with open(os.path.join(building, 'Default', 'Preferences'), 'w') as f:
+                json.dump(TEMPLATE_PREFERENCES, f)
+            with open(os.path.join(building, 'Local State'), 'w') as f:
+                json.dump({'browser': {'enabled_labs_experiments': []}}, f)
+            open(os.path.join(building, 'First Run'), 'w').close()
+            os.rename(building, self.template)
+            logging.info(f"📁 Perfil plantilla de Chrome creado en {self.template}")
+        except OSError:
+            # Otro proceso la creó a la vez: vale la suya
+            shutil.rmtree(building, ignore_errors=True)
+            if not os.path.isdir(self.template):
+                raise
+        self.template_ready = True
+        return self.template
+
+    def new_profile(self):
+        """Copia de la plantilla para un navegador nuevo"""
+        path = os.path.join(self.root, f"{PROFILE_PREFIX}{os.getpid()}-{uuid.uuid4().hex[:8]}")
+        shutil.copytree(self.ensure_template(), path)
+        with self.lock:
+            self.active.add(path)
+        return path
+
+    def release(self, path):
+        """Borrar el perfil de un navegador cerrado"""
+        with self.lock:
+            self.active.discard(path)
+        shutil.rmtree(path, ignore_errors=True)
+
+    def release_all(self):
+        with self.lock:
+            paths = list(self.active)
+        for path in paths:
+            self.release(path)
+
+    def cleanup_stale(self):
+        """
+        Borrar perfiles de procesos que ya no existen; devuelve cuántos.
+        Los de procesos vivos nunca se tocan, por viejos que parezcan: Chrome escribe
+        dentro de Default/ sin cambiar la fecha del directorio y una reserva en reposo
+        (warm_spare.py) puede pasar horas sin usarse.
+        """
+        removed = 0
+        try:
+            names = os.listdir(self.root)
+        except OSError:
+            return 0
+        for name in names:
+            if not name.startswith(PROFILE_PREFIX) or name == TEMPLATE_NAME:
+                continue
+            path = os.path.join(self.root, name)
+            try:
+                pid = int(name[len(PROFILE_PREFIX):].split('-')[0])
+            except ValueError:
+                continue
+            with self.lock:
+                in_use = path in self.active
+            if in_use:
+                continue
+            if not pid_alive(pid):
+                shutil.rmtree(path, ignore_errors=True)
+                removed += 1
+        if removed:
+            logging.info(f"🧹 {removed} perfiles de Chrome huérfanos eliminados de {self.root}")
+        return removed
+
+
+_manager = None
+_manager_lock = threading.Lock()
+
+
+def get_profile_manager():
+    """Gestor de perfiles del proceso (limpia los huérfanos la primera vez)"""
+    global _manager
+    with _manager_lock:
+        if _manager is None:
+            _manager = ProfileManager()
+            _manager.cleanup_stale()
+            atexit.register(_manager.release_all)
+        return _manager
+
+
+def launch_chrome(chrome_options, profiles=None):
+    """
+    webdriver.Chrome con los binarios en caché y un perfil en RAM copiado de la plantilla.
+    El perfil se borra al llamar a driver.quit() (o si el arranque falla).
+    """
+    profiles = profiles or get_profile_manager()
+    chrome, chromedriver = resolve_binaries()
+    if chrome:
+        chrome_options.binary_location = chrome
+    profile = profiles.new_profile()
+    chrome_options.add_argument(f'--user-data-dir={profile}')
+
+    try:
+        driver = webdriver.Chrome(service=Service(executable_path=chromedriver), options=chrome_options)
+    except Exception:
+        profiles.release(profile)
+        raise
+
+    quit_driver = driver.quit
+
+    def quit_and_release():
+        try:
+            quit_driver()
+        finally:
+            profiles.release(profile)
+
+    driver.quit = quit_and_release
+    driver.profile_dir = profile
+    return driver
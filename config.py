@@ -5,10 +5,35 @@ from dotenv import load_dotenv
 load_dotenv()
 
 # Configuración del sitio web
-TARGET_URL = "https://autorizacionillasatlanticas.xunta.gal/illasr/inicio"
+# SITE_ORIGIN se puede apuntar al servidor de replay local (har_replay_server.py), p. ej. http://127.0.0.1:8765
+SITE_ORIGIN = os.getenv('SITE_ORIGIN', "https://autorizacionillasatlanticas.xunta.gal").rstrip('/')
+BASE_URL = f"{SITE_ORIGIN}/illasr"
+TARGET_URL = f"{BASE_URL}/inicio"
+RESERVA_URL = f"{BASE_URL}/iniciarReserva"
+PLAZAS_API_URL = f"{BASE_URL}/recuperarPlazasTotales"
 TARGET_DATE = "02/08/2025"  # Formato DD/MM/YYYY
+# Lista de fechas vigiladas: fechas, rangos y meses con filtro de días (ver watchlist.py)
+# Ejemplo: "02/08/2025,01/08/2025-15/08/2025,08/2025@sab"
+WATCH_DATES = os.getenv('WATCH_DATES', TARGET_DATE)
+
+# Matriz de consultas: islas x tamaños de grupo x tipos de cupo (valores separados por '+')
+WATCH_ISLANDS = os.getenv('WATCH_ISLANDS', '1')  # 1 = Islas Cíes
+WATCH_GROUP_SIZES = os.getenv('WATCH_GROUP_SIZES', '1')  # numPlazas
+WATCH_QUOTA_TYPES = os.getenv('WATCH_QUOTA_TYPES', '')  # idTipoCupo ('' = general)
+# Vigilantes con sus propias fechas y consultas: "fechas|islas|plazas|cupos;..." (ver query_matrix.py)
+WATCHERS = os.getenv('WATCHERS', '')
+MAX_SWEEPS_PER_CYCLE = 0  # barridos (consulta, mes) por ciclo; 0 = toda la matriz en cada ciclo
 CHECK_INTERVAL = 10  # segundos (aumentado para reducir detección)
 
+# Planificador adaptativo de verificaciones (poll_scheduler.py)
+POLL_MIN_INTERVAL = 5  # segundos entre verificaciones tras un cambio en el calendario
+POLL_MAX_INTERVAL = 900  # tope del backoff ante errores (segundos)
+POLL_BACKOFF_FACTOR = 2  # multiplicador por cada error consecutivo
+POLL_REJECT_PENALTY = 2  # pasos de backoff por una redirección a 'aceptacion'
+POLL_JITTER = 0.2  # +/-20% aleatorio en cada espera
+POLL_FAST_WINDOW = 600  # segundos de verificación rápida tras un cambio
+POLL_HOURLY_BUDGET = int(os.getenv('POLL_HOURLY_BUDGET', '1200'))  # peticiones upstream por hora (0 = sin límite)
+
 # Configuración de alertas críticas
 CRITICAL_ERROR_THRESHOLD = 600  # intentos sin éxito (10 minutos a 1s)
 CRITICAL_ERROR_TIME_THRESHOLD = 600  # segundos sin éxito (10 minutos)
@@ -33,6 +58,23 @@ RECIPIENT_WHATSAPP = os.getenv('RECIPIENT_WHATSAPP', '')  # Tu número de WhatsA
 HEADLESS = True  # Cambiado de vuelta a True para evitar ventanas visibles
 BROWSER_TIMEOUT = 20  # segundos (aumentado para más estabilidad)
 
+# Perfil de navegación de Selenium (navigation_profile.py)
+PAGE_LOAD_STRATEGY = os.getenv('PAGE_LOAD_STRATEGY', 'eager')  # normal | eager (DOMContentLoaded) | none
+BLOCK_RESOURCES = os.getenv('BLOCK_RESOURCES', 'True').lower() == 'true'  # bloqueo por DevTools (Network.setBlockedURLs)
+BLOCKED_RESOURCE_TYPES = os.getenv('BLOCKED_RESOURCE_TYPES', 'image+font+media')  # también 'stylesheet'
+BLOCKED_HOSTS = (  # analítica, anuncios y CDNs de fuentes: nada que necesite el flujo de reserva
+    'google-analytics.com', 'googletagmanager.com', 'doubleclick.net', 'googlesyndication.com',
+    'fonts.googleapis.com', 'fonts.gstatic.com', 'facebook.net', 'hotjar.com', 'clarity.ms'
+)
+
+# Esperas por condición del flujo de Selenium (waits.py)
+WAIT_POLL_INTERVAL = 0.1  # segundos entre comprobaciones de cada condición
+WAIT_TIMEOUT = 10  # plazo por defecto de cada espera
+POLITE_PACING = os.getenv('POLITE_PACING', 'True').lower() == 'true'  # pausas aleatorias entre acciones (random_delay); False = modo rápido
+
+# Motor de selectores con orden aprendido (selector_engine.py)
+SELECTOR_STATS_FILE = os.getenv('SELECTOR_STATS_FILE', "selector_stats.json")  # aciertos por selector entre reinicios
+
 # Configuración anti-detección mejorada
 USER_AGENTS = [
     'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/138.0.0.0 Safari/537.36',
@@ -49,5 +91,69 @@ MIN_DELAY = 3  # segundos mínimo entre acciones
 MAX_DELAY = 12  # segundos máximo entre acciones
 
 # Configuración de reintentos
-MAX_RETRIES = 3  # máximo reintentos por sesión
-RETRY_DELAY = 30  # segundos entre reintentos
\ No newline at end of file
+MAX_RETRIES = 3  # intentos seguidos antes de dejar el ritmo al planificador
+
+# Política de reintentos sin bloqueo (retry_policy.py)
+RETRY_BASE_DELAY = 2  # segundos hasta el primer reintento (se dobla en cada fallo)
+RETRY_MAX_DELAY = 60  # tope del backoff de reintentos
+RETRY_JITTER = 0.5  # fracción aleatoria (+/-) de cada espera
+ERROR_BUDGET = int(os.getenv('ERROR_BUDGET', '10'))  # fallos permitidos por ventana antes de escalar (0 = sin límite)
+ERROR_BUDGET_WINDOW = int(os.getenv('ERROR_BUDGET_WINDOW', '300'))  # segundos de la ventana del presupuesto
+
+# Cadena de estrategias con circuit breakers (strategy_chain.py)
+SCRAPER_STRATEGIES = os.getenv('SCRAPER_STRATEGIES', 'api,hybrid,html')  # orden de preferencia: la más barata primero
+CIRCUIT_FAILURE_THRESHOLD = int(os.getenv('CIRCUIT_FAILURE_THRESHOLD', '3'))  # fallos seguidos que abren el circuito
+CIRCUIT_COOLDOWN = int(os.getenv('CIRCUIT_COOLDOWN', '300'))  # segundos con el circuito abierto antes de probar de nuevo
+STRATEGY_LATENCY_WINDOW = 50  # latencias recientes guardadas por estrategia
+
+# Binarios y perfiles de Chrome (chrome_profile.py)
+CHROME_BINARY = os.getenv('CHROME_BINARY', '')  # vacío = buscar en PATH y rutas habituales (Linux y macOS)
+CHROMEDRIVER_PATH = os.getenv('CHROMEDRIVER_PATH', '')  # vacío = PATH o webdriver-manager
+CHROME_PROFILE_ROOT = os.getenv('CHROME_PROFILE_ROOT', '/dev/shm')  # perfiles en RAM (si no existe, directorio temporal)
+
+# Navegador de reserva precalentado para reset_browser (warm_spare.py)
+WARM_SPARE = os.getenv('WARM_SPARE', 'True').lower() == 'true'  # False en máquinas con poca memoria (un Chrome más)
+WARM_SPARE_WAIT = 5  # segundos que se espera a una reserva que se está lanzando antes de arrancar en frío
+
+# Configuración del pool de navegadores (scraper híbrido)
+DRIVER_POOL_SIZE = 1  # navegadores calentados en paralelo
+DRIVER_MAX_USES = 50  # verificaciones antes de reciclar un navegador
+DRIVER_MAX_AGE = 1800  # segundos de vida máxima de un navegador
+
+# Configuración del arranque de sesión por HTTP (sin navegador)
+HTTP_TIMEOUT = 15  # segundos de lectura por petición
+HTTP_BOOTSTRAP_RETRY_INTERVAL = 600  # segundos antes de reintentar HTTP puro tras un fallo
+
+# Configuración de la caché de sesión en disco
+SESSION_CACHE_FILE = os.getenv('SESSION_CACHE_FILE', "session_cache.json")
+SESSION_CACHE_TTL = 1200  # segundos de validez de una sesión cacheada
+
+# Configuración del barrido mensual (recuperarCalendario)
+CALENDARIO_API_URL = f"{BASE_URL}/recuperarCalendario"
+SITE_TIMEZONE = "Europe/Madrid"  # zona horaria de las fechas epoch del calendario
+CALENDAR_BOOKABLE_STATUSES = ('1',)  # valores de 'disponible' que indican plazas libres
+
+# Configuración del motor asíncrono de consultas
+API_MAX_CONCURRENCY = int(os.getenv('API_MAX_CONCURRENCY', '4'))  # peticiones simultáneas como máximo
+API_REQUEST_DEADLINE = 20  # segundos máximos por petición antes de abandonarla
+API_CYCLE_DEADLINE = 90  # segundos máximos por tanda; lo pendiente se cancela
+
+# Configuración del transporte HTTP compartido (transport.py)
+HTTP_CONNECT_TIMEOUT = 5  # segundos para establecer la conexión
+HTTP_CONNECT_RETRIES = 2  # reintentos solo ante fallos de conexión
+HTTP_POOL_MAXSIZE = max(4, API_MAX_CONCURRENCY)  # conexiones keep-alive por host
+HTTP2_ENABLED = os.getenv('HTTP2_ENABLED', 'False').lower() == 'true'  # requiere httpx[http2]
+HTTP_TIMING_HISTORY = 500  # peticiones con tiempos guardados para diagnóstico
+
+# Endpoint de métricas Prometheus (metrics.py)
+METRICS_PORT = int(os.getenv('METRICS_PORT', '0'))  # 0 = desactivado; p. ej. 9108 (un puerto por instancia)
+METRICS_HOST = os.getenv('METRICS_HOST', '127.0.0.1')  # 0.0.0.0 para que Prometheus lo lea desde otra máquina
+
+# Tiempo hasta la alerta (alert_latency.py)
+ALERT_LATENCY_SAMPLES = 200  # alertas guardadas por etapa y canal en bot_stats.json
+
+# Configuración de la suite de benchmarks (benchmark.py)
+BENCHMARK_ITERATIONS = 20  # verificaciones por scraper (la primera cuenta como arranque en frío)
+BENCHMARK_RESULTS_FILE = "benchmark_results.json"
+BENCHMARK_BASELINE_FILE = "benchmark_baseline.json"
+BENCHMARK_TOLERANCE = 0.2  # empeoramiento relativo permitido frente a la línea base
@@ -0,0 +1,163 @@
+"""
+Puente de cookies entre Selenium y requests
+Sincroniza en los dos sentidos solo cuando algo ha cambiado:
+- navegador -> sesión: una lectura de get_cookies() solo si el navegador se ha usado
+  desde la última sincronización (y solo se copia si el contenido cambió)
+- sesión -> navegador: las cookies que fijan las respuestas de la API se envían
+  al navegador cuando se vuelve a usar
+Se conservan dominio y ruta para que cookies homónimas de rutas distintas no colisionen.
+"""
+
+import hashlib
+import logging
+import weakref
+from urllib.parse import urlparse
+
+
+def jar_fingerprint(cookies):
+    """Hash estable de una colección de cookies (dominio, ruta, nombre, valor)"""
+    items = sorted(
+        (c['domain'].lstrip('.'), c['path'], c['name'], c['value'])
+        for c in cookies
+    )
+    return hashlib.sha1(repr(items).encode()).hexdigest()
+
+
+def from_selenium(cookie):
+    """Cookie de Selenium -> dict normalizado"""
+    return {
+        'name': cookie['name'],
+        'value': cookie['value'],
+        'domain': cookie.get('domain') or '',
+        'path': cookie.get('path') or '/',
+        'secure': cookie.get('secure', False),
+        'http_only': cookie.get('httpOnly', False),
+        'expires': cookie.get('expiry')
+    }
+
+
+def from_requests(cookie):
+    """Cookie de requests (http.cookiejar.Cookie) -> dict normalizado"""
+    return {
+        'name': cookie.name,
+        'value': cookie.value,
+        'domain': cookie.domain or '',
+        'path': cookie.path or '/',
+        'secure': cookie.secure,
+        'http_only': cookie.has_nonstandard_attr('HttpOnly'),
+        'expires': cookie.expires
+    }
+
+
+def domain_matches(cookie_domain, host):
+    """Indicar si una cookie puede fijarse desde el host actual del navegador"""
+    domain = cookie_domain.lstrip('.')
+    return not domain or host == domain or host.endswith('.' + domain)
+
+
+class CookieBridge:
+    def __init__(self, session):
+        self.session = session
+        self.driver = None
+        # Estado por navegador: el pool puede alternar varios drivers
+        self.states = weakref.WeakKeyDictionary()
+        self.stats = {'browser_reads': 0, 'to_session': 0, 'to_browser': 0, 'skipped': 0}
+
+    def state(self, driver):
+        if driver not in self.states:
+            self.states[driver] = {'dirty': True, 'browser_hash': None, 'session_hash': None}
+        return self.states[driver]
+
+    def session_cookies(self):
+        return [from_requests(c) for c in self.session.cookies]
+
+    def attach(self, driver):
+        """Asociar el navegador en uso y llevarle las cookies nuevas de la API"""
+        self.driver = driver
+        if driver is not None:
+            self.session_to_browser()
+
+    def mark_browser_changed(self, driver=None):
+        """Avisar de que el navegador ha navegado o interactuado con el sitio"""
+        driver = driver or self.driver
+        if driver is not None:
+            self.state(driver)['dirty'] = True
+
+    def browser_to_session(self):
+        """Copiar a requests las cookies del navegador si pueden haber cambiado"""
+        if self.driver is None:
+            return False
+
+        state = self.state(self.driver)
+        if not state['dirty']:
+            self.stats['skipped'] += 1
+            return False
+
+        cookies = [from_selenium(c) for c in self.driver.get_cookies()]
+        self.stats['browser_reads'] += 1
+        state['dirty'] = False
+
+        fingerprint = jar_fingerprint(cookies)
+        if fingerprint == state['browser_hash']:
+            return False
+
+        for cookie in cookies:
+            self.session.cookies.set(
+                cookie['name'], cookie['value'],
+                domain=cookie['domain'], path=cookie['path'],
+                secure=cookie['secure'], expires=cookie['expires'],
+                rest={'HttpOnly': None} if cookie['http_only'] else {}
+            )
+
+        state['browser_hash'] = fingerprint
+        state['session_hash'] = jar_fingerprint(self.session_cookies())
+        self.stats['to_session'] += 1
+        logging.info(f"🍪 {len(cookies)} cookies del navegador copiadas a la sesión HTTP")
+        return True
+
+    def session_to_browser(self):
+        """Enviar al navegador las cookies de requests si cambiaron desde la última sincronización"""
+        if self.driver is None:
+            return False
+
+        state = self.state(self.driver)
+        cookies = self.session_cookies()
+        fingerprint = jar_fingerprint(cookies)
+        if not cookies or fingerprint == state['session_hash']:
+            return False
+
+        try:
+            # add_cookie solo admite cookies del dominio en el que está el navegador
+            host = urlparse(self.driver.current_url).hostname
+            if not host:
+                return False  # navegador aún sin página: se enviarán en el próximo uso
+
+            pushed = 0
+            for cookie in cookies:
+                if not domain_matches(cookie['domain'], host):
+                    continue
+
+                selenium_cookie = {
+                    'name': cookie['name'],
+                    'value': cookie['value'],
+                    'path': cookie['path'],
+                    'secure': cookie['secure'],
+                    'httpOnly': cookie['http_only']
+                }
+                if cookie['domain'].startswith('.'):
+                    selenium_cookie['domain'] = cookie['domain']
+                if cookie['expires']:
+                    selenium_cookie['expiry'] = int(cookie['expires'])
+
+                self.driver.add_cookie(selenium_cookie)
+                pushed += 1
+        except Exception as e:
+            logging.warning(f"⚠️ No se pudieron enviar cookies al navegador: {e}")
+            return False
+
+        state['session_hash'] = fingerprint
+        state['dirty'] = True  # el navegador tiene cookies nuevas: releer antes de la próxima copia
+        self.stats['to_browser'] += 1
+        if pushed:
+            logging.info(f"🍪 {pushed} cookies de la sesión HTTP enviadas al navegador")
+        return pushed > 0
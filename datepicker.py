@@ -0,0 +1,114 @@
+"""
+Selección directa de una fecha en el datepicker de la página de solicitud
+Un solo execute_script salta al mes objetivo y hace clic en el día:
+- jQuery UI: datepicker('setDate') redibuja directamente el mes objetivo
+- otro calendario: clics en las flechas dentro del propio script, sin
+  viajes al navegador ni esperas entre meses
+El clic en el día dispara los manejadores de la página (la consulta de
+plazas), igual que un clic del usuario.
+"""
+
+import logging
+from datetime import date, datetime
+from selenium.common.exceptions import WebDriverException
+
+# dateFormat del datepicker del sitio: sin jQuery UI el campo solo se compara con este formato
+# (admitir otros haría pasar '08/02/2025' por 02/08/2025)
+SITE_DATE_FORMAT = '%d/%m/%Y'
+
+# arguments: campo de fecha, día, mes (1-12), año
+# Devuelve {'method', 'value', 'selected', 'error'}: método usado, valor del campo tras el clic,
+# fecha elegida según jQuery UI ([año, mes, día], independiente de dateFormat) o null, y motivo del fallo
+SELECT_DATE_SCRIPT = """
+    var input = arguments[0], day = arguments[1], month = arguments[2], year = arguments[3];
+    var MONTHS = {
+        'xaneiro': 1, 'febreiro': 2, 'marzo': 3, 'abril': 4, 'maio': 5, 'xuño': 6, 'xullo': 7, 'agosto': 8,
+        'setembro': 9, 'outubro': 10, 'novembro': 11, 'decembro': 12, 'enero': 1, 'febrero': 2, 'mayo': 5,
+        'junio': 6, 'julio': 7, 'septiembre': 9, 'octubre': 10, 'noviembre': 11, 'diciembre': 12,
+        'january': 1, 'february': 2, 'march': 3, 'april': 4, 'may': 5, 'june': 6, 'july': 7, 'august': 8,
+        'september': 9, 'october': 10, 'november': 11, 'december': 12
+    };
+    var $ = window.jQuery, method;
+
+    function shownMonth() {
+        // Índice absoluto (año * 12 + mes - 1) del mes mostrado; admite cabecera de texto o desplegables
+        var monthText = document.querySelector('.ui-datepicker-month');
+        var yearText = document.querySelector('.ui-datepicker-year');
+        if (!monthText || !yearText) return null;
+        var shown = monthText.tagName === 'SELECT'
+            ? parseInt(monthText.value, 10) + 1
+            : MONTHS[monthText.textContent.trim().toLowerCase()];
+        var shownYear = parseInt(yearText.tagName === 'SELECT' ? yearText.value : yearText.textContent, 10);
+        return shown && shownYear ? shownYear * 12 + shown - 1 : null;
+    }
+
+    if ($ && $.datepicker && $(input).hasClass('hasDatepicker')) {
+        // API de jQuery UI: el calendario se redibuja en el mes objetivo
+        $(input).datepicker('show');
+        $(input).datepicker('setDate', new Date(year, month - 1, day));
+        method = 'api';
+    } else {
+        // Calendario propio: abrirlo y avanzar o retroceder meses sin salir del script
+        input.click();
+        var target = year * 12 + month - 1, steps = 0, shown = shownMonth();
+        if (shown === null) return {method: 'arrows', value: input.value, error: 'mes del calendario no reconocido'};
+        while (shown !== target && steps < 60) {
+            var arrow = document.querySelector(shown < target ? '.ui-datepicker-next' : '.ui-datepicker-prev');
+            if (!arrow) return {method: 'arrows', value: input.value, error: 'sin flechas de navegación'};
+            arrow.click();
+            shown = shownMonth();
+            steps++;
+        }
+        if (shown !== target) return {method: 'arrows', value: input.value, error: 'mes objetivo no alcanzado'};
+        method = 'arrows';
+    }
+
+    // Clic en el día (jQuery UI marca las celdas con data-month/data-year; se saltan los días de otros meses)
+    var links = document.querySelectorAll('.ui-datepicker-calendar td a');
+    for (var i = 0; i < links.length; i++) {
+        var cell = links[i].parentNode;
+        if (links[i].textContent.trim() !== String(day)) continue;
+        if (cell.className.indexOf('ui-datepicker-other-month') !== -1) continue;
+        if (cell.hasAttribute('data-month') && parseInt(cell.getAttribute('data-month'), 10) !== month - 1) continue;
+        links[i].click();
+        var picked = method === 'api' ? $(input).datepicker('getDate') : null;
+        var selected = picked ? [picked.getFullYear(), picked.getMonth() + 1, picked.getDate()] : null;
+        return {method: method, value: input.value, selected: selected, error: null};
+    }
+    return {method: method, value: input.value, error: 'día no disponible en el calendario'};
+"""
+
+
+def parse_target_date(target_date):
+    """'02/08/2025' o date -> date"""
+    if isinstance(target_date, str):
+        return datetime.strptime(target_date, SITE_DATE_FORMAT).date()
+    return target_date
+
+
+def shows_date(selection, target_date):
+    """¿El campo que usó SELECT_DATE_SCRIPT quedó con target_date? (getDate de jQuery UI o el formato del sitio)"""
+    target = parse_target_date(target_date)
+    if selection.get('selected'):
+        return date(*selection['selected']) == target
+
+    value = (selection.get('value') or '').strip()
+    try:
+        return datetime.strptime(value, SITE_DATE_FORMAT).date() == target
+    except ValueError:
+        return False
+
+
+def select_date(driver, date_input, target_date):
+    """Seleccionar target_date en un solo viaje; devuelve el resultado del script o None si falla"""
+    day = parse_target_date(target_date)
+    try:
+        result = driver.execute_script(SELECT_DATE_SCRIPT, date_input, day.day, day.month, day.year)
+    except WebDriverException as e:
+        logging.error(f"Error seleccionando la fecha en el calendario: {e}")
+        return None
+
+    if result.get('error'):
+        logging.error(f"❌ No se pudo seleccionar {day.strftime('%d/%m/%Y')} ({result['method']}): {result['error']}")
+        return None
+    return result
@@ -0,0 +1,79 @@
+"""
+Instantánea de la página de solicitud en un solo viaje al navegador
+Un script inyectado devuelve de una vez lo que antes costaba varias
+llamadas WebDriver (current_url, find_element, .text, is_displayed):
+URL, si es la página de error, texto y número de plazas, fecha mostrada
+y filas de mareas.
+"""
+
+import logging
+from selenium.common.exceptions import WebDriverException
+
+# arguments[0]: XPath candidatos del texto de plazas, en el orden en que se prueban
+SNAPSHOT_SCRIPT = """
+    var slotsSelectors = arguments[0] || [];
+    var url = window.location.href;
+    var snapshot = {
+        url: url,
+        error_page: url.indexOf('aceptacion') !== -1,
+        slots: null, slots_text: null, slots_selector: null,
+        date: null, tides: []
+    };
+
+    function visible(node) {
+        return !!(node.offsetWidth || node.offsetHeight || node.getClientRects().length);
+    }
+
+    for (var i = 0; i < slotsSelectors.length && snapshot.slots_text === null; i++) {
+        var result;
+        try {
+            result = document.evaluate(slotsSelectors[i], document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+        } catch (e) {
+            continue;
+        }
+        for (var j = 0; j < result.snapshotLength; j++) {
+            var node = result.snapshotItem(j);
+            if (visible(node)) {
+                snapshot.slots_text = (node.innerText || node.textContent).trim();
+                snapshot.slots_selector = i;
+                break;
+            }
+        }
+    }
+    if (snapshot.slots_text !== null) {
+        var match = snapshot.slots_text.match(/(?:prazas|plazas) libres:\\s*(\\d+)/i) || snapshot.slots_text.match(/(\\d+)/);
+        if (match) snapshot.slots = parseInt(match[1], 10);
+    }
+
+    var dateInput = document.querySelector('#fecha, #fechaEntrada');
+    if (dateInput && dateInput.value) snapshot.date = dateInput.value;
+
+    // "Preamar: 10:44 23:10" / "Baixamar: 04:21 16:53"
+    var text = document.body ? document.body.innerText : '';
+    var tide = /(preamar|pleamar|baixamar|bajamar)\\s*:?\\s*((?:\\d{1,2}:\\d{2}[\\s,]*)+)/gi, row;
+    while ((row = tide.exec(text)) !== null) {
+        var kind = /^p/i.test(row[1]) ? 'preamar' : 'baixamar';
+        (row[2].match(/\\d{1,2}:\\d{2}/g) || []).forEach(function (hora) {
+            snapshot.tides.push({tipo: kind, hora: hora});
+        });
+    }
+    return snapshot;
+"""
+
+
+def take_snapshot(driver, slots_selectors=()):
+    """
+    {'url', 'error_page', 'slots', 'slots_text', 'slots_selector', 'date', 'tides'}
+    slots es None si no hay texto de plazas o no lleva número; None si el navegador no responde.
+    """
+    try:
+        return driver.execute_script(SNAPSHOT_SCRIPT, list(slots_selectors))
+    except WebDriverException as e:
+        logging.warning(f"⚠️ No se pudo leer la página: {e}")
+        return None
+
+
+def format_tides(tides):
+    """'preamar 10:44 · baixamar 16:53' en orden horario"""
+    ordered = sorted(tides, key=lambda row: tuple(int(part) for part in row['hora'].split(':')))
+    return " · ".join(f"{row['tipo']} {row['hora']}" for row in ordered) or "sin datos de mareas"
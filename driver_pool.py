@@ -0,0 +1,187 @@
+"""
+Pool de navegadores Chrome persistentes
+Mantiene WebDrivers ya calentados (aparcados en la página de solicitud)
+y los presta a cada verificación en lugar de lanzar y cerrar Chrome cada vez
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+from metrics import CHROME_RECYCLES
+
+
+class PooledDriver:
+    """Envoltorio de un WebDriver con su contabilidad de uso"""
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.created_at = time.monotonic()
+        self.uses = 0
+        self.warm = False
+
+    @property
+    def age(self):
+        return time.monotonic() - self.created_at
+
+
+class DriverPool:
+    def __init__(self, factory, warmup=None, health_check=None, size=1, max_uses=50, max_age=1800, acquire_timeout=60):
+        """
+        factory: callable sin argumentos que devuelve un WebDriver nuevo (o None si falla)
+        warmup: callable(driver) -> bool que deja el driver listo (p. ej. en iniciarReserva)
+        health_check: callable(driver) -> bool que indica si el driver sigue aparcado y usable
+        """
+        self.factory = factory
+        self.warmup = warmup
+        self.health_check = health_check
+        self.size = max(1, size)
+        self.max_uses = max_uses
+        self.max_age = max_age
+        self.acquire_timeout = acquire_timeout
+
+        self._idle = deque()
+        self._created = 0
+        self._closed = False
+        self._lock = threading.Condition()
+
+        self.stats = {
+            'created': 0,
+            'recycled': 0,
+            'leases': 0,
+            'warmups': 0,
+            'health_failures': 0
+        }
+
+    def _quit(self, pooled, reason):
+        """Cerrar un driver del pool y liberar su hueco"""
+        try:
+            pooled.driver.quit()
+        except Exception as e:
+            logging.debug(f"Error cerrando driver del pool: {e}")
+        with self._lock:
+            self._created -= 1
+            self.stats['recycled'] += 1
+            self._lock.notify()
+        CHROME_RECYCLES.inc(reason=reason)
+        logging.info(f"♻️ Driver reciclado ({reason}) tras {pooled.uses} usos y {pooled.age:.0f}s de vida")
+
+    def _create(self):
+        """Crear un driver nuevo usando la factoría (el hueco ya está reservado)"""
+        try:
+            driver = self.factory()
+        except Exception as e:
+            logging.error(f"Error creando driver para el pool: {e}")
+            driver = None
+
+        if driver is None:
+            with self._lock:
+                self._created -= 1
+                self._lock.notify()
+            return None
+
+        self.stats['created'] += 1
+        logging.info(f"🆕 Driver creado para el pool ({self._created}/{self.size})")
+        return PooledDriver(driver)
+
+    def _is_expired(self, pooled):
+        if self.max_uses and pooled.uses >= self.max_uses:
+            return "máximo de usos"
+        if self.max_age and pooled.age >= self.max_age:
+            return "edad máxima"
+        return None
+
+    def _prepare(self, pooled):
+        """Comprobar salud del driver y calentarlo si es necesario"""
+        if pooled.warm and self.health_check:
+            try:
+                healthy = self.health_check(pooled.driver)
+            except Exception:
+                healthy = False
+            if not healthy:
+                self.stats['health_failures'] += 1
+                logging.warning("⚠️ Driver del pool no supera el health-check, recalentando...")
+                pooled.warm = False
+
+        if not pooled.warm and self.warmup:
+            self.stats['warmups'] += 1
+            try:
+                pooled.warm = bool(self.warmup(pooled.driver))
+            except Exception as e:
+                logging.error(f"Error calentando driver: {e}")
+                pooled.warm = False
+            return pooled.warm
+
+        pooled.warm = True
+        return True
+
+    def acquire(self):
+        """Obtener un driver calentado del pool (o None si no se pudo)"""
+        deadline = time.monotonic() + self.acquire_timeout
+
+        while True:
+            pooled = None
+            with self._lock:
+                if self._closed:
+                    return None
+                while not self._idle and self._created >= self.size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        logging.error("❌ Timeout esperando un driver libre del pool")
+                        return None
+                    self._lock.wait(remaining)
+                if self._idle:
+                    pooled = self._idle.popleft()
+                else:
+                    self._created += 1
+
+            if pooled is None:
+                pooled = self._create()
+                if pooled is None:
+                    return None
+
+            reason = self._is_expired(pooled)
+            if reason:
+                self._quit(pooled, reason)
+                continue
+
+            if not self._prepare(pooled):
+                self._quit(pooled, "fallo al calentar")
+                if time.monotonic() >= deadline:
+                    return None
+                continue
+
+            pooled.uses += 1
+            self.stats['leases'] += 1
+            return pooled
+
+    def release(self, pooled, healthy=True):
+        """Devolver un driver al pool; si la verificación falló se recicla"""
+        if pooled is None:
+            return
+
+        if not healthy:
+            self._quit(pooled, "fallo en verificación")
+            return
+
+        with self._lock:
+            if not self._closed:
+                self._idle.append(pooled)
+                self._lock.notify()
+                return
+
+        self._quit(pooled, "pool cerrado")
+
+    def close(self):
+        """Cerrar todos los drivers inactivos del pool"""
+        with self._lock:
+            self._closed = True
+            idle = list(self._idle)
+            self._idle.clear()
+            self._lock.notify_all()
+
+        for pooled in idle:
+            self._quit(pooled, "pool cerrado")
+
+        if idle:
+            logging.info("WebDrivers del pool cerrados")
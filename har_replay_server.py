@@ -0,0 +1,402 @@
+#!/usr/bin/env python3
+"""
+Servidor local que imita el sitio de la Xunta a partir de cies_manual_flow.har
+Sirve inicio, iniciarReserva, recuperarCalendario y recuperarPlazasTotales
+(y la página de aceptacion) con sesión por cookie y CSRF token como el real,
+y permite programar cambios de estado:
+    open      abrir plazas en una fecha        {"at": 30, "action": "open", "date": "02/08/2025", "slots": 4}
+    close     cerrar plazas en una fecha       {"at": 90, "action": "close", "date": "02/08/2025"}
+    rotate_csrf   invalidar todos los tokens   {"at": 60, "action": "rotate_csrf"}
+    reject    redirigir todo a aceptacion      {"at": 120, "action": "reject", "duration": 20}
+    expire_sessions   olvidar todas las sesiones
+
+Uso:
+    python har_replay_server.py --port 8765 --scenario har_replay_scenario.example.json --latency 0.15
+    SITE_ORIGIN=http://127.0.0.1:8765 python main_optimized.py
+
+GET /__replay/stats devuelve el número de peticiones por endpoint (para benchmarks).
+"""
+
+import argparse
+import json
+import logging
+import os
+import secrets
+import threading
+import time
+from calendar import monthrange
+from collections import Counter
+from datetime import date, datetime
+from string import Template
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+from zoneinfo import ZoneInfo
+from config import SITE_TIMEZONE
+
+HAR_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cies_manual_flow.har')
+PREFIX = '/illasr'
+SESSION_COOKIE = 'JSESSIONID'
+STATS_PATH = '/__replay/stats'
+SITE_TZ = ZoneInfo(SITE_TIMEZONE)
+
+DEFAULT_PLAZAS_TEMPLATE = {
+    'existenDatos': True, 'plazasOcupadas': '0', 'textoPlazasOcupadas': 'Prazas libres: ',
+    'fecha': '', 'diaLibre': False
+}
+
+INICIO_HTML = """<!DOCTYPE html>
+<html><head><title>Autorización Illas Atlánticas</title></head>
+<body>
+  <a href="{prefix}/iniciarReserva">Visitantes Illas Cíes</a>
+</body></html>"""
+
+# Página de solicitud con un datepicker mínimo con las clases de jQuery UI:
+# al elegir un día se consulta recuperarPlazasTotales y se muestra "Prazas libres: N"
+RESERVA_HTML = Template("""<!DOCTYPE html>
+<html><head>
+  <title>Solicitude de autorización</title>
+  <meta name="_csrf_header" content="X-CSRF-TOKEN"/>
+  <meta name="_csrf" content="$token"/>
+</head>
+<body>
+  <form id="solicitude"><input type="hidden" name="_csrf" value="$token"/>
+    <input type="text" id="fecha" name="fecha" placeholder="Data da visita" readonly/>
+  </form>
+  <div id="ui-datepicker-div" class="ui-datepicker" style="display:none">
+    <div class="ui-datepicker-header">
+      <a class="ui-datepicker-prev" href="#">Ant</a> <a class="ui-datepicker-next" href="#">Seg</a>
+      <div class="ui-datepicker-title"><span class="ui-datepicker-month"></span> <span class="ui-datepicker-year"></span></div>
+    </div>
+    <table class="ui-datepicker-calendar"><tbody></tbody></table>
+  </div>
+  <div id="plazas"></div>
+  <script>
+    var MESES = ['Xaneiro', 'Febreiro', 'Marzo', 'Abril', 'Maio', 'Xuño', 'Xullo', 'Agosto', 'Setembro', 'Outubro', 'Novembro', 'Decembro'];
+    var picker = document.getElementById('ui-datepicker-div');
+    var shown = new Date();
+    shown.setDate(1);
+
+    function pad(n) { return (n < 10 ? '0' : '') + n; }
+
+    function render() {
+      picker.querySelector('.ui-datepicker-month').textContent = MESES[shown.getMonth()];
+      picker.querySelector('.ui-datepicker-year').textContent = shown.getFullYear();
+      var days = new Date(shown.getFullYear(), shown.getMonth() + 1, 0).getDate();
+      var row = '', html = '';
+      for (var d = 1; d <= days; d++) {
+        row += '<td class="ui-datepicker-day"><a href="#" data-day="' + d + '">' + d + '</a></td>';
+        if (d % 7 === 0 || d === days) { html += '<tr>' + row + '</tr>'; row = ''; }
+      }
+      picker.querySelector('tbody').innerHTML = html;
+    }
+
+    function select(day) {
+      var fecha = pad(day) + '/' + pad(shown.getMonth() + 1) + '/' + shown.getFullYear();
+      document.getElementById('fecha').value = fecha;
+      picker.style.display = 'none';
+      fetch('$prefix/recuperarPlazasTotales', {
+        method: 'POST',
+        headers: {'Content-Type': 'application/x-www-form-urlencoded; charset=UTF-8', 'X-CSRF-TOKEN': '$token'},
+        body: 'fecha=' + encodeURIComponent(fecha) + '&numPlazas=1&idIsla=1&idTipoCupo='
+      }).then(function (r) { return r.json(); }).then(function (data) {
+        document.getElementById('plazas').textContent = data.textoPlazasOcupadas + data.plazasOcupadas;
+      });
+    }
+
+    document.getElementById('fecha').addEventListener('click', function () { render(); picker.style.display = 'block'; });
+    picker.querySelector('.ui-datepicker-next').addEventListener('click', function (e) { e.preventDefault(); shown.setMonth(shown.getMonth() + 1); render(); });
+    picker.querySelector('.ui-datepicker-prev').addEventListener('click', function (e) { e.preventDefault(); shown.setMonth(shown.getMonth() - 1); render(); });
+    picker.querySelector('tbody').addEventListener('click', function (e) {
+      if (e.target.dataset.day) { e.preventDefault(); select(parseInt(e.target.dataset.day, 10)); }
+    });
+  </script>
+</body></html>""")
+
+ACEPTACION_HTML = """<!DOCTYPE html>
+<html><head><title>Aceptación</title></head>
+<body><p>Produciuse un erro.</p><a href="{prefix}/inicio">Ir ao inicio</a></body></html>"""
+
+
+def parse_fecha(text):
+    """'02/08/2025' o '2/8/2025' -> date"""
+    return datetime.strptime(text.strip(), '%d/%m/%Y').date()
+
+
+def load_har(har_file=HAR_FILE):
+    """Extraer del HAR la plantilla de plazas y el estado del calendario"""
+    with open(har_file) as f:
+        har = json.load(f)
+
+    template = dict(DEFAULT_PLAZAS_TEMPLATE)
+    calendar = {}
+    for entry in har['log']['entries']:
+        url = entry['request']['url']
+        text = entry['response']['content'].get('text') or ''
+        if url.endswith('recuperarPlazasTotales') and text:
+            template = json.loads(text)
+        elif url.endswith('recuperarCalendario') and text:
+            for day in json.loads(text):
+                day_date = datetime.fromtimestamp(int(day['date']) / 1000, tz=SITE_TZ).date()
+                calendar[day_date] = str(day['disponible'])
+    return template, calendar
+
+
+class ReplayState:
+    """Estado simulado del sitio: plazas por fecha, sesiones, CSRF y rechazos"""
+
+    def __init__(self, har_file=HAR_FILE, default_status='2', latency=0.0):
+        self.plazas_template, self.calendar = load_har(har_file)
+        self.default_status = default_status
+        self.latency = latency  # segundos añadidos a cada respuesta para imitar la red real
+        self.slots = {}  # date -> plazas libres
+        self.sessions = {}  # id de sesión -> CSRF token
+        self.reject_until = 0
+        self.started_at = time.monotonic()
+        self.events = []
+        self.requests = Counter()
+        self.lock = threading.RLock()
+
+    # Eventos programados
+
+    def schedule(self, at, action, **params):
+        """Programar una acción a los `at` segundos del arranque"""
+        with self.lock:
+            self.events.append((at, action, params))
+            self.events.sort(key=lambda event: event[0])
+
+    def load_scenario(self, path):
+        with open(path) as f:
+            for event in json.load(f):
+                event = dict(event)
+                self.schedule(event.pop('at', 0), event.pop('action'), **event)
+
+    def run_due_events(self):
+        elapsed = time.monotonic() - self.started_at
+        with self.lock:
+            while self.events and self.events[0][0] <= elapsed:
+                _, action, params = self.events.pop(0)
+                self.apply(action, **params)
+
+    def apply(self, action, **params):
+        """Aplicar una acción inmediatamente"""
+        with self.lock:
+            if action == 'open':
+                day = parse_fecha(params['date'])
+                self.slots[day] = int(params.get('slots', 1))
+                self.calendar[day] = params.get('status', '1')
+            elif action == 'close':
+                day = parse_fecha(params['date'])
+                self.slots[day] = 0
+                self.calendar[day] = params.get('status', '2')
+            elif action == 'rotate_csrf':
+                for session_id in self.sessions:
+                    self.sessions[session_id] = secrets.token_hex(16)
+            elif action == 'reject':
+                self.reject_until = time.monotonic() + float(params.get('duration', 30))
+            elif action == 'expire_sessions':
+                self.sessions.clear()
+            else:
+                raise ValueError(f"Acción desconocida: {action}")
+        logging.info(f"🎬 Replay: {action} {params or ''}")
+
+    # Consultas
+
+    def is_rejecting(self):
+        return time.monotonic() < self.reject_until
+
+    def new_session(self):
+        session_id = secrets.token_hex(16).upper()
+        with self.lock:
+            self.sessions[session_id] = secrets.token_hex(16)
+        return session_id
+
+    def csrf_token(self, session_id):
+        """CSRF token de la sesión, o None si no existe o la ha borrado 'expire_sessions'"""
+        with self.lock:
+            return self.sessions.get(session_id)
+
+    def calendar_payload(self, year, month):
+        """Respuesta de recuperarCalendario: epoch en ms de medianoche local + disponible"""
+        days = []
+        for day_number in range(1, monthrange(year, month)[1] + 1):
+            day = date(year, month, day_number)
+            midnight = datetime(year, month, day_number, tzinfo=SITE_TZ)
+            days.append({
+                'date': int(midnight.timestamp() * 1000),
+                'disponible': self.calendar.get(day, self.default_status)
+            })
+        return days
+
+    def plazas_payload(self, day):
+        payload = dict(self.plazas_template)
+        payload['fecha'] = day.strftime('%d/%m/%Y')
+        payload['plazasOcupadas'] = str(self.slots.get(day, 0))
+        return payload
+
+
+class ReplayHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # keep-alive como el sitio real
+    server_version = 'Apache'
+    disable_nagle_algorithm = True  # cabeceras y cuerpo van en escrituras separadas
+
+    @property
+    def state(self):
+        return self.server.state
+
+    def log_message(self, format, *args):
+        logging.debug(f"Replay {self.address_string()} - {format % args}")
+
+    # Respuestas
+
+    def send_body(self, status, body, content_type='text/html;charset=UTF-8', headers=None):
+        if isinstance(body, str):
+            body = body.encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('Cache-Control', 'no-cache, no-store, max-age=0, must-revalidate')
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def redirect(self, location, headers=None):
+        self.send_body(302, '', headers=dict(headers or {}, Location=location))
+
+    def session_id(self):
+        for part in (self.headers.get('Cookie') or '').split(';'):
+            name, _, value = part.strip().partition('=')
+            if name == SESSION_COOKIE and value in self.state.sessions:
+                return value
+        return None
+
+    def read_form(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        body = self.rfile.read(length).decode('utf-8') if length else ''
+        return {key: values[0] for key, values in parse_qs(body, keep_blank_values=True).items()}
+
+    # Enrutado
+
+    def route(self, method):
+        path = urlparse(self.path).path
+        if path == STATS_PATH:
+            # Fuera de los contadores y sin latencia: no altera lo que mide
+            return self.send_body(200, json.dumps(dict(self.state.requests)), 'application/json')
+
+        self.state.run_due_events()
+        endpoint = path[len(PREFIX):].strip('/') if path.startswith(PREFIX) else path.strip('/')
+        self.state.requests[endpoint] += 1
+        if self.state.latency:
+            time.sleep(self.state.latency)
+
+        if endpoint == 'aceptacion':
+            return self.send_body(200, ACEPTACION_HTML.format(prefix=PREFIX))
+
+        if self.state.is_rejecting():
+            return self.redirect(f"{PREFIX}/aceptacion")
+
+        handler = getattr(self, f"{method}_{endpoint}", None)
+        if handler is None:
+            return self.send_body(404, 'Not Found', 'text/plain')
+        return handler()
+
+    def do_GET(self):
+        self.route('get')
+
+    def do_POST(self):
+        self.route('post')
+
+    def get_inicio(self):
+        session_id = self.session_id() or self.state.new_session()
+        self.send_body(200, INICIO_HTML.format(prefix=PREFIX), headers={
+            'Set-Cookie': f"{SESSION_COOKIE}={session_id}; Path={PREFIX}; HttpOnly"
+        })
+
+    def get_iniciarReserva(self):
+        session_id = self.session_id()
+        token = self.state.csrf_token(session_id)
+        if token is None:
+            # Sin sesión o caducada entre medias: el sitio abre una nueva
+            session_id = self.state.new_session()
+            token = self.state.csrf_token(session_id)
+        self.send_body(200, RESERVA_HTML.substitute(token=token, prefix=PREFIX), headers={
+            'Set-Cookie': f"{SESSION_COOKIE}={session_id}; Path={PREFIX}; HttpOnly"
+        })
+
+    def check_api_session(self):
+        """Sin sesión -> aceptacion; CSRF incorrecto -> 403 (como Spring Security)"""
+        token = self.state.csrf_token(self.session_id())
+        if token is None:
+            self.redirect(f"{PREFIX}/aceptacion")
+            return False
+        if self.headers.get('X-CSRF-TOKEN') != token:
+            self.send_body(403, 'Forbidden', 'text/plain')
+            return False
+        return True
+
+    def post_recuperarPlazasTotales(self):
+        form = self.read_form()
+        if not self.check_api_session():
+            return
+        if not form.get('fecha'):
+            return self.send_body(200, '', 'text/plain')  # como en el HAR: sin fecha, cuerpo vacío
+        payload = self.state.plazas_payload(parse_fecha(form['fecha']))
+        self.send_body(200, json.dumps(payload, ensure_ascii=False, separators=(',', ':')), 'application/json;charset=UTF-8')
+
+    def post_recuperarCalendario(self):
+        form = self.read_form()
+        if not self.check_api_session():
+            return
+        payload = self.state.calendar_payload(int(form['ano']), int(form['mes']))
+        self.send_body(200, json.dumps(payload, separators=(',', ':')), 'text/plain;charset=UTF-8')
+
+
+class ReplayServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, state):
+        super().__init__(address, ReplayHandler)
+        self.state = state
+
+    @property
+    def origin(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+
+def start_replay_server(state=None, host='127.0.0.1', port=0):
+    """Arrancar el servidor en un hilo (para pruebas y benchmarks); devuelve el servidor"""
+    server = ReplayServer((host, port), state or ReplayState())
+    threading.Thread(target=server.serve_forever, name='har-replay', daemon=True).start()
+    logging.info(f"🎭 Servidor de replay escuchando en {server.origin}{PREFIX}")
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Servidor local de replay del sitio de la Xunta")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--har', default=HAR_FILE, help="HAR con las respuestas de la API")
+    parser.add_argument('--scenario', help="JSON con la lista de eventos programados")
+    parser.add_argument('--latency', type=float, default=0.0, help="Segundos de latencia por respuesta")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    state = ReplayState(args.har, latency=args.latency)
+    if args.scenario:
+        state.load_scenario(args.scenario)
+        logging.info(f"📜 {len(state.events)} eventos programados")
+
+    server = ReplayServer((args.host, args.port), state)
+    logging.info(f"🎭 Servidor de replay en {server.origin}{PREFIX} (SITE_ORIGIN={server.origin})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        logging.info("🛑 Servidor de replay detenido")
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
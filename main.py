@@ -4,13 +4,16 @@ Bot de monitoreo para autorizaciones de Islas Cíes
 Monitorea la disponibilidad de plazas para una fecha específica
 """
 
-import time
 import schedule
 import logging
 from datetime import datetime, timedelta
-from scraper import CiesScraper
+from strategy_chain import StrategyChain
 from notifier import Notifier
 from stats import BotStats
+from poll_scheduler import PollScheduler
+from phase_timer import PhaseTimer, format_timings
+from alert_latency import AlertTrace, format_alert_latency
+import metrics
 from config import *
 
 # Configurar logging
@@ -25,13 +28,25 @@ logging.basicConfig(
 
 class CiesMonitor:
     def __init__(self):
-        self.scraper = CiesScraper()
+        self.scraper = StrategyChain()  # API, híbrido y HTML según SCRAPER_STRATEGIES
         self.notifier = Notifier()
         self.stats = BotStats()
         self.last_check = None
         self.consecutive_errors = 0
         self.max_errors = 5
         self.last_hourly_report = datetime.now().replace(minute=0, second=0, microsecond=0)
+        # Modo continuo: intervalo base de 1s, pero el presupuesto POLL_HOURLY_BUDGET marca el ritmo
+        # sostenido (1200 peticiones/h por defecto = una verificación cada ~3s); en la ventana
+        # rápida tras un cambio se permite bajar a 1s mientras quede presupuesto
+        self.scheduler = PollScheduler(base_interval=1, min_interval=1)
+        self.last_slots = None
+        self.last_rejections = 0
+        self.timer = PhaseTimer()
+        self.metrics_server = None
+        
+        # Métricas leídas del estado en memoria al servir /metrics
+        metrics.CONSECUTIVE_FAILURES.set_function(lambda: self.consecutive_errors)
+        metrics.REJECTIONS.set_function(lambda: self.scraper.rejections)
         
     def check_availability(self):
         """Verificar disponibilidad y enviar alertas si es necesario"""
@@ -40,10 +55,18 @@ class CiesMonitor:
             logging.info("Iniciando verificación de disponibilidad...")
             
             # Verificar disponibilidad
+            self.timer.reset()
             result = self.scraper.check_availability()
+            self.record_poll(result)
+            
+            if result is not None and result.get('status') == 'circuit_open':
+                # Ninguna estrategia disponible: el planificador espera al reintento, no cuenta como error
+                logging.info(f"⏳ Verificación aplazada {result['retry_in'] or 0:.0f}s (circuitos abiertos o reintentos diferidos)")
+                return True
             
             if result is None:
                 self.consecutive_errors += 1
+                self.record_timings(None)
                 self.stats.record_attempt(0, had_error=True)
                 logging.error(f"Error en verificación (intento {self.consecutive_errors}/{self.max_errors})")
                 
@@ -56,22 +79,30 @@ class CiesMonitor:
             self.consecutive_errors = 0
             
             # Registrar estadísticas
-            self.stats.record_attempt(result['available_slots'], had_error=False)
+            with self.timer.span('stats'):
+                self.stats.record_attempt(result['available_slots'], had_error=False)
             
             # Mostrar resultado
-            logging.info(f"Resultado: {result['available_slots']} plazas disponibles para {result['date']}")
+            logging.info(f"Resultado: {result['available_slots']} plazas disponibles para {result['date']} (estrategia {result['strategy']})")
             
             # Manejar diferentes estados
             if result['detection_error']:
                 # Error de detección - notificar a los usuarios
                 logging.warning("⚠️ Error de detección de plazas - notificando a usuarios")
-                self.send_detection_error_alert(result)
+                with self.timer.span('notify'):
+                    self.send_detection_error_alert(result)
             elif result['has_availability']:
                 # Hay plazas disponibles
+                trace = AlertTrace(result.get('upstream_at'))
+                trace.mark('detected')
                 logging.info("🎉 ¡PLAZAS DISPONIBLES ENCONTRADAS! Enviando alertas...")
                 
                 # Enviar alertas
-                if self.notifier.send_alert(result):
+                with self.timer.span('notify'):
+                    trace.mark('enqueued')
+                    sent = self.notifier.send_alert(result, trace=trace)
+                self.record_alert_latency(trace)
+                if sent:
                     logging.info("✅ Alertas enviadas exitosamente")
                 else:
                     logging.error("❌ Error al enviar alertas")
@@ -80,6 +111,7 @@ class CiesMonitor:
                 logging.info("😔 No hay plazas disponibles aún...")
             
             self.last_check = datetime.now()
+            self.record_timings(result)
             
             # Verificar si es hora de enviar resumen horario
             self.check_hourly_report()
@@ -91,6 +123,41 @@ class CiesMonitor:
             self.stats.record_attempt(0, had_error=True)
             return True
     
+    def record_alert_latency(self, trace):
+        """Guardar y publicar el tiempo desde la lectura de la página hasta cada entrega"""
+        summary = trace.summary()
+        self.stats.record_alert_latency(summary)
+        metrics.record_alert_latency(summary)
+        logging.info(f"⏱️ Tiempo hasta la alerta: {format_alert_latency(summary)}")
+    
+    def record_timings(self, result):
+        """Unir los tiempos del scraper y del monitor, adjuntarlos al resultado y acumularlos"""
+        timings = {**self.scraper.last_timings, **self.timer.snapshot()}
+        if result is not None:
+            result['timings'] = timings
+        self.stats.record_timings(timings)
+        logging.info(f"⏱️ Fases: {format_timings(timings)}")
+        
+        if result is None or result['detection_error']:
+            outcome = 'error'
+        else:
+            outcome = 'available' if result['has_availability'] else 'unavailable'
+        metrics.record_check(outcome, timings)
+    
+    def record_poll(self, result):
+        """Registrar la verificación en el planificador adaptativo"""
+        ok = result is not None and not result['detection_error']
+        changed = ok and self.last_slots is not None and result['available_slots'] != self.last_slots
+        if ok:
+            self.last_slots = result['available_slots']
+        
+        rejections = self.scraper.rejections
+        retry_in = result.get('retry_in') if result is not None else None
+        requests = 0 if result is not None and result.get('status') == 'circuit_open' else 1
+        self.scheduler.record_cycle(ok, requests=requests, rejected=rejections > self.last_rejections,
+                                    changed=changed, retry_in=retry_in)
+        self.last_rejections = rejections
+    
     def check_hourly_report(self):
         """Verificar si es hora de enviar resumen horario"""
         current_hour = datetime.now().replace(minute=0, second=0, microsecond=0)
@@ -126,8 +193,9 @@ class CiesMonitor:
         """Ejecutar monitoreo continuo sin intervalos"""
         logging.info("🚀 Iniciando bot de monitoreo de Islas Cíes")
         logging.info(f"📅 Fecha objetivo: {TARGET_DATE}")
-        logging.info(f"⚡ Modo: Verificación continua (sin intervalos)")
+        logging.info(f"⚡ Modo: Verificación continua con planificador adaptativo ({self.scheduler.describe()})")
         logging.info(f"🌐 URL objetivo: {TARGET_URL}")
+        self.metrics_server = metrics.start_metrics_server()
         
         # Ejecutar verificación inicial
         self.check_availability()
@@ -140,8 +208,8 @@ class CiesMonitor:
                     logging.critical("🛑 Bot detenido debido a errores críticos")
                     break
                 
-                # Pequeña pausa para no saturar el servidor (1 segundo)
-                time.sleep(1)
+                # Pausa adaptativa para no saturar el servidor (la marca el presupuesto horario en condiciones normales)
+                self.scheduler.wait()
                 
         except KeyboardInterrupt:
             logging.info("🛑 Bot detenido por el usuario")
@@ -164,7 +232,12 @@ class CiesMonitor:
             if critical_error:
                 self.send_critical_error_alert()
             
+            self.stats.flush()
+            self.scraper.close_driver()
+            logging.info(self.scraper.get_summary())
             self.notifier.close()
+            if self.metrics_server:
+                self.metrics_server.shutdown()
             logging.info("🧹 Recursos limpiados")
         except Exception as e:
             logging.error(f"Error en cleanup: {e}")
@@ -12,7 +12,15 @@ from datetime import datetime
 from scraper_hybrid import HybridCiesScraper
 from notifier import Notifier
 from stats import BotStats
-from config import TARGET_DATE, TARGET_URL, CHECK_INTERVAL, CRITICAL_ERROR_THRESHOLD, CRITICAL_ERROR_TIME_THRESHOLD
+from query_matrix import parse_watchers, QueryPlanner, check_watchers
+from async_engine import AsyncQueryEngine
+from poll_scheduler import PollScheduler
+from retry_policy import classify_error
+from phase_timer import PhaseTimer, format_timings
+from alert_latency import AlertTrace, format_alert_latency
+import metrics
+from config import TARGET_URL, RESERVA_URL, CRITICAL_ERROR_THRESHOLD, CRITICAL_ERROR_TIME_THRESHOLD
+from config import WATCH_DATES, WATCH_ISLANDS, WATCH_GROUP_SIZES, WATCH_QUOTA_TYPES, WATCHERS, MAX_SWEEPS_PER_CYCLE
 
 # Configurar logging
 logging.basicConfig(
@@ -27,39 +35,49 @@ logging.basicConfig(
 class OptimizedCiesMonitor:
     def __init__(self):
         self.scraper = HybridCiesScraper()
+        self.engine = AsyncQueryEngine(self.scraper)
+        self.scheduler = PollScheduler()
+        self.timer = PhaseTimer()
+        self.cycle_started = None
+        self.last_states = {}  # watch_key -> (plazas, estado del calendario) del ciclo anterior
+        self.last_request_count = 0
+        self.last_rejections = 0
         self.notifier = Notifier()
         self.stats = BotStats()
+        self.planner = QueryPlanner(
+            parse_watchers(WATCHERS, WATCH_DATES, WATCH_ISLANDS, WATCH_GROUP_SIZES, WATCH_QUOTA_TYPES),
+            max_sweeps_per_cycle=MAX_SWEEPS_PER_CYCLE
+        )
         self.consecutive_errors = 0
         self.max_errors = 5
         self.last_check = None
         self.last_successful_check = None
         self.consecutive_failures = 0
         self.last_critical_alert = None
+        self.metrics_server = None
+        
+        # Métricas leídas del estado en memoria al servir /metrics
+        metrics.CONSECUTIVE_FAILURES.set_function(lambda: self.consecutive_failures)
+        metrics.UPSTREAM_REQUESTS.set_function(lambda: self.scraper.session.request_count)
+        metrics.REJECTIONS.set_function(lambda: self.scraper.rejections)
         
     def check_availability(self):
         """Verificar disponibilidad usando scraper híbrido"""
         try:
             logging.info("=" * 50)
             logging.info("Iniciando verificación optimizada...")
+            self.start_cycle_timings()
             
-            # Verificar disponibilidad
-            result = self.scraper.check_availability_hybrid()
+            # Verificar las fechas vigiladas (un barrido de calendario por consulta y mes)
+            with self.timer.span('watchers'):
+                results = check_watchers(self.scraper, self.planner, engine=self.engine)
             
-            if result is None:
-                self.consecutive_errors += 1
-                self.consecutive_failures += 1
-                self.stats.record_attempt(0, had_error=True)
-                logging.error(f"Error en verificación (intento {self.consecutive_errors}/{self.max_errors})")
-                
-                # Verificar si debemos enviar alerta crítica
-                self.check_critical_error_conditions()
-                
-                if self.consecutive_errors >= self.max_errors:
-                    logging.critical("Demasiados errores consecutivos, deteniendo bot")
-                    self.send_critical_error_notification()
-                    return False
-                
-                return True
+            # Informar al planificador (errores, rechazos, cambios y peticiones gastadas)
+            self.record_poll(results)
+            
+            if not results:
+                logging.critical("No quedan fechas futuras que vigilar, deteniendo bot")
+                return False
             
             # Resetear contadores si la verificación fue exitosa
             if self.consecutive_errors > 0:
@@ -67,32 +85,51 @@ class OptimizedCiesMonitor:
                 self.consecutive_errors = 0
             
             # Resetear contador de fallos si obtuvimos datos válidos
-            if result['available_slots'] != -1:
+            valid_results = [r for r in results if r['available_slots'] != -1]
+            if valid_results:
                 if self.consecutive_failures > 0:
                     logging.info(f"✅ Datos obtenidos después de {self.consecutive_failures} fallos consecutivos")
                 self.consecutive_failures = 0
                 self.last_successful_check = datetime.now()
+            else:
+                self.consecutive_failures += 1
+                self.check_critical_error_conditions()
             
-            # Procesar resultado
-            slots = result['available_slots']
-            status = result['status']
-            method = result['method']
+            # Sin cambios en ninguna fecha: solo se cuenta la verificación (sin logs, alertas ni escritura a disco)
+            changed_results = [r for r in results if r.get('changed', True)]
+            if not changed_results:
+                self.stats.record_unchanged()
+                self.record_cycle_timings(results, unchanged=True)
+                self.check_hourly_summary()
+                return True
             
-            # Registrar estadísticas
-            self.stats.record_attempt(slots, had_error=(slots == -1))
+            # Registrar estadísticas (globales y por fecha)
+            per_date = {r['watch_key']: r['available_slots'] for r in results}
+            max_slots = max((r['available_slots'] for r in valid_results), default=0)
+            with self.timer.span('stats'):
+                self.stats.record_attempt(max_slots, had_error=len(valid_results) < len(results), per_date=per_date)
             
-            # Manejar diferentes estados
-            if slots == -1:
-                # Error de detección
-                logging.warning("⚠️ Error de detección de plazas")
-                # No enviar notificación de error de detección individual
-            elif slots > 0:
-                # ¡PLAZAS DISPONIBLES!
-                logging.info(f"🎉 ¡PLAZAS DISPONIBLES ENCONTRADAS! ({slots} plazas)")
-                self.send_availability_alert(slots, result)
-            else:
-                # No hay plazas disponibles
-                logging.info(f"😔 No hay plazas disponibles (confirmado via {method})")
+            # Manejar el estado de cada fecha que cambió
+            for result in changed_results:
+                slots = result['available_slots']
+                
+                if slots == -1:
+                    # Error de detección
+                    logging.warning(f"⚠️ Error de detección de plazas para {result['watch_key']}")
+                    # No enviar notificación de error de detección individual
+                elif slots > 0:
+                    # ¡PLAZAS DISPONIBLES!
+                    trace = AlertTrace(result.get('upstream_at'))
+                    trace.mark('detected')
+                    logging.info(f"🎉 ¡PLAZAS DISPONIBLES ENCONTRADAS! ({slots} plazas el {result['watch_key']})")
+                    with self.timer.span('notify'):
+                        self.send_availability_alert(slots, result, trace)
+                    self.record_alert_latency(trace)
+                else:
+                    # No hay plazas disponibles
+                    logging.info(f"😔 No hay plazas disponibles el {result['watch_key']} (confirmado via {result['method']})")
+            
+            self.record_cycle_timings(results)
             
             # Enviar resumen horario si es necesario
             self.check_hourly_summary()
@@ -101,10 +138,83 @@ class OptimizedCiesMonitor:
             
         except Exception as e:
             logging.error(f"Error en check_availability: {e}")
+            metrics.record_check('error')
+            self.record_poll([], error=e)
             self.consecutive_errors += 1
             self.consecutive_failures += 1
+            self.stats.record_attempt(0, had_error=True)
+            logging.error(f"Error en verificación (intento {self.consecutive_errors}/{self.max_errors})")
+            
+            # Verificar si debemos enviar alerta crítica
+            self.check_critical_error_conditions()
+            
+            if self.consecutive_errors >= self.max_errors:
+                logging.critical("Demasiados errores consecutivos, deteniendo bot")
+                self.send_critical_error_notification()
+                return False
+            
             return True
     
+    def start_cycle_timings(self):
+        """Poner a cero los tiempos por fase del monitor y del scraper"""
+        self.timer.reset()
+        self.scraper.timer.reset()
+        self.cycle_started = time.perf_counter()
+    
+    def record_cycle_timings(self, results, unchanged=False):
+        """Adjuntar los tiempos por fase del ciclo a los resultados y acumularlos en estadísticas y métricas"""
+        self.timer.add('cycle', time.perf_counter() - self.cycle_started)
+        # Las fases del scraper suman el tiempo de todas las peticiones paralelas
+        timings = {**self.scraper.timer.snapshot(), **self.timer.snapshot()}
+        for result in results:
+            result['timings'] = timings
+        self.stats.record_timings(timings)
+        logging.debug(f"⏱️ Fases del ciclo: {format_timings(timings)}")
+        
+        valid_results = [r for r in results if r['available_slots'] != -1]
+        if not valid_results:
+            outcome = 'error'
+        elif unchanged:
+            outcome = 'unchanged'
+        elif any(r['available_slots'] > 0 for r in valid_results):
+            outcome = 'available'
+        else:
+            outcome = 'unavailable'
+        metrics.record_check(outcome, timings)
+    
+    def record_poll(self, results, error=None):
+        """Registrar el ciclo en el planificador adaptativo y en la política de reintentos del scraper"""
+        states = {r['watch_key']: (r['available_slots'], r.get('calendar_status')) for r in results if r['available_slots'] != -1}
+        changed = any(key in self.last_states and self.last_states[key] != state for key, state in states.items())
+        self.last_states.update(states)
+        
+        request_count = self.scraper.session.request_count
+        rejected = self.scraper.rejections > self.last_rejections
+        retry_in = None
+        if states:
+            self.scraper.retry_policy.record_success()
+        else:
+            # Ciclo sin datos: la política decide el reintento (y al escalar se descarta la sesión)
+            failure = self.scraper.record_failure('calendar_sweep', self.classify_cycle_error(error, rejected))
+            retry_in = failure['retry_in']
+        
+        self.scheduler.record_cycle(
+            ok=bool(states),
+            requests=request_count - self.last_request_count,
+            rejected=rejected,
+            changed=changed,
+            retry_in=retry_in
+        )
+        self.last_request_count = request_count
+        self.last_rejections = self.scraper.rejections
+    
+    def classify_cycle_error(self, error, rejected):
+        """Clase de error del ciclo: la excepción, la de la primera petición fallida, el rechazo o sin datos"""
+        error = error or next(iter(self.engine.errors), None)
+        if error is not None:
+            return classify_error(error)
+        return 'rejected' if rejected else 'no_data'
+    
     def check_critical_error_conditions(self):
         """Verificar si se cumplen las condiciones para alerta crítica"""
         now = datetime.now()
@@ -131,8 +241,15 @@ class OptimizedCiesMonitor:
             self.send_critical_error_notification()
             self.last_critical_alert = now
     
-    def send_availability_alert(self, slots, result):
-        """Enviar alerta de disponibilidad"""
+    def record_alert_latency(self, trace):
+        """Guardar y publicar el tiempo desde la respuesta upstream hasta cada entrega"""
+        summary = trace.summary()
+        self.stats.record_alert_latency(summary)
+        metrics.record_alert_latency(summary)
+        logging.info(f"⏱️ Tiempo hasta la alerta: {format_alert_latency(summary)}")
+    
+    def send_availability_alert(self, slots, result, trace=None):
+        """Enviar alerta de disponibilidad (trace: AlertTrace de la transición)"""
         try:
             message = f"""🚨 ¡PLAZAS DISPONIBLES ENCONTRADAS! 🚨
 
@@ -141,7 +258,7 @@ class OptimizedCiesMonitor:
 ⏰ Timestamp: {result['timestamp']}
 🔧 Método: {result['method']}
 
-🌐 Enlace directo: https://autorizacionillasatlanticas.xunta.gal/illasr/iniciarReserva
+🌐 Enlace directo: {RESERVA_URL}
 
 ¡Actúa rápido antes de que se agoten!""".strip()
             
@@ -150,10 +267,13 @@ class OptimizedCiesMonitor:
                 'available_slots': slots,
                 'date': result['date'],
                 'timestamp': result['timestamp'],
-                'method': result['method']
+                'method': result['method'],
+                'query': result.get('query')
             }
             
-            if self.notifier.send_alert(alert_result):
+            if trace:
+                trace.mark('enqueued')
+            if self.notifier.send_alert(alert_result, trace=trace):
                 logging.info("✅ Alertas de disponibilidad enviadas")
             else:
                 logging.error("❌ Error enviando alertas de disponibilidad")
@@ -223,6 +343,7 @@ No es necesario que hagas nada manualmente.
         
         # Enviar resumen cada hora (minuto 0)
         if current_time.minute == 0 and self.last_check != current_time.hour:
+            self.stats.flush()
             self.send_hourly_summary()
             self.last_check = current_time.hour
     
@@ -234,7 +355,7 @@ No es necesario que hagas nada manualmente.
             message = f"""📊 Resumen Horario - Bot Islas Cíes
 
 ⏰ Hora: {datetime.now().strftime('%H:%M')}
-📅 Fecha objetivo: {TARGET_DATE}
+📅 Fechas vigiladas: {self.planner.describe()}
 
 {stats_summary}
 
@@ -250,16 +371,17 @@ No es necesario que hagas nada manualmente.
     def run(self):
         """Ejecutar el bot optimizado"""
         logging.info("🚀 Iniciando bot optimizado de Islas Cíes...")
-        logging.info(f"📅 Fecha objetivo: {TARGET_DATE}")
-        logging.info(f"⏱️ Intervalo de verificación: {CHECK_INTERVAL} segundos")
+        logging.info(f"📅 Fechas vigiladas: {self.planner.describe()}")
+        logging.info(f"⏱️ Intervalo de verificación adaptativo: {self.scheduler.describe()}")
         logging.info(f"🛑 Máximo errores consecutivos: {self.max_errors}")
+        self.metrics_server = metrics.start_metrics_server()
         
         # Enviar notificación de inicio
         try:
             start_message = f"""🤖 Bot Optimizado Iniciado
 
-📅 Fecha objetivo: {TARGET_DATE}
-⏱️ Intervalo: {CHECK_INTERVAL} segundos
+📅 Fechas vigiladas: {self.planner.describe()}
+⏱️ Intervalo: {self.scheduler.describe()}
 🔧 Método: Híbrido (Selenium + API)
 
 El bot comenzará a monitorear automáticamente.""".strip()
@@ -274,8 +396,8 @@ El bot comenzará a monitorear automáticamente.""".strip()
                 if not self.check_availability():
                     break
                 
-                # Esperar antes de la siguiente verificación
-                time.sleep(CHECK_INTERVAL)
+                # Esperar lo que decida el planificador (backoff, ventana rápida, presupuesto)
+                self.scheduler.wait()
                 
         except KeyboardInterrupt:
             logging.info("🛑 Bot detenido por el usuario")
@@ -296,6 +418,14 @@ El bot comenzará a monitorear automáticamente.""".strip()
         except Exception as e:
             logging.error(f"Error inesperado en el bot: {e}")
             self.send_critical_error_notification()
+        
+        finally:
+            # Guardar contadores pendientes y cerrar el motor de consultas y los navegadores del pool
+            self.stats.flush()
+            self.engine.close()
+            self.scraper.close_driver()
+            if self.metrics_server:
+                self.metrics_server.shutdown()
 
 def main():
     """Función principal"""
@@ -0,0 +1,264 @@
+"""
+Métricas del bot en formato de texto de Prometheus (solo biblioteca estándar)
+Los contadores, gauges e histogramas viven en memoria; el endpoint /metrics
+solo los serializa (sin leer estadísticas de disco en cada scrape).
+Se activa con METRICS_PORT (0 = desactivado).
+"""
+
+import functools
+import logging
+import math
+import os
+import resource
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from config import METRICS_PORT, METRICS_HOST
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# Segundos: desde una llamada a la API hasta una verificación completa con Chrome
+PHASE_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+SEND_BUCKETS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+ALERT_BUCKETS = (0.5, 1, 2, 5, 10, 30, 60, 120, 300)
+
+
+def format_value(value):
+    if value == math.inf:
+        return '+Inf'
+    if isinstance(value, int):
+        return str(value)
+    return repr(float(value))
+
+
+def escape_label(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def format_labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{name}="{escape_label(value)}"' for name, value in labels) + '}'
+
+
+class Metric:
+    type_name = 'untyped'
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.values = {}  # valores de las etiquetas -> valor
+        self.function = None
+        self.lock = threading.Lock()
+
+    def key(self, labels):
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} espera las etiquetas {self.labelnames}, no {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def set_function(self, function):
+        """Leer el valor al servir /metrics (solo métricas sin etiquetas)"""
+        self.function = function
+
+    def samples(self):
+        """[(sufijo, etiquetas, valor)]"""
+        if self.function is not None:
+            try:
+                return [('', (), self.function())]
+            except Exception as e:
+                logging.debug(f"Métrica {self.name} no disponible: {e}")
+                return []
+        with self.lock:
+            return [('', tuple(zip(self.labelnames, key)), value) for key, value in sorted(self.values.items())]
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type_name}"]
+        for suffix, labels, value in self.samples():
+            lines.append(f"{self.name}{suffix}{format_labels(labels)} {format_value(value)}")
+        return lines
+
+
+class Counter(Metric):
+    type_name = 'counter'
+
+    def inc(self, amount=1, **labels):
+        key = self.key(labels)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+
+class Gauge(Metric):
+    type_name = 'gauge'
+
+    def set(self, value, **labels):
+        key = self.key(labels)
+        with self.lock:
+            self.values[key] = value
+
+
+class Histogram(Metric):
+    type_name = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=PHASE_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(float(bound) for bound in sorted(buckets)) + (math.inf,)
+
+    def observe(self, value, **labels):
+        key = self.key(labels)
+        with self.lock:
+            counts, total = self.values.get(key, ([0] * len(self.buckets), 0.0))
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+            self.values[key] = (counts, total + value)
+
+    def samples(self):
+        samples = []
+        with self.lock:
+            items = sorted((key, (list(counts), total)) for key, (counts, total) in self.values.items())
+        for key, (counts, total) in items:
+            labels = tuple(zip(self.labelnames, key))
+            for bound, count in zip(self.buckets, counts):
+                samples.append(('_bucket', labels + (('le', format_value(bound)),), count))
+            samples.append(('_sum', labels, total))
+            samples.append(('_count', labels, counts[-1]))
+        return samples
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self.metrics = []
+        self.lock = threading.Lock()
+
+    def register(self, metric):
+        with self.lock:
+            self.metrics.append(metric)
+        return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name, documentation, labelnames=()):
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=PHASE_BUCKETS):
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self):
+        with self.lock:
+            metrics = list(self.metrics)
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+def process_rss_bytes():
+    """RSS actual del proceso (/proc en Linux; pico de ru_maxrss en otros sistemas)"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == 'darwin' else peak * 1024
+
+
+REGISTRY = MetricsRegistry()
+
+CHECKS = REGISTRY.counter('cies_checks_total', "Verificaciones por resultado", ['outcome'])
+CONSECUTIVE_FAILURES = REGISTRY.gauge('cies_consecutive_failures', "Verificaciones fallidas seguidas")
+LAST_SUCCESS = REGISTRY.gauge('cies_last_success_timestamp_seconds', "Hora de la última verificación con datos")
+CHECK_PHASE_SECONDS = REGISTRY.histogram('cies_check_phase_seconds', "Duración de cada fase de una verificación", ['phase'])
+NOTIFIER_SEND_SECONDS = REGISTRY.histogram('cies_notifier_send_seconds', "Duración de los envíos del notificador",
+                                           ['channel', 'outcome'], buckets=SEND_BUCKETS)
+ALERT_STAGE_SECONDS = REGISTRY.histogram('cies_alert_stage_seconds', "Segundos desde la respuesta upstream hasta cada etapa de la alerta",
+                                         ['stage'], buckets=ALERT_BUCKETS)
+TIME_TO_ALERT_SECONDS = REGISTRY.histogram('cies_time_to_alert_seconds', "Segundos desde la respuesta upstream hasta la entrega por canal",
+                                           ['channel'], buckets=ALERT_BUCKETS)
+CHROME_STARTS = REGISTRY.counter('cies_chrome_starts_total', "Navegadores Chrome lanzados", ['scraper'])
+CHROME_RECYCLES = REGISTRY.counter('cies_chrome_recycles_total', "Navegadores del pool cerrados y reemplazados", ['reason'])
+STRATEGY_CHECKS = REGISTRY.counter('cies_strategy_checks_total', "Verificaciones por estrategia y resultado", ['strategy', 'outcome'])
+STRATEGY_SECONDS = REGISTRY.histogram('cies_strategy_seconds', "Duración de cada intento por estrategia", ['strategy'])
+CIRCUIT_STATE = REGISTRY.gauge('cies_circuit_state', "Estado del circuito de cada estrategia (0 cerrado, 1 a prueba, 2 abierto)", ['strategy'])
+UPSTREAM_REQUESTS = REGISTRY.counter('cies_upstream_requests_total', "Peticiones HTTP al sitio de la Xunta")
+REJECTIONS = REGISTRY.counter('cies_rejections_total', "Redirecciones a la página de aceptación")
+PROCESS_RSS = REGISTRY.gauge('process_resident_memory_bytes', "Memoria residente del proceso")
+PROCESS_START = REGISTRY.gauge('process_start_time_seconds', "Hora de arranque del proceso")
+
+PROCESS_RSS.set_function(process_rss_bytes)
+PROCESS_START.set(time.time())
+
+
+def record_check(outcome, timings=None):
+    """Contar una verificación ('available', 'unavailable', 'unchanged' o 'error') y sus fases"""
+    CHECKS.inc(outcome=outcome)
+    if outcome != 'error':
+        LAST_SUCCESS.set(time.time())
+    for phase, seconds in (timings or {}).items():
+        CHECK_PHASE_SECONDS.observe(seconds, phase=phase)
+
+
+def record_alert_latency(summary):
+    """Observar el resumen de un AlertTrace (etapas y entregas por canal)"""
+    for stage, seconds in summary['stages'].items():
+        ALERT_STAGE_SECONDS.observe(seconds, stage=stage)
+    for channel, seconds in summary['channels'].items():
+        TIME_TO_ALERT_SECONDS.observe(seconds, channel=channel)
+
+
+def timed_send(channel):
+    """Decorador de los métodos de envío del notificador (devuelven True/False)"""
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            sent = False
+            try:
+                sent = method(*args, **kwargs)
+                return sent
+            finally:
+                NOTIFIER_SEND_SECONDS.observe(time.perf_counter() - start, channel=channel,
+                                              outcome='ok' if sent else 'failed')
+        return wrapper
+    return decorator
+
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        logging.debug(f"Métricas {self.address_string()} - {format % args}")
+
+    def do_GET(self):
+        if self.path.split('?')[0] != '/metrics':
+            self.send_error(404)
+            return
+        body = self.server.registry.render().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', CONTENT_TYPE)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class MetricsServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, registry):
+        super().__init__(address, MetricsHandler)
+        self.registry = registry
+
+
+def start_metrics_server(port=METRICS_PORT, host=METRICS_HOST, registry=REGISTRY):
+    """Servir /metrics en un hilo; None si está desactivado o el puerto no está libre"""
+    if not port:
+        return None
+    try:
+        server = MetricsServer((host, port), registry)
+    except OSError as e:
+        logging.error(f"❌ No se pudo abrir el endpoint de métricas en {host}:{port}: {e}")
+        return None
+
+    threading.Thread(target=server.serve_forever, name='cies-metrics', daemon=True).start()
+    logging.info(f"📈 Métricas en http://{host}:{server.server_address[1]}/metrics")
+    return server
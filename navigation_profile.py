@@ -0,0 +1,103 @@
+"""
+Perfil de navegación de Selenium
+- Estrategia de carga 'eager' (o 'none'): driver.get vuelve al terminar el
+  DOMContentLoaded, sin esperar imágenes, fuentes ni scripts de terceros.
+- Bloqueo de recursos no esenciales con el dominio Network de DevTools
+  (Network.setBlockedURLs): imágenes, fuentes, media y hosts de terceros.
+- navigate(): driver.get seguido de la condición concreta que necesita cada
+  paso (token CSRF, enlace de Visitantes...) en lugar de la carga completa.
+"""
+
+import logging
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.common.exceptions import TimeoutException, WebDriverException
+from config import PAGE_LOAD_STRATEGY, BLOCK_RESOURCES, BLOCKED_RESOURCE_TYPES, BLOCKED_HOSTS, BROWSER_TIMEOUT
+
+# Patrones de Network.setBlockedURLs por tipo de recurso ('*' es comodín; el final cubre '?v=...')
+RESOURCE_PATTERNS = {
+    'image': ('*.png*', '*.jpg*', '*.jpeg*', '*.gif*', '*.webp*', '*.svg*', '*.ico*', '*.bmp*'),
+    'font': ('*.woff*', '*.ttf*', '*.otf*', '*.eot*'),
+    'media': ('*.mp4*', '*.webm*', '*.mp3*', '*.ogg*', '*.wav*'),
+    'stylesheet': ('*.css*',),
+}
+
+
+def parse_resource_types(value=BLOCKED_RESOURCE_TYPES):
+    """'image+font' -> ('image', 'font'); los tipos desconocidos se ignoran con aviso"""
+    types = tuple(t.strip().lower() for t in value.split('+') if t.strip())
+    unknown = [t for t in types if t not in RESOURCE_PATTERNS]
+    if unknown:
+        logging.warning(f"⚠️ Tipos de recurso desconocidos en BLOCKED_RESOURCE_TYPES: {unknown}")
+    return tuple(t for t in types if t in RESOURCE_PATTERNS)
+
+
+def blocked_url_patterns(resource_types=None, hosts=BLOCKED_HOSTS):
+    """Patrones a bloquear: extensiones de los tipos indicados y hosts de terceros"""
+    resource_types = parse_resource_types() if resource_types is None else resource_types
+    patterns = [pattern for resource_type in resource_types for pattern in RESOURCE_PATTERNS[resource_type]]
+    patterns += [f"*://{host}/*" for host in hosts] + [f"*://*.{host}/*" for host in hosts]
+    return patterns
+
+
+def apply_page_load_strategy(chrome_options, strategy=PAGE_LOAD_STRATEGY):
+    """Fijar la estrategia de carga en las opciones de Chrome (antes de crear el driver)"""
+    if strategy not in ('normal', 'eager', 'none'):
+        logging.warning(f"⚠️ PAGE_LOAD_STRATEGY '{strategy}' no válida, usando 'eager'")
+        strategy = 'eager'
+    chrome_options.page_load_strategy = strategy
+    return chrome_options
+
+
+def enable_resource_blocking(driver, patterns=None):
+    """Activar el bloqueo de recursos en un driver recién creado (False si no es posible)"""
+    if not BLOCK_RESOURCES:
+        return False
+
+    patterns = blocked_url_patterns() if patterns is None else patterns
+    try:
+        driver.execute_cdp_cmd('Network.enable', {})
+        driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': patterns})
+        logging.info(f"🚫 Bloqueo de recursos activo ({len(patterns)} patrones)")
+        return True
+    except (WebDriverException, AttributeError) as e:
+        logging.warning(f"⚠️ No se pudo activar el bloqueo de recursos: {e}")
+        return False
+
+
+# Condiciones de lectura de cada página (la de error 'aceptacion' también vale: la trata el llamador)
+def page_parsed(driver):
+    """El documento actual terminó de parsearse (DOMContentLoaded)"""
+    return driver.execute_script("return document.readyState") != 'loading'
+
+
+ON_ERROR_PAGE = EC.url_contains('aceptacion')
+CSRF_READY = EC.any_of(
+    EC.presence_of_element_located((By.CSS_SELECTOR, 'meta[name="_csrf"], input[name="_csrf"], [data-csrf]')),
+    ON_ERROR_PAGE
+)
+VISITANTES_READY = EC.any_of(
+    EC.presence_of_element_located((By.XPATH, "//*[contains(text(), 'Visitantes')]")),
+    ON_ERROR_PAGE
+)
+
+
+def navigate(driver, url, ready=page_parsed, timeout=BROWSER_TIMEOUT):
+    """
+    driver.get(url) y esperar solo la condición `ready` del paso.
+    Con la estrategia 'none' driver.get vuelve antes de que el documento nuevo
+    exista, así que antes se espera a que el anterior quede obsoleto.
+    Devuelve False si la condición no se cumple en `timeout` segundos.
+    """
+    previous = driver.find_element(By.TAG_NAME, 'html') if PAGE_LOAD_STRATEGY == 'none' else None
+    driver.get(url)
+    try:
+        wait = WebDriverWait(driver, timeout)
+        if previous is not None:
+            wait.until(EC.staleness_of(previous))
+        wait.until(ready)
+        return True
+    except TimeoutException:
+        logging.warning(f"⏱️ {url} no estuvo lista en {timeout}s")
+        return False
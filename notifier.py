@@ -1,13 +1,15 @@
 import smtplib
-import requests
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from twilio.rest import Client
 import logging
 from config import *
+from transport import TransportSession
+from metrics import timed_send
 
 class Notifier:
     def __init__(self):
+        self.http = TransportSession()
         self.setup_email()
         self.setup_telegram()
         self.setup_whatsapp()
@@ -56,6 +58,13 @@ class Notifier:
             logging.error(f"Error al configurar WhatsApp: {e}")
             self.twilio_client = None
     
+    def format_query(self, availability_data):
+        """Sufijo con la consulta (isla, plazas, cupo) si no es la de por defecto"""
+        if availability_data.get('query'):
+            return f" ({availability_data['query']})"
+        return ""
+    
+    @timed_send('email')
     def send_email_alert(self, availability_data):
         """Enviar alerta por email"""
         if not self.smtp_server or not RECIPIENT_EMAIL:
@@ -73,7 +82,7 @@ class Notifier:
             body = f"""
             🏝️ ¡PLAZAS DISPONIBLES EN ISLAS CÍES! 🏝️
             
-            📅 Fecha: {availability_data['date']}
+            📅 Fecha: {availability_data['date']}{self.format_query(availability_data)}
             🎫 Plazas disponibles: {availability_data['available_slots']}
             ⏰ Verificado: {availability_data['timestamp']}
             
@@ -96,6 +105,7 @@ class Notifier:
             logging.error(f"Error al enviar email: {e}")
             return False
     
+    @timed_send('telegram')
     def send_telegram_alert(self, availability_data):
         """Enviar alerta por Telegram a todos los usuarios"""
         if not self.telegram_bot_token or not self.telegram_chat_ids:
@@ -107,7 +117,7 @@ class Notifier:
             message_body = f"""
 🏝️ ¡PLAZAS DISPONIBLES EN ISLAS CÍES! 🏝️
 
-📅 Fecha: {availability_data['date']}
+📅 Fecha: {availability_data['date']}{self.format_query(availability_data)}
 🎫 Plazas: {availability_data['available_slots']}
 ⏰ Verificado: {availability_data['timestamp']}
 
@@ -120,7 +130,7 @@ class Notifier:
             # Enviar mensaje a todos los usuarios
             for chat_id in self.telegram_chat_ids:
                 try:
-                    response = requests.post(
+                    response = self.http.post(
                         f"https://api.telegram.org/bot{self.telegram_bot_token}/sendMessage",
                         data={
                             'chat_id': chat_id,
@@ -148,6 +158,7 @@ class Notifier:
             logging.error(f"Error al enviar Telegram: {e}")
             return False
     
+    @timed_send('telegram_summary')
     def send_telegram_summary(self, summary_text):
         """Enviar resumen horario por Telegram a todos los usuarios"""
         if not self.telegram_bot_token or not self.telegram_chat_ids:
@@ -167,7 +178,7 @@ class Notifier:
             # Enviar mensaje a todos los usuarios
             for chat_id in self.telegram_chat_ids:
                 try:
-                    response = requests.post(
+                    response = self.http.post(
                         f"https://api.telegram.org/bot{self.telegram_bot_token}/sendMessage",
                         data={
                             'chat_id': chat_id,
@@ -195,6 +206,7 @@ class Notifier:
             logging.error(f"Error al enviar resumen Telegram: {e}")
             return False
     
+    @timed_send('telegram_critical')
     def send_telegram_critical_alert(self, error_message):
         """Enviar alerta de error crítico por Telegram a todos los usuarios"""
         if not self.telegram_bot_token or not self.telegram_chat_ids:
@@ -206,7 +218,7 @@ class Notifier:
             # Enviar mensaje a todos los usuarios
             for chat_id in self.telegram_chat_ids:
                 try:
-                    response = requests.post(
+                    response = self.http.post(
                         f"https://api.telegram.org/bot{self.telegram_bot_token}/sendMessage",
                         data={
                             'chat_id': chat_id,
@@ -234,6 +246,7 @@ class Notifier:
             logging.error(f"Error al enviar alerta crítica Telegram: {e}")
             return False
     
+    @timed_send('whatsapp')
     def send_whatsapp_alert(self, availability_data):
         """Enviar alerta por WhatsApp"""
         if not self.twilio_client or not RECIPIENT_WHATSAPP:
@@ -245,7 +258,7 @@ class Notifier:
             message_body = f"""
 🏝️ ¡PLAZAS DISPONIBLES EN ISLAS CÍES! 🏝️
 
-📅 Fecha: {availability_data['date']}
+📅 Fecha: {availability_data['date']}{self.format_query(availability_data)}
 🎫 Plazas: {availability_data['available_slots']}
 ⏰ Verificado: {availability_data['timestamp']}
 
@@ -268,21 +281,21 @@ class Notifier:
             logging.error(f"Error al enviar WhatsApp: {e}")
             return False
     
-    def send_alert(self, availability_data):
-        """Enviar alertas por todos los medios configurados"""
+    def send_alert(self, availability_data, trace=None):
+        """Enviar alertas por todos los medios configurados (trace: AlertTrace con la hora de cada entrega)"""
         success_count = 0
         
-        # Enviar Telegram (prioridad alta)
-        if self.send_telegram_alert(availability_data):
-            success_count += 1
-        
-        # Enviar email
-        if self.send_email_alert(availability_data):
-            success_count += 1
-        
-        # Enviar WhatsApp
-        if self.send_whatsapp_alert(availability_data):
-            success_count += 1
+        # Enviar Telegram (prioridad alta), email y WhatsApp, en ese orden
+        channels = (
+            ('telegram', self.send_telegram_alert),
+            ('email', self.send_email_alert),
+            ('whatsapp', self.send_whatsapp_alert)
+        )
+        for channel, send in channels:
+            if send(availability_data):
+                success_count += 1
+                if trace:
+                    trace.delivered(channel)
         
         if success_count > 0:
             logging.info(f"Alertas enviadas exitosamente por {success_count} medio(s)")
@@ -0,0 +1,81 @@
+"""
+Tiempos por fase de una verificación
+Cada scraper y monitor tiene un PhaseTimer; las fases se miden con
+`with timer.span('csrf'):` o con el decorador @timed('csrf') en los métodos.
+Los tiempos se acumulan por nombre desde el último reset (una fase que se
+repite suma) y las fases anidadas se solapan: 'total' incluye a todas.
+"""
+
+import functools
+import threading
+import time
+from contextlib import contextmanager
+
+
+class PhaseTimer:
+    def __init__(self):
+        self.phases = {}  # fase -> segundos acumulados
+        self.lock = threading.Lock()  # el motor asíncrono mide desde varios hilos
+
+    @contextmanager
+    def span(self, phase):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(phase, time.perf_counter() - start)
+
+    def add(self, phase, seconds):
+        with self.lock:
+            self.phases[phase] = self.phases.get(phase, 0.0) + seconds
+
+    def sleep(self, phase, seconds):
+        """time.sleep contabilizado como fase (esperas de reintento, delays)"""
+        with self.span(phase):
+            time.sleep(seconds)
+
+    def reset(self):
+        with self.lock:
+            self.phases = {}
+
+    def snapshot(self):
+        """Copia de los tiempos actuales en segundos"""
+        with self.lock:
+            return {phase: round(seconds, 4) for phase, seconds in self.phases.items()}
+
+
+def timed(phase):
+    """Decorador de métodos: mide la llamada en self.timer bajo el nombre de fase"""
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            with self.timer.span(phase):
+                return method(self, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def timed_check(method):
+    """
+    Decorador de los métodos de verificación: reinicia el timer, mide 'total'
+    y adjunta los tiempos al resultado (result['timings']) si es un dict.
+    Los tiempos de la última verificación quedan también en self.last_timings.
+    """
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        self.timer.reset()
+        try:
+            with self.timer.span('total'):
+                result = method(self, *args, **kwargs)
+        finally:
+            self.last_timings = self.timer.snapshot()
+        if isinstance(result, dict):
+            result['timings'] = self.last_timings
+        return result
+    return wrapper
+
+
+def format_timings(timings, limit=6):
+    """'total 2.31s · navigate 1.20s · csrf 0.35s' con las fases más lentas primero"""
+    ordered = sorted(timings.items(), key=lambda item: item[1], reverse=True)[:limit]
+    return " · ".join(f"{phase} {seconds:.2f}s" for phase, seconds in ordered)
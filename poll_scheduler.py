@@ -0,0 +1,146 @@
+"""
+Planificador adaptativo de verificaciones
+Decide cuánto esperar hasta la siguiente verificación según lo ocurrido:
+- errores y redirecciones a 'aceptacion': backoff exponencial con jitter
+- cambios en el calendario: intervalo mínimo durante POLL_FAST_WINDOW segundos
+- reintentos diferidos por la política de reintentos (retry_policy.py): se
+  verifica cuando vence el reintento en lugar de dormir dentro del scraper
+- presupuesto global de peticiones upstream por hora (ventana deslizante)
+"""
+
+import logging
+import random
+import time
+from collections import deque
+from config import CHECK_INTERVAL, POLL_MIN_INTERVAL, POLL_MAX_INTERVAL, POLL_BACKOFF_FACTOR
+from config import POLL_REJECT_PENALTY, POLL_JITTER, POLL_FAST_WINDOW, POLL_HOURLY_BUDGET
+
+BUDGET_WINDOW = 3600  # segundos
+MAX_PENALTY = 16  # tope del exponente de backoff
+
+
+class PollScheduler:
+    def __init__(self, base_interval=CHECK_INTERVAL, min_interval=POLL_MIN_INTERVAL, max_interval=POLL_MAX_INTERVAL,
+                 backoff_factor=POLL_BACKOFF_FACTOR, reject_penalty=POLL_REJECT_PENALTY, jitter=POLL_JITTER,
+                 fast_window=POLL_FAST_WINDOW, hourly_budget=POLL_HOURLY_BUDGET, clock=time.monotonic):
+        """
+        base_interval: espera normal entre verificaciones (segundos)
+        min_interval: espera tras un cambio, mientras dura la ventana rápida
+        max_interval: tope del backoff
+        reject_penalty: pasos de backoff que suma una redirección a 'aceptacion' (un error suma 1)
+        jitter: fracción aleatoria (+/-) aplicada a cada espera
+        hourly_budget: peticiones upstream por hora (0 = sin límite)
+        """
+        self.base_interval = base_interval
+        self.min_interval = min(min_interval, base_interval)
+        self.max_interval = max(max_interval, base_interval)
+        self.backoff_factor = backoff_factor
+        self.reject_penalty = reject_penalty
+        self.jitter = jitter
+        self.fast_window = fast_window
+        self.hourly_budget = hourly_budget
+        self.clock = clock
+
+        self.penalty = 0
+        self.fast_until = 0
+        self.last_cycle_requests = 1
+        self.history = deque()  # (instante, peticiones) de la última hora
+        self.retry_at = None  # instante del reintento diferido pendiente
+        self.reason = "inicio"
+
+    def record_cycle(self, ok, requests=1, rejected=False, changed=False, retry_in=None):
+        """
+        Registrar el resultado de una verificación.
+        ok: se obtuvieron datos válidos; requests: peticiones upstream realizadas;
+        rejected: hubo redirecciones a 'aceptacion'; changed: el calendario cambió;
+        retry_in: segundos hasta el reintento que pide la política de reintentos.
+        Un ciclo sin peticiones (verificación aplazada) no suma backoff: solo espera a retry_in.
+        """
+        now = self.clock()
+        self.history.append((now, requests))
+        self.last_cycle_requests = max(1, requests)
+        self.retry_at = now + retry_in if retry_in is not None and not ok else None
+
+        if rejected:
+            self.penalty = min(MAX_PENALTY, self.penalty + self.reject_penalty)
+        elif not ok and requests:
+            self.penalty = min(MAX_PENALTY, self.penalty + 1)
+        else:
+            self.penalty = 0
+
+        if changed:
+            self.fast_until = now + self.fast_window
+            logging.info(f"⚡ Cambio detectado: verificando cada {self.min_interval}s durante {self.fast_window}s")
+
+    def used_budget(self, now):
+        """Peticiones hechas en la última hora"""
+        while self.history and self.history[0][0] <= now - BUDGET_WINDOW:
+            self.history.popleft()
+        return sum(count for _, count in self.history)
+
+    def budget_delay(self, now, fast):
+        """Espera mínima que impone el presupuesto horario"""
+        if not self.hourly_budget:
+            return 0
+
+        needed = self.used_budget(now) + self.last_cycle_requests - self.hourly_budget
+        if needed > 0:
+            # Presupuesto agotado: esperar a que salgan de la ventana las peticiones necesarias
+            freed = 0
+            for timestamp, count in self.history:
+                freed += count
+                if freed >= needed:
+                    return timestamp + BUDGET_WINDOW - now
+            return BUDGET_WINDOW
+
+        # Ritmo sostenible (en la ventana rápida se permite gastar a ráfagas lo que quede)
+        return 0 if fast else BUDGET_WINDOW * self.last_cycle_requests / self.hourly_budget
+
+    def next_delay(self):
+        """Segundos hasta la siguiente verificación"""
+        now = self.clock()
+        fast = now < self.fast_until
+
+        if self.penalty:
+            delay = min(self.max_interval, self.base_interval * self.backoff_factor ** self.penalty)
+            self.reason = f"backoff x{self.backoff_factor ** self.penalty:g}"
+        elif fast:
+            delay = self.min_interval
+            self.reason = "ventana rápida tras cambio"
+        else:
+            delay = self.base_interval
+            self.reason = "intervalo normal"
+        delay *= random.uniform(1 - self.jitter, 1 + self.jitter)
+
+        if self.retry_at is not None:
+            # El reintento (que ya lleva su propio jitter) marca la espera, pero nunca
+            # por debajo del backoff de errores y rechazos a 'aceptacion'
+            retry = max(0.0, self.retry_at - now)
+            if retry >= (delay if self.penalty else 0):
+                delay = retry
+                self.reason = "reintento diferido"
+
+        budget = self.budget_delay(now, fast)
+        if budget > delay:
+            delay = budget
+            self.reason = "presupuesto horario"
+
+        return max(0.0, delay)
+
+    def wait(self):
+        """Dormir hasta la siguiente verificación"""
+        delay = self.next_delay()
+        logging.info(f"⏱️ Próxima verificación en {delay:.0f}s ({self.reason})")
+        time.sleep(delay)
+        return delay
+
+    def sustained_interval(self):
+        """Espera real en condiciones normales: el intervalo base o el que impone el presupuesto"""
+        if not self.hourly_budget:
+            return self.base_interval
+        return max(self.base_interval, BUDGET_WINDOW * self.last_cycle_requests / self.hourly_budget)
+
+    def describe(self):
+        return (f"cada {self.sustained_interval():g}s en condiciones normales (base {self.base_interval}s, "
+                f"mín {self.min_interval}s, máx {self.max_interval}s, "
+                f"presupuesto {self.hourly_budget or 'ilimitado'} peticiones/h)")
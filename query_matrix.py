@@ -0,0 +1,158 @@
+"""
+Matriz de consultas: islas x tamaños de grupo x tipos de cupo
+Cada vigilante (watcher) combina una lista de fechas con una o varias consultas;
+las consultas idénticas se agrupan para que una sola llamada sirva a todos
+y el planificador reparte los barridos entre ciclos según el presupuesto
+
+Formato de WATCHERS (vigilantes separados por ';'):
+    fechas|islas|plazas|cupos
+    08/2025@sab|1|4           familia de 4 cualquier sábado de agosto en Cíes
+    02/08/2025|1|1+2          1 o 2 plazas el 2 de agosto
+Los campos omitidos toman WATCH_ISLANDS, WATCH_GROUP_SIZES y WATCH_QUOTA_TYPES
+"""
+
+import logging
+from collections import OrderedDict, namedtuple
+from itertools import product
+from async_engine import AsyncQueryEngine
+from calendar_sweep import format_fecha
+from watchlist import WatchList, build_date_result
+
+ISLAND_NAMES = {'1': 'Cíes'}
+
+
+class QueryKey(namedtuple('QueryKey', ['id_isla', 'num_plazas', 'id_tipo_cupo'])):
+    """Parámetros de una consulta a la API (sin la fecha)"""
+
+    def api_params(self):
+        return {'id_isla': self.id_isla, 'num_plazas': self.num_plazas, 'id_tipo_cupo': self.id_tipo_cupo}
+
+    def describe(self):
+        island = ISLAND_NAMES.get(self.id_isla, f"isla {self.id_isla}")
+        text = f"{island}, {self.num_plazas} plaza{'s' if self.num_plazas != '1' else ''}"
+        if self.id_tipo_cupo:
+            text += f", cupo {self.id_tipo_cupo}"
+        return text
+
+
+DEFAULT_QUERY = QueryKey('1', '1', '')
+
+
+def split_values(text):
+    """'1+2' -> ['1', '2'] ('' es un valor válido para el tipo de cupo)"""
+    return [value.strip() for value in text.split('+')]
+
+
+class Watcher:
+    """Una lista de fechas vigilada con una o varias consultas"""
+
+    def __init__(self, watch_list, queries, name=None):
+        self.watch_list = watch_list
+        self.queries = list(OrderedDict.fromkeys(queries))
+        self.name = name or watch_list.describe()
+
+    def describe(self):
+        return f"{self.name} [{'; '.join(q.describe() for q in self.queries)}]"
+
+
+def parse_watchers(spec, default_dates, islands, group_sizes, quota_types):
+    """Crear los vigilantes desde WATCHERS (o uno por defecto con WATCH_DATES y la matriz global)"""
+    if not spec.strip():
+        spec = default_dates
+
+    watchers = []
+    for part in spec.split(';'):
+        if not part.strip():
+            continue
+
+        fields = part.split('|')
+        dates_spec = fields[0]
+        watcher_islands = split_values(fields[1]) if len(fields) > 1 and fields[1].strip() else split_values(islands)
+        watcher_sizes = split_values(fields[2]) if len(fields) > 2 and fields[2].strip() else split_values(group_sizes)
+        watcher_quotas = split_values(fields[3]) if len(fields) > 3 else split_values(quota_types)
+
+        queries = [QueryKey(*combo) for combo in product(watcher_islands, watcher_sizes, watcher_quotas)]
+        watchers.append(Watcher(WatchList.from_spec(dates_spec), queries))
+
+    if not watchers:
+        raise ValueError("No hay vigilantes configurados")
+    return watchers
+
+
+class QueryPlanner:
+    def __init__(self, watchers, max_sweeps_per_cycle=0):
+        """max_sweeps_per_cycle: barridos (consulta, mes) por ciclo; 0 = todos"""
+        self.watchers = watchers
+        self.max_sweeps_per_cycle = max_sweeps_per_cycle
+        self.cursor = 0
+
+    def plan(self, today=None):
+        """
+        Peticiones upstream deduplicadas: {(consulta, año, mes): {fecha: [vigilantes]}}.
+        Dos vigilantes con la misma consulta y mes comparten un único barrido.
+        """
+        sweeps = OrderedDict()
+        for watcher in self.watchers:
+            for (year, month), days in watcher.watch_list.plan(today).items():
+                for query in watcher.queries:
+                    subscribers = sweeps.setdefault((query, year, month), OrderedDict())
+                    for day in days:
+                        subscribers.setdefault(day, []).append(watcher)
+        return sweeps
+
+    def next_batch(self, today=None):
+        """Siguiente tanda de barridos, rotando por la matriz para respetar el presupuesto"""
+        sweeps = list(self.plan(today).items())
+        if not self.max_sweeps_per_cycle or len(sweeps) <= self.max_sweeps_per_cycle:
+            return sweeps
+
+        start = self.cursor % len(sweeps)
+        batch = [sweeps[(start + i) % len(sweeps)] for i in range(self.max_sweeps_per_cycle)]
+        self.cursor = start + self.max_sweeps_per_cycle
+        return batch
+
+    def describe(self):
+        return " | ".join(watcher.describe() for watcher in self.watchers)
+
+
+def check_watchers(scraper, planner, today=None, engine=None):
+    """
+    Ejecutar una tanda de barridos y repartir los resultados entre los vigilantes.
+    Los barridos se lanzan en paralelo con el motor asíncrono (engine, o uno temporal).
+    Devuelve una lista de resultados por (vigilante, fecha, consulta).
+    """
+    batch = planner.next_batch(today)
+    if not batch:
+        logging.warning("⚠️ No quedan fechas futuras en ningún vigilante")
+        return []
+
+    subscribers_total = sum(len(w) for _, days in batch for w in days.values())
+    logging.info(f"🧮 {len(batch)} barridos upstream para {subscribers_total} suscripciones")
+
+    own_engine = engine is None
+    engine = engine or AsyncQueryEngine(scraper)
+    try:
+        sweeps = engine.run_batch(batch)
+    finally:
+        if own_engine:
+            engine.close()
+
+    results = []
+    for (query, year, month), days in batch:
+        availability = sweeps.get((query, year, month))
+
+        for day, watchers in days.items():
+            info = (availability or {}).get(day)
+            if info is None or info['available_slots'] is None:
+                result = build_date_result(day, -1, 'calendar_sweep')
+            else:
+                result = build_date_result(day, info['available_slots'], 'calendar_sweep', info['disponible'])
+
+            result['query'] = query.describe() if query != DEFAULT_QUERY else None
+            result['watch_key'] = f"{format_fecha(day)} · {query.describe()}" if query != DEFAULT_QUERY else format_fecha(day)
+            result['watchers'] = [w.name for w in watchers]
+            result['changed'] = availability is None or engine.day_changed((query, year, month), day)
+            result['upstream_at'] = engine.received_at.get((query, year, month))
+            results.append(result)
+
+    return results
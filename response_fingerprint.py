@@ -0,0 +1,61 @@
+"""
+Huella de las respuestas de la API por consulta
+La respuesta de recuperarPlazasTotales casi siempre es idéntica a la anterior:
+si el cuerpo normalizado no cambia se devuelve el resultado ya parseado
+(el mismo objeto) y solo se incrementa un contador, sin parsear ni registrar nada.
+Quien consuma los resultados puede detectar "sin cambios" comparando por identidad.
+"""
+
+import hashlib
+import logging
+import threading
+
+
+def normalize_payload(content):
+    """Cuerpo normalizado: bytes sin espacios ni saltos de línea en los extremos"""
+    if isinstance(content, str):
+        content = content.encode('utf-8')
+    return content.strip()
+
+
+def payload_fingerprint(content):
+    return hashlib.blake2b(normalize_payload(content), digest_size=16).digest()
+
+
+class ResponseTracker:
+    def __init__(self):
+        self.entries = {}  # clave de consulta -> (huella, resultado parseado)
+        self.lock = threading.Lock()  # el motor asíncrono llama desde varios hilos
+        self.stats = {'changed': 0, 'unchanged': 0}
+
+    @staticmethod
+    def make_key(url, data):
+        """Clave de consulta: endpoint + parámetros del formulario"""
+        return (url, tuple(sorted(data.items())))
+
+    def parse(self, key, content, parser):
+        """
+        Devolver (resultado, cambiado). parser solo se ejecuta si la huella
+        difiere de la última vista para esa clave; sus excepciones se propagan.
+        """
+        fingerprint = payload_fingerprint(content)
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry and entry[0] == fingerprint:
+                self.stats['unchanged'] += 1
+                return entry[1], False
+
+        result = parser(content)
+        with self.lock:
+            self.entries[key] = (fingerprint, result)
+            self.stats['changed'] += 1
+        logging.debug(f"🔎 Respuesta nueva para {key[0]} ({self.stats['unchanged']} sin cambios hasta ahora)")
+        return result, True
+
+    def forget(self, key=None):
+        """Olvidar una clave (o todas), p. ej. al cambiar de sesión"""
+        with self.lock:
+            if key is None:
+                self.entries.clear()
+            else:
+                self.entries.pop(key, None)
@@ -0,0 +1,129 @@
+"""
+Política de reintentos sin bloqueo
+En lugar de dormir 30 segundos dentro de la verificación, un fallo
+se clasifica y se calcula cuándo conviene reintentar (backoff exponencial
+con jitter y tope); ese plazo se devuelve al planificador, que sigue
+atendiendo resúmenes y otras fechas mientras tanto.
+Un presupuesto de errores por ventana decide cuándo escalar: agotado el
+presupuesto se dejan de hacer reintentos rápidos y se reinicia la sesión.
+"""
+
+import json
+import logging
+import random
+import time
+from collections import deque
+from requests.exceptions import ConnectionError as RequestsConnectionError, Timeout as RequestsTimeout
+from selenium.common.exceptions import TimeoutException, WebDriverException
+from config import MAX_RETRIES, RETRY_BASE_DELAY, RETRY_MAX_DELAY, RETRY_JITTER, ERROR_BUDGET, ERROR_BUDGET_WINDOW
+
+# Clases de error: pasos de backoff que suma cada una (None = sin reintento rápido)
+ERROR_STEPS = {
+    'transient': 1,  # timeouts y conexiones caídas
+    'no_driver': 1,  # el pool no pudo prestar un navegador
+    'browser': 1,  # Chrome dejó de responder
+    'no_data': 1,  # la API respondió sin plazas legibles
+    'rejected': 3,  # redirección a 'aceptacion': mejor dejar pasar más tiempo
+    'fatal': None  # errores de programación: reintentar en seguida no sirve
+}
+
+
+def classify_error(error):
+    """Clase de error de una excepción"""
+    if isinstance(error, (TimeoutException, RequestsTimeout, RequestsConnectionError, ConnectionError, TimeoutError)):
+        return 'transient'
+    if isinstance(error, WebDriverException):
+        return 'browser'
+    if isinstance(error, json.JSONDecodeError):
+        return 'no_data'  # la API respondió algo que no es JSON (antes que ValueError)
+    if isinstance(error, (TypeError, AttributeError, KeyError, NameError, ValueError)):
+        return 'fatal'
+    return 'transient'
+
+
+class RetryPolicy:
+    def __init__(self, max_attempts=MAX_RETRIES, base_delay=RETRY_BASE_DELAY, max_delay=RETRY_MAX_DELAY, jitter=RETRY_JITTER,
+                 error_budget=ERROR_BUDGET, budget_window=ERROR_BUDGET_WINDOW, clock=time.monotonic):
+        """
+        max_attempts: intentos seguidos (el primero incluido) antes de dejar el ritmo al planificador
+        base_delay / max_delay: espera del primer reintento y tope del backoff (segundos)
+        jitter: fracción aleatoria (+/-) aplicada a cada espera
+        error_budget: fallos permitidos en budget_window segundos antes de escalar (0 = sin presupuesto)
+        """
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max(max_delay, base_delay)
+        self.jitter = jitter
+        self.error_budget = error_budget
+        self.budget_window = budget_window
+        self.clock = clock
+
+        self.attempts = 0  # fallos seguidos desde el último éxito
+        self.steps = 0  # pasos de backoff acumulados
+        self.retry_at = 0  # no reintentar antes de este instante
+        self.failures = deque()  # instantes de los fallos dentro de la ventana
+        self.escalations = 0
+        self.last_kind = None
+
+    def ready(self):
+        """¿Ha vencido el reintento diferido?"""
+        return self.clock() >= self.retry_at
+
+    def remaining(self):
+        return max(0.0, self.retry_at - self.clock())
+
+    def budget_used(self, now=None):
+        """Fallos dentro de la ventana del presupuesto"""
+        now = self.clock() if now is None else now
+        while self.failures and self.failures[0] <= now - self.budget_window:
+            self.failures.popleft()
+        return len(self.failures)
+
+    def budget_exhausted(self):
+        return bool(self.error_budget) and self.budget_used() >= self.error_budget
+
+    def backoff(self):
+        """Espera del siguiente reintento: base * 2^(pasos - 1) con jitter, sin pasar de max_delay"""
+        delay = min(self.max_delay, self.base_delay * 2 ** (self.steps - 1))
+        delay *= random.uniform(1 - self.jitter, 1 + self.jitter)
+        return min(self.max_delay, max(0.0, delay))
+
+    def record_failure(self, kind):
+        """
+        Registrar un fallo de la clase dada.
+        Devuelve (retry_in, escalate): segundos hasta el reintento (None si no hay reintento
+        rápido y el ritmo lo marca el planificador) y si se ha agotado el presupuesto de errores.
+        """
+        now = self.clock()
+        self.failures.append(now)
+        self.attempts += 1
+        self.last_kind = kind
+
+        escalate = self.budget_exhausted()
+        if escalate:
+            self.escalations += 1
+            self.failures.clear()  # la ventana empieza de nuevo tras escalar
+            logging.critical(f"🚨 Presupuesto de errores agotado ({self.error_budget} en {self.budget_window}s): escalando")
+
+        step = ERROR_STEPS.get(kind, 1)
+        if escalate or step is None or self.attempts >= self.max_attempts:
+            self.steps = 0
+            self.attempts = 0
+            self.retry_at = 0
+            return None, escalate
+
+        self.steps += step
+        retry_in = self.backoff()
+        self.retry_at = now + retry_in
+        logging.warning(f"⚠️ Fallo '{kind}' ({self.attempts}/{self.max_attempts}): reintento en {retry_in:.1f}s")
+        return retry_in, escalate
+
+    def record_success(self):
+        self.attempts = 0
+        self.steps = 0
+        self.retry_at = 0
+        self.last_kind = None
+
+    def describe(self):
+        budget = f"{self.error_budget} errores/{self.budget_window}s" if self.error_budget else "sin presupuesto"
+        return f"{self.max_attempts} intentos, backoff {self.base_delay}-{self.max_delay}s ±{self.jitter:.0%}, {budget}"
@@ -1,17 +1,24 @@
 import random
 import string
-from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
 from selenium.common.exceptions import TimeoutException, NoSuchElementException
-from webdriver_manager.chrome import ChromeDriverManager
 from datetime import datetime
 import time
 import logging
 from config import *
+from phase_timer import PhaseTimer, timed, timed_check
+from metrics import CHROME_STARTS
+from navigation_profile import apply_page_load_strategy, enable_resource_blocking, navigate, VISITANTES_READY, ON_ERROR_PAGE
+from waits import wait_until, wait_for_url_change, wait_for_ajax_idle
+from selector_engine import get_selector_engine
+from dom_snapshot import take_snapshot, format_tides
+from datepicker import select_date, shows_date, parse_target_date
+from warm_spare import WarmSpare, quit_in_background
+from chrome_profile import launch_chrome
 
 # Configurar logging
 logging.basicConfig(
@@ -23,10 +30,41 @@ logging.basicConfig(
     ]
 )
 
+# Condiciones de espera del flujo clásico
+DATE_INPUT_LOCATOR = (By.XPATH, "//input[@id='fecha' or @id='fechaEntrada' or contains(@placeholder, 'Data') or contains(@placeholder, 'data')]")
+SLOTS_SELECTORS = [
+    "//div[contains(text(), 'Prazas libres:')]",
+    "//div[contains(text(), 'plazas libres')]",
+    "//div[contains(text(), 'Prazas disponibles')]",
+    "//div[contains(text(), 'plazas disponibles')]",
+    "//span[contains(text(), 'Prazas libres:')]",
+    "//span[contains(text(), 'plazas libres')]",
+    "//*[contains(text(), 'Prazas libres:')]",
+    "//*[contains(text(), 'plazas libres')]",
+    "//div[contains(@class, 'slots')]//*[contains(text(), 'libres')]",
+    "//div[contains(@class, 'availability')]//*[contains(text(), 'libres')]",
+    # Texto repartido en varios nodos: el elemento más interno que lo contiene
+    "//*[contains(., 'Prazas libres') or contains(., 'plazas libres')]"
+    "[not(*[contains(., 'Prazas libres') or contains(., 'plazas libres')])]"
+]
+SLOTS_TEXT_LOCATOR = (By.XPATH, "//*[contains(text(), 'Prazas libres') or contains(text(), 'plazas libres')]")
+# El elemento de Visitantes debe estar en la sección de Cíes (o en la mitad izquierda de la página)
+VISITANTES_ACCEPT = """
+    var cies = document.evaluate("./ancestor::*[contains(text(), 'Cíes') or contains(text(), 'Cies')]",
+                                 node, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+    return !!cies || node.getBoundingClientRect().left + window.scrollX < window.innerWidth / 2;
+"""
+
 class CiesScraper:
     def __init__(self):
         self.driver = None
         self.wait = None
+        self.rejections = 0  # redirecciones a 'aceptacion' (las lee el planificador)
+        self.timer = PhaseTimer()
+        self.last_timings = {}
+        self.selectors = get_selector_engine()
+        self.last_snapshot = None
+        self.spare = WarmSpare(self.create_driver, health_check=lambda driver: driver.window_handles)  # reserva para reset_browser
         self.user_agents = [
             'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
             'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/119.0.0.0 Safari/537.36',
@@ -38,8 +76,11 @@ class CiesScraper:
             'Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:109.0) Gecko/20100101 Firefox/120.0'
         ]
         
+    @timed('random_delay')
     def random_delay(self, min_seconds=1, max_seconds=3):
-        """Delay aleatorio para simular comportamiento humano"""
+        """Delay aleatorio para simular comportamiento humano (solo con POLITE_PACING)"""
+        if not POLITE_PACING:
+            return 0
         delay = random.uniform(min_seconds, max_seconds)
         time.sleep(delay)
         return delay
@@ -85,114 +126,126 @@ class CiesScraper:
             except:
                 return False
         
+    @timed('setup_driver')
     def setup_driver(self):
-        """Configurar el WebDriver de Chrome con configuraciones anti-detección avanzadas"""
+        """Usar el navegador de reserva si está listo (si no, arrancar uno en frío) y reponer la reserva en segundo plano"""
         try:
-            chrome_options = Options()
-            
-            # Seleccionar user-agent aleatorio
-            user_agent = random.choice(self.user_agents)
-            
-            # Configuraciones básicas
-            chrome_options.add_argument('--no-sandbox')
-            chrome_options.add_argument('--disable-dev-shm-usage')
-            chrome_options.add_argument('--disable-gpu')
-            chrome_options.add_argument('--disable-web-security')
-            chrome_options.add_argument('--disable-features=VizDisplayCompositor')
-            chrome_options.add_argument('--disable-blink-features=AutomationControlled')
-            chrome_options.add_argument('--disable-extensions')
-            chrome_options.add_argument('--disable-plugins')
-            chrome_options.add_argument('--no-first-run')
-            chrome_options.add_argument('--no-default-browser-check')
-            chrome_options.add_argument('--disable-default-apps')
-            chrome_options.add_argument('--disable-popup-blocking')
-            chrome_options.add_argument('--disable-notifications')
-            chrome_options.add_argument('--disable-background-timer-throttling')
-            chrome_options.add_argument('--disable-backgrounding-occluded-windows')
-            chrome_options.add_argument('--disable-renderer-backgrounding')
-            chrome_options.add_argument('--disable-field-trial-config')
-            chrome_options.add_argument('--disable-ipc-flooding-protection')
-            
-            # Configuraciones anti-detección
-            chrome_options.add_argument(f'--user-agent={user_agent}')
-            
-            # Configuración de headless
-            if HEADLESS:
-                chrome_options.add_argument('--headless=new')
-                chrome_options.add_argument('--disable-images')
-                chrome_options.add_argument('--window-size=1920,1080')
-            else:
-                chrome_options.add_argument('--window-size=1920,1080')
-                chrome_options.add_argument('--start-maximized')
-            
-            # Headers adicionales
-            chrome_options.add_argument('--accept-lang=es-ES,es;q=0.9,en;q=0.8')
-            chrome_options.add_argument('--accept=text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8')
-            
-            # Configuraciones experimentales
-            chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
-            chrome_options.add_experimental_option('useAutomationExtension', False)
-            chrome_options.add_experimental_option("prefs", {
-                "profile.default_content_setting_values.notifications": 2,
-                "profile.default_content_settings.popups": 0,
-                "profile.managed_default_content_settings.images": 2,
-                "profile.default_content_setting_values.media_stream": 2,
-            })
-            
-            # Configurar Chrome para macOS
-            chrome_options.binary_location = "/Applications/Google Chrome.app/Contents/MacOS/Google Chrome"
-            
-            # Crear driver
-            self.driver = webdriver.Chrome(options=chrome_options)
-            self.wait = WebDriverWait(self.driver, BROWSER_TIMEOUT)
-            
-            # Configuraciones adicionales post-inicialización
-            self.driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
-            self.driver.execute_script("Object.defineProperty(navigator, 'plugins', {get: () => [1, 2, 3, 4, 5]})")
-            self.driver.execute_script("Object.defineProperty(navigator, 'languages', {get: () => ['es-ES', 'es', 'en-US', 'en']})")
-            self.driver.execute_script("window.chrome = {runtime: {}}")
-            
-            # Agregar propiedades adicionales para evitar detección
-            self.driver.execute_script("""
-                Object.defineProperty(navigator, 'permissions', {
-                    get: () => ({
-                        query: () => Promise.resolve({ state: 'granted' })
-                    })
-                });
-                
-                Object.defineProperty(navigator, 'connection', {
-                    get: () => ({
-                        effectiveType: '4g',
-                        rtt: 50,
-                        downlink: 10
-                    })
-                });
-                
-                // Simular que no es un bot
-                delete window.cdc_adoQpoasnfa76pfcZLmcfl_Array;
-                delete window.cdc_adoQpoasnfa76pfcZLmcfl_Promise;
-                delete window.cdc_adoQpoasnfa76pfcZLmcfl_Symbol;
-            """)
-            
-            mode = "headless" if HEADLESS else "visible"
-            logging.info(f"WebDriver configurado correctamente en modo {mode} con User-Agent: {user_agent[:50]}...")
+            driver = self.spare.take() if self.spare.ready else None
+            self.use_driver(driver or self.create_driver())
+            self.spare.refill()
             return True
-            
         except Exception as e:
             logging.error(f"Error al configurar WebDriver: {e}")
             return False
     
+    def use_driver(self, driver):
+        """Pasar a usar el driver dado (o ninguno)"""
+        self.driver = driver
+        self.wait = WebDriverWait(driver, BROWSER_TIMEOUT) if driver else None
+    
+    def create_driver(self):
+        """Lanzar un Chrome con configuraciones anti-detección avanzadas (lo usan setup_driver y la reserva)"""
+        chrome_options = Options()
+        
+        # Seleccionar user-agent aleatorio
+        user_agent = random.choice(self.user_agents)
+        
+        # Configuraciones básicas
+        chrome_options.add_argument('--no-sandbox')
+        chrome_options.add_argument('--disable-dev-shm-usage')
+        chrome_options.add_argument('--disable-gpu')
+        chrome_options.add_argument('--disable-web-security')
+        chrome_options.add_argument('--disable-features=VizDisplayCompositor')
+        chrome_options.add_argument('--disable-blink-features=AutomationControlled')
+        chrome_options.add_argument('--disable-extensions')
+        chrome_options.add_argument('--disable-plugins')
+        chrome_options.add_argument('--no-first-run')
+        chrome_options.add_argument('--no-default-browser-check')
+        chrome_options.add_argument('--disable-default-apps')
+        chrome_options.add_argument('--disable-popup-blocking')
+        chrome_options.add_argument('--disable-notifications')
+        chrome_options.add_argument('--disable-background-timer-throttling')
+        chrome_options.add_argument('--disable-backgrounding-occluded-windows')
+        chrome_options.add_argument('--disable-renderer-backgrounding')
+        chrome_options.add_argument('--disable-field-trial-config')
+        chrome_options.add_argument('--disable-ipc-flooding-protection')
+        
+        # Configuraciones anti-detección
+        chrome_options.add_argument(f'--user-agent={user_agent}')
+        
+        # Configuración de headless
+        if HEADLESS:
+            chrome_options.add_argument('--headless=new')
+            chrome_options.add_argument('--disable-images')
+            chrome_options.add_argument('--window-size=1920,1080')
+        else:
+            chrome_options.add_argument('--window-size=1920,1080')
+            chrome_options.add_argument('--start-maximized')
+        
+        # Headers adicionales
+        chrome_options.add_argument('--accept-lang=es-ES,es;q=0.9,en;q=0.8')
+        chrome_options.add_argument('--accept=text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8')
+        
+        # Configuraciones experimentales
+        chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
+        chrome_options.add_experimental_option('useAutomationExtension', False)
+        chrome_options.add_experimental_option("prefs", {
+            "profile.default_content_setting_values.notifications": 2,
+            "profile.default_content_settings.popups": 0,
+            "profile.managed_default_content_settings.images": 2,
+            "profile.default_content_setting_values.media_stream": 2,
+        })
+        
+        apply_page_load_strategy(chrome_options)
+        
+        # Crear driver (binarios resueltos una vez y perfil en RAM)
+        driver = launch_chrome(chrome_options)
+        CHROME_STARTS.inc(scraper='classic')
+        enable_resource_blocking(driver)
+        
+        # Configuraciones adicionales post-inicialización
+        driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
+        driver.execute_script("Object.defineProperty(navigator, 'plugins', {get: () => [1, 2, 3, 4, 5]})")
+        driver.execute_script("Object.defineProperty(navigator, 'languages', {get: () => ['es-ES', 'es', 'en-US', 'en']})")
+        driver.execute_script("window.chrome = {runtime: {}}")
+        
+        # Agregar propiedades adicionales para evitar detección
+        driver.execute_script("""
+            Object.defineProperty(navigator, 'permissions', {
+                get: () => ({
+                    query: () => Promise.resolve({ state: 'granted' })
+                })
+            });
+            
+            Object.defineProperty(navigator, 'connection', {
+                get: () => ({
+                    effectiveType: '4g',
+                    rtt: 50,
+                    downlink: 10
+                })
+            });
+            
+            // Simular que no es un bot
+            delete window.cdc_adoQpoasnfa76pfcZLmcfl_Array;
+            delete window.cdc_adoQpoasnfa76pfcZLmcfl_Promise;
+            delete window.cdc_adoQpoasnfa76pfcZLmcfl_Symbol;
+        """)
+        
+        mode = "headless" if HEADLESS else "visible"
+        logging.info(f"WebDriver configurado correctamente en modo {mode} con User-Agent: {user_agent[:50]}...")
+        return driver
+    
+    @timed('navigate')
     def navigate_to_site(self):
         """Navegar al sitio web objetivo con comportamiento humano"""
         try:
             # Delay aleatorio antes de navegar
             self.random_delay(2, 5)
             
-            self.driver.get(TARGET_URL)
             logging.info(f"Navegando a: {TARGET_URL}")
             
-            # Esperar a que la página cargue
-            self.wait.until(EC.presence_of_element_located((By.TAG_NAME, "body")))
+            # Esperar solo al enlace de Visitantes (o a la página de error), no a la carga completa
+            navigate(self.driver, TARGET_URL, VISITANTES_READY)
             
             # Simular comportamiento humano: scroll aleatorio
             self.driver.execute_script("""
@@ -220,8 +273,7 @@ class CiesScraper:
         try:
             logging.info("🔍 Explorando página de inicio...")
             
-            # Esperar a que la página cargue completamente
-            time.sleep(1)  # Reducido de 3 a 1 segundo
+            # navigate_to_site ya esperó al enlace de Visitantes: no hace falta más espera
             
             # Buscar elementos que contengan "Cíes" o "Cies"
             cies_elements = self.driver.find_elements(By.XPATH, "//*[contains(text(), 'Cíes') or contains(text(), 'Cies')]")
@@ -264,6 +316,7 @@ class CiesScraper:
             logging.error(f"Error explorando página de inicio: {e}")
             return False
     
+    @timed('click_visitantes')
     def click_visitantes_cies(self):
         """Hacer clic en el icono de Visitantes para Islas Cíes con comportamiento humano"""
         try:
@@ -293,66 +346,21 @@ class CiesScraper:
                 "//*[contains(text(), 'Visitantes')]"
             ]
             
-            visitantes_element = None
-            for selector in visitantes_selectors:
-                try:
-                    elements = self.driver.find_elements(By.XPATH, selector)
-                    logging.info(f"Selector '{selector}' encontró {len(elements)} elementos")
-                    
-                    for elem in elements:
-                        try:
-                            # Verificar que esté en la sección de Cíes
-                            parent = elem.find_element(By.XPATH, "./ancestor::*[contains(text(), 'Cíes') or contains(text(), 'Cies')]")
-                            if parent:
-                                visitantes_element = elem
-                                logging.info(f"Elemento Visitantes encontrado con selector: {selector}")
-                                break
-                        except:
-                            # Si no encuentra ancestro con Cíes, verificar si está en la mitad izquierda de la página
-                            location = elem.location
-                            page_width = self.driver.execute_script("return window.innerWidth;")
-                            if location['x'] < page_width / 2:  # Asumiendo que Cíes está a la izquierda
-                                visitantes_element = elem
-                                logging.info(f"Elemento Visitantes encontrado por posición (izquierda) con selector: {selector}")
-                                break
-                    
-                    if visitantes_element:
-                        break
-                except Exception as e:
-                    logging.warning(f"Error con selector '{selector}': {e}")
-                    continue
-            
-            if not visitantes_element:
-                # Intentar buscar por JavaScript
-                try:
-                    visitantes_element = self.driver.execute_script("""
-                        var elements = document.querySelectorAll('*');
-                        for (var i = 0; i < elements.length; i++) {
-                            if (elements[i].textContent.includes('Visitantes')) {
-                                // Verificar si está cerca de Cíes
-                                var parent = elements[i].closest('*');
-                                if (parent && parent.textContent.includes('Cíes')) {
-                                    return elements[i];
-                                }
-                            }
-                        }
-                        return null;
-                    """)
-                    if visitantes_element:
-                        logging.info("Elemento Visitantes encontrado por JavaScript")
-                except:
-                    pass
+            # Todos los selectores en una sola consulta, con el que acertó la última vez primero
+            visitantes_element = self.selectors.find(self.driver, 'classic.visitantes', visitantes_selectors,
+                                                     visible=False, accept=VISITANTES_ACCEPT)
             
             if visitantes_element:
                 # Delay aleatorio antes del clic
                 self.random_delay(1, 3)
                 
                 # Usar clic humano en lugar de clic normal
+                previous_url = self.driver.current_url
                 if self.human_like_click(visitantes_element):
                     logging.info("✅ Clic humano en Visitantes para Islas Cíes realizado")
                     
-                    # Delay aleatorio después del clic
-                    self.random_delay(2, 4)
+                    # Esperar a que el clic navegue (o quedarse con la URL actual si no lo hace)
+                    wait_for_url_change(self.driver, previous_url)
                     
                     # Verificar que navegamos a la página correcta
                     current_url = self.driver.current_url
@@ -373,8 +381,7 @@ class CiesScraper:
                     else:
                         logging.warning(f"⚠️ Navegó a URL inesperada: {current_url}")
                         # Intentar navegar directamente a la página de solicitud
-                        self.driver.get("https://autorizacionillasatlanticas.xunta.gal/illasr/iniciarReserva")
-                        self.random_delay(2, 3)
+                        navigate(self.driver, RESERVA_URL)
                         return True
                 else:
                     logging.error("❌ Error en clic humano")
@@ -392,8 +399,9 @@ class CiesScraper:
         try:
             logging.info("🔍 Explorando estructura de la página de solicitud...")
             
-            # Esperar a que la página cargue completamente
-            time.sleep(5)
+            # Esperar al campo de fecha (o a la página de error) en lugar de una pausa fija
+            wait_until(self.driver, EC.any_of(EC.presence_of_element_located(DATE_INPUT_LOCATOR), ON_ERROR_PAGE),
+                       description="campo de fecha")
             
             # Verificar que estamos en la página correcta
             current_url = self.driver.current_url
@@ -452,9 +460,12 @@ class CiesScraper:
             logging.error(f"Error explorando página: {e}")
             return False
     
-    def select_target_date(self):
-        """Seleccionar la fecha objetivo (2 de agosto de 2025)"""
+    @timed('select_date')
+    def select_target_date(self, target_date=TARGET_DATE):
+        """Seleccionar la fecha objetivo saltando directamente a su mes (cualquier fecha DD/MM/YYYY)"""
         try:
+            fecha = parse_target_date(target_date).strftime('%d/%m/%Y')
+            
             # Primero explorar la estructura
             self.explore_page_structure()
             
@@ -473,284 +484,70 @@ class CiesScraper:
                 "//input[contains(@class, 'date')]"
             ]
             
-            date_input = None
-            for selector in date_selectors:
-                try:
-                    date_input = self.wait.until(
-                        EC.element_to_be_clickable((By.XPATH, selector))
-                    )
-                    logging.info(f"Campo de fecha encontrado con selector: {selector}")
-                    break
-                except:
-                    continue
+            date_input = self.selectors.wait_for(self.driver, 'classic.date_input', date_selectors, timeout=BROWSER_TIMEOUT)
             
             if not date_input:
                 logging.error("No se pudo encontrar el campo de fecha")
                 return False
             
-            # Hacer clic en el campo de fecha para abrir el calendario
-            date_input.click()
-            logging.info("Campo de fecha clickeado - esperando calendario...")
-            
-            # Verificar si estamos en página de error después del clic
-            if not self.check_and_handle_error_page():
+            # Abrir el calendario, ir al mes objetivo y hacer clic en el día en un solo viaje
+            logging.info(f"Seleccionando {fecha} en el calendario...")
+            selection = select_date(self.driver, date_input, target_date)
+            if not selection:
                 return False
-            
-            # Esperar a que aparezca el calendario
-            time.sleep(3)
-            
-            # Buscar el calendario con diferentes selectores
-            calendar_selectors = [
-                "//div[contains(@class, 'ui-datepicker')]",
-                "//div[contains(@class, 'calendar')]",
-                "//div[contains(@class, 'datepicker')]",
-                "//table[contains(@class, 'calendar')]"
-            ]
-            
-            calendar = None
-            for selector in calendar_selectors:
-                try:
-                    calendar = self.driver.find_element(By.XPATH, selector)
-                    if calendar.is_displayed():
-                        logging.info(f"Calendario encontrado con selector: {selector}")
-                        break
-                except:
-                    continue
-            
-            if not calendar:
-                logging.error("No se pudo encontrar el calendario")
+            # El script lee el mismo campo en el que hizo clic, sea cual sea su selector o dateFormat
+            if not shows_date(selection, target_date):
+                logging.error(f"❌ El calendario muestra {selection['value'] or 'ninguna fecha'} en lugar de {fecha}")
                 return False
+            logging.info(f"✅ Día seleccionado ({selection['method']}): {selection['value']}")
             
-            # Navegar hasta agosto 2025 usando las flechas del calendario
-            logging.info("Navegando hasta agosto 2025...")
-            
-            # Buscar flechas de navegación
-            next_arrow_selectors = [
-                "//a[contains(@class, 'ui-datepicker-next')]",
-                "//a[contains(@class, 'next')]",
-                "//button[contains(@class, 'next')]",
-                "//span[contains(@class, 'next')]",
-                "//i[contains(@class, 'next')]"
-            ]
-            
-            next_arrow = None
-            for selector in next_arrow_selectors:
-                try:
-                    next_arrow = self.driver.find_element(By.XPATH, selector)
-                    if next_arrow.is_displayed():
-                        logging.info(f"Flecha siguiente encontrada con selector: {selector}")
-                        break
-                except:
-                    continue
+            # Esperar a la respuesta de plazas en lugar de una pausa fija
+            wait_for_ajax_idle(self.driver)
+            wait_until(self.driver, EC.any_of(EC.presence_of_element_located(SLOTS_TEXT_LOCATOR), ON_ERROR_PAGE),
+                       description="texto de plazas")
             
-            if not next_arrow:
-                logging.error("No se pudo encontrar la flecha de navegación")
+            # Una sola lectura: sin página de error; get_available_slots reutiliza esta instantánea
+            snapshot = self.read_slots_page()
+            if snapshot is None:
                 return False
-            
-            # Navegar hasta agosto 2025
-            # Primero necesitamos llegar al año 2025, luego al mes de agosto
-            current_month_year = self.get_current_month_year()
-            logging.info(f"Mes y año actual: {current_month_year}")
-            
-            # Navegar hasta agosto 2025
-            target_reached = self.navigate_to_august_2025(next_arrow)
-            
-            # Verificar si estamos en página de error después de navegar en el calendario
-            if not self.check_and_handle_error_page():
+            if snapshot['error_page']:
+                self.check_and_handle_error_page(snapshot)
                 return False
             
-            if target_reached:
-                # Seleccionar el día 2
-                day_2_selectors = [
-                    "//table[contains(@class, 'ui-datepicker-calendar')]//td/a[text()='2']",
-                    "//td/a[text()='2']",
-                    "//a[text()='2']",
-                    "//td[contains(@class, 'ui-datepicker-day')]/a[text()='2']"
-                ]
-                
-                day_2_element = None
-                for selector in day_2_selectors:
-                    try:
-                        day_2_element = self.driver.find_element(By.XPATH, selector)
-                        if day_2_element.is_displayed():
-                            logging.info(f"Día 2 encontrado con selector: {selector}")
-                            break
-                    except:
-                        continue
-                
-                if day_2_element:
-                    day_2_element.click()
-                    logging.info("✅ Día 2 seleccionado")
-                    time.sleep(2)  # Esperar a que se aplique la selección
-                    
-                    # Verificar si estamos en página de error después de seleccionar el día
-                    if not self.check_and_handle_error_page():
-                        return False
-                    
-                    return True
-                else:
-                    logging.error("No se pudo encontrar el día 2")
-                    return False
-            else:
-                logging.error("No se pudo navegar hasta agosto 2025")
-                return False
+            return True
             
         except Exception as e:
             logging.error(f"Error al seleccionar fecha: {e}")
             return False
     
-    def get_current_month_year(self):
-        """Obtener el mes y año actual del calendario"""
-        try:
-            # Buscar elementos que muestren el mes y año actual
-            month_year_selectors = [
-                "//div[contains(@class, 'ui-datepicker-title')]",
-                "//div[contains(@class, 'datepicker-title')]",
-                "//span[contains(@class, 'ui-datepicker-month')]",
-                "//span[contains(@class, 'ui-datepicker-year')]",
-                "//div[contains(@class, 'calendar')]//div[contains(@class, 'header')]",
-                "//table[contains(@class, 'calendar')]//caption",
-                "//div[contains(@class, 'calendar')]//div[contains(@class, 'title')]"
-            ]
-            
-            for selector in month_year_selectors:
-                try:
-                    element = self.driver.find_element(By.XPATH, selector)
-                    if element.is_displayed():
-                        text = element.text
-                        if text.strip():
-                            logging.info(f"Mes/año actual: {text}")
-                            return text
-                except:
-                    continue
-            
-            # Si no encontramos el título, buscar elementos que contengan meses
-            month_texts = [
-                "xaneiro", "febreiro", "marzo", "abril", "maio", "xuño",
-                "xullo", "agosto", "setembro", "outubro", "novembro", "decembro",
-                "january", "february", "march", "april", "may", "june",
-                "july", "august", "september", "october", "november", "december"
-            ]
-            
-            for month in month_texts:
-                try:
-                    element = self.driver.find_element(By.XPATH, f"//*[contains(text(), '{month}')]")
-                    if element.is_displayed():
-                        text = element.text
-                        logging.info(f"Mes encontrado: {text}")
-                        return text
-                except:
-                    continue
-            
-            return "Unknown"
-            
-        except Exception as e:
-            logging.error(f"Error obteniendo mes/año actual: {e}")
-            return "Unknown"
-    
-    def navigate_to_august_2025(self, next_arrow):
-        """Navegar hasta agosto 2025 usando las flechas del calendario"""
-        try:
-            # Basándome en tu observación, solo necesitamos un clic para llegar a agosto 2025
-            # desde julio 2025 (que es donde estamos actualmente)
-            logging.info("Haciendo un clic en la flecha para navegar a agosto 2025...")
-            
-            # Buscar la flecha siguiente
-            next_arrow_selectors = [
-                "//a[contains(@class, 'ui-datepicker-next')]",
-                "//a[contains(@class, 'next')]",
-                "//button[contains(@class, 'next')]",
-                "//span[contains(@class, 'next')]",
-                "//i[contains(@class, 'next')]"
-            ]
-            
-            next_arrow = None
-            for selector in next_arrow_selectors:
-                try:
-                    next_arrow = self.driver.find_element(By.XPATH, selector)
-                    if next_arrow.is_displayed():
-                        logging.info(f"Flecha encontrada con selector: {selector}")
-                        break
-                except:
-                    continue
-            
-            if not next_arrow:
-                logging.error("No se pudo encontrar la flecha de navegación")
-                return False
-            
-            # Hacer un solo clic en la flecha para ir a agosto 2025
-            try:
-                # Usar JavaScript directamente para evitar problemas de interceptación
-                self.driver.execute_script("arguments[0].click();", next_arrow)
-                logging.info("✅ Clic realizado en la flecha - navegando a agosto 2025")
-                time.sleep(1)  # Reducido de 2 a 1 segundo
-                return True
-            except Exception as js_error:
-                logging.error(f"Error al hacer clic con JavaScript: {js_error}")
-                return False
-            
-        except Exception as e:
-            logging.error(f"Error navegando a agosto 2025: {e}")
-            return False
-    
-    def get_available_slots(self):
-        """Obtener el número de plazas disponibles con múltiples estrategias"""
+    @timed('read_slots')
+    def get_available_slots(self, snapshot=None):
+        """
+        Obtener el número de plazas disponibles de una instantánea de la página (un solo viaje).
+        snapshot: la que ya leyó select_target_date; sin ella se toma una nueva.
+        """
         try:
-            # Verificar si estamos en página de error antes de obtener slots
-            if not self.check_and_handle_error_page():
-                return -1  # Error de página
-            
-            # Delay aleatorio antes de buscar slots
-            self.random_delay(1, 2)
-            
             logging.info("🔍 Buscando información de plazas disponibles...")
             
-            # Múltiples selectores para encontrar las plazas disponibles
-            slots_selectors = [
-                "//div[contains(text(), 'Prazas libres:')]",
-                "//div[contains(text(), 'plazas libres')]",
-                "//div[contains(text(), 'Prazas disponibles')]",
-                "//div[contains(text(), 'plazas disponibles')]",
-                "//span[contains(text(), 'Prazas libres:')]",
-                "//span[contains(text(), 'plazas libres')]",
-                "//*[contains(text(), 'Prazas libres:')]",
-                "//*[contains(text(), 'plazas libres')]",
-                "//div[contains(@class, 'slots')]//*[contains(text(), 'libres')]",
-                "//div[contains(@class, 'availability')]//*[contains(text(), 'libres')]"
-            ]
+            if snapshot is None:
+                # Delay aleatorio antes de buscar slots
+                self.random_delay(1, 2)
+                
+                # URL, página de error, plazas, fecha y mareas en una sola llamada,
+                # con los selectores de plazas en el orden aprendido
+                snapshot = self.read_slots_page()
+            if snapshot is None:
+                return -1  # El navegador no responde
             
-            slots_element = None
-            for selector in slots_selectors:
-                try:
-                    logging.info(f"Probando selector: {selector}")
-                    slots_element = self.driver.find_element(By.XPATH, selector)
-                    if slots_element and slots_element.is_displayed():
-                        logging.info(f"✅ Elemento de plazas encontrado con selector: {selector}")
-                        break
-                except Exception as e:
-                    logging.debug(f"Selector {selector} no encontró elementos: {e}")
-                    continue
-            
-            if not slots_element:
-                # Intentar buscar con JavaScript como fallback
-                try:
-                    logging.info("🔍 Intentando búsqueda con JavaScript...")
-                    slots_element = self.driver.execute_script("""
-                        var elements = document.querySelectorAll('*');
-                        for (var i = 0; i < elements.length; i++) {
-                            var text = elements[i].textContent || elements[i].innerText;
-                            if (text && (text.includes('Prazas libres') || text.includes('plazas libres'))) {
-                                return elements[i];
-                            }
-                        }
-                        return null;
-                    """)
-                    if slots_element:
-                        logging.info("✅ Elemento de plazas encontrado con JavaScript")
-                except Exception as e:
-                    logging.warning(f"Búsqueda con JavaScript falló: {e}")
-            
-            if not slots_element:
+            # Verificar si estamos en página de error antes de obtener slots
+            if snapshot['error_page']:
+                if not self.check_and_handle_error_page(snapshot):
+                    return -1  # Error de página
+                snapshot = self.read_slots_page()
+                if snapshot is None or snapshot['error_page']:
+                    return -1
+            
+            if snapshot['slots_text'] is None:
                 # Tomar screenshot para debugging
                 try:
                     self.driver.save_screenshot("slots_debug.png")
@@ -761,42 +558,18 @@ class CiesScraper:
                 logging.warning("❌ No se encontró información de plazas disponibles")
                 return -1  # Error de detección
             
-            # Extraer el número de plazas
-            try:
-                slots_text = slots_element.text
-                logging.info(f"Texto encontrado: '{slots_text}'")
-                
-                # Múltiples patrones para extraer el número
-                import re
-                
-                # Patrón 1: "Prazas libres: X"
-                match = re.search(r'Prazas libres:\s*(\d+)', slots_text, re.IGNORECASE)
-                if match:
-                    slots_number = int(match.group(1))
-                    logging.info(f"✅ Plazas disponibles extraídas con patrón 1: {slots_number}")
-                    return slots_number
-                
-                # Patrón 2: "plazas libres: X"
-                match = re.search(r'plazas libres:\s*(\d+)', slots_text, re.IGNORECASE)
-                if match:
-                    slots_number = int(match.group(1))
-                    logging.info(f"✅ Plazas disponibles extraídas con patrón 2: {slots_number}")
-                    return slots_number
-                
-                # Patrón 3: Buscar cualquier número en el texto
-                numbers = re.findall(r'\d+', slots_text)
-                if numbers:
-                    slots_number = int(numbers[0])
-                    logging.info(f"✅ Plazas disponibles extraídas con patrón 3: {slots_number}")
-                    return slots_number
-                
-                logging.warning(f"No se pudo extraer número de plazas del texto: '{slots_text}'")
-                return -1  # Error de extracción
-                
-            except Exception as e:
-                logging.error(f"Error al extraer número de plazas: {e}")
+            # El número ya viene extraído ("Prazas libres: X", "plazas libres: X" o el primer número)
+            logging.info(f"Texto encontrado: '{snapshot['slots_text']}' (fecha {snapshot['date'] or 'N/A'})")
+            if snapshot['tides']:
+                logging.info(f"🌊 Mareas: {format_tides(snapshot['tides'])}")
+            
+            if snapshot['slots'] is None:
+                logging.warning(f"No se pudo extraer número de plazas del texto: '{snapshot['slots_text']}'")
                 return -1  # Error de extracción
             
+            logging.info(f"✅ Plazas disponibles extraídas: {snapshot['slots']}")
+            return snapshot['slots']
+            
         except Exception as e:
             logging.error(f"Error al obtener plazas disponibles: {e}")
             # Tomar screenshot en caso de error
@@ -815,9 +588,20 @@ class CiesScraper:
         except:
             return False
 
-    def check_and_handle_error_page(self):
-        """Verificar si estamos en página de error y manejarla si es necesario"""
-        if self.is_error_page():
+    def read_slots_page(self):
+        """Instantánea de la página de plazas; registra qué selector de plazas acertó"""
+        ordered = self.selectors.ordered('classic.slots', SLOTS_SELECTORS)
+        snapshot = take_snapshot(self.driver, ordered)
+        if snapshot is not None and not snapshot['error_page']:
+            winner = ordered[snapshot['slots_selector']] if snapshot['slots_selector'] is not None else None
+            self.selectors.record('classic.slots', ordered, winner)
+        self.last_snapshot = snapshot
+        return snapshot
+
+    def check_and_handle_error_page(self, snapshot=None):
+        """Verificar si estamos en página de error (con una instantánea) y manejarla si es necesario"""
+        snapshot = snapshot or take_snapshot(self.driver)
+        if snapshot and snapshot['error_page']:
             logging.warning("⚠️ Detectada página de error durante el flujo")
             if not self.handle_error_page():
                 logging.error("❌ No se pudo manejar la página de error")
@@ -855,20 +639,29 @@ class CiesScraper:
             logging.error(f"Error al limpiar datos del navegador: {e}")
             return False
 
+    @timed('reset_browser')
     def reset_browser(self):
-        """Resetear completamente el navegador"""
+        """Resetear completamente el navegador (cambiándolo por el de reserva si está listo)"""
         try:
             logging.info("🔄 Reseteando navegador...")
+            old_driver = self.driver
+            
+            # Intercambio con el navegador de reserva: ya está lanzado y en reposo
+            spare = self.spare.take()
+            if spare:
+                self.use_driver(spare)
+                if old_driver:
+                    quit_in_background(old_driver)
+                logging.info("✅ Navegador reseteado con la reserva precalentada")
+                return True
             
-            # Cerrar el driver actual
-            if self.driver:
-                self.driver.quit()
-                self.driver = None
-                self.wait = None
+            # Sin reserva: cerrar el driver actual y arrancar uno en frío
+            if old_driver:
+                old_driver.quit()
+                self.use_driver(None)
                 logging.info("✅ Driver anterior cerrado")
             
-            # Pequeña pausa para asegurar que se cierre completamente
-            time.sleep(2)
+            # quit() ya espera a que chromedriver termine: no hace falta una pausa
             
             # Configurar un nuevo driver
             if not self.setup_driver():
@@ -882,6 +675,7 @@ class CiesScraper:
             logging.error(f"Error al resetear navegador: {e}")
             return False
 
+    @timed('error_page')
     def handle_error_page(self):
         """Manejar página de error reseteando el navegador completamente"""
         try:
@@ -890,6 +684,7 @@ class CiesScraper:
             if "aceptacion" not in current_url:
                 return True  # No estamos en página de error
             
+            self.rejections += 1
             logging.info("🔄 Detectada página de error inesperada")
             logging.info("🔄 Iniciando reset completo del navegador...")
             
@@ -913,8 +708,10 @@ class CiesScraper:
             logging.error(f"Error manejando página de error: {e}")
             return False
     
-    def check_availability(self):
-        """Verificar disponibilidad para la fecha objetivo"""
+    @timed_check
+    def check_availability(self, target_date=TARGET_DATE):
+        """Verificar disponibilidad para la fecha objetivo (DD/MM/YYYY)"""
+        self.last_snapshot = None
         try:
             if not self.setup_driver():
                 return None
@@ -948,10 +745,11 @@ class CiesScraper:
                     logging.error("❌ Seguimos en página de error después del reset")
                     return None
                 
-            if not self.select_target_date():
+            if not self.select_target_date(target_date):
                 return None
                 
-            slots = self.get_available_slots()
+            slots = self.get_available_slots(self.last_snapshot)
+            upstream_at = time.monotonic()  # página leída: referencia del tiempo hasta la alerta
             
             # Determinar el estado de disponibilidad
             if slots == -1:
@@ -971,24 +769,30 @@ class CiesScraper:
                 logging.info("😔 No hay plazas disponibles")
             
             return {
-                'date': TARGET_DATE,
+                'date': target_date,
                 'available_slots': slots,
                 'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
                 'has_availability': has_availability,
                 'status': status,
-                'detection_error': slots == -1
+                'detection_error': slots == -1,
+                'upstream_at': upstream_at,
+                'tides': (self.last_snapshot or {}).get('tides', [])
             }
             
         except Exception as e:
             logging.error(f"Error en verificación de disponibilidad: {e}")
             return None
         finally:
+            self.selectors.flush()
             if self.driver:
-                self.driver.quit()
+                with self.timer.span('quit_driver'):
+                    self.driver.quit()
+                self.use_driver(None)
                 logging.info("WebDriver cerrado")
     
     def close_driver(self):
-        """Cerrar el WebDriver"""
+        """Cerrar el WebDriver y el navegador de reserva"""
+        self.spare.close()
         if self.driver:
             self.driver.quit()
             logging.info("WebDriver cerrado")
\ No newline at end of file
@@ -4,8 +4,6 @@ Scraper híbrido para Islas Cíes
 Combina navegación Selenium con llamadas API directas
 """
 
-import requests
-import json
 import logging
 import time
 import random
@@ -16,16 +14,52 @@ from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.chrome.options import Options
 from selenium.common.exceptions import TimeoutException, NoSuchElementException
-from config import TARGET_DATE, TARGET_URL, USER_AGENTS, MIN_DELAY, MAX_DELAY, HEADLESS, BROWSER_TIMEOUT, MAX_RETRIES, RETRY_DELAY
+from config import (TARGET_DATE, TARGET_URL, RESERVA_URL, USER_AGENTS, MIN_DELAY, MAX_DELAY, HEADLESS, BROWSER_TIMEOUT,
+                    POLITE_PACING, DRIVER_POOL_SIZE, DRIVER_MAX_USES, DRIVER_MAX_AGE, HTTP_BOOTSTRAP_RETRY_INTERVAL)
+from driver_pool import DriverPool
+from session_bootstrap import bootstrap_session, SessionBootstrapError
+from session_cache import SessionCache
+from transport import TransportSession, ACCEPT_ENCODING
+from cookie_bridge import CookieBridge
+from response_fingerprint import ResponseTracker
+from api_session import ApiSessionMixin
+from phase_timer import PhaseTimer, timed, timed_check
+from metrics import CHROME_STARTS
+from navigation_profile import apply_page_load_strategy, enable_resource_blocking, navigate, CSRF_READY, VISITANTES_READY
+from waits import wait_for_url_change
+from selector_engine import get_selector_engine
+from retry_policy import RetryPolicy, classify_error
+from chrome_profile import launch_chrome
 
-class HybridCiesScraper:
+class HybridCiesScraper(ApiSessionMixin):
     def __init__(self):
-        self.session = requests.Session()
+        self.session = TransportSession()
         self.driver = None
         self.wait = None
         self.csrf_token = None
-        self.retry_count = 0
+        self.csrf_driver = None
+        self.http_session_ready = False
+        self.http_bootstrap_failed_at = None
+        self.retry_policy = RetryPolicy()
+        self.session_cache = SessionCache()
+        self.session_cached = False
+        self.cookie_bridge = CookieBridge(self.session)
+        self.response_tracker = ResponseTracker()
+        self.rejections = 0  # redirecciones a 'aceptacion' (las lee el planificador)
+        self.upstream_at = None  # hora de la última respuesta de la API
+        self.timer = PhaseTimer()
+        self.last_timings = {}
+        self.selectors = get_selector_engine()
         self.setup_session()
+        self.restore_cached_session()
+        self.driver_pool = DriverPool(
+            factory=self.create_driver,
+            warmup=self.warm_driver,
+            health_check=self.is_driver_parked,
+            size=DRIVER_POOL_SIZE,
+            max_uses=DRIVER_MAX_USES,
+            max_age=DRIVER_MAX_AGE
+        )
         
     def setup_session(self):
         """Configurar sesión HTTP con headers apropiados"""
@@ -34,7 +68,7 @@ class HybridCiesScraper:
             'User-Agent': user_agent,
             'Accept': 'application/json, text/javascript, */*; q=0.01',
             'Accept-Language': 'en-US,en;q=0.9,es;q=0.8',
-            'Accept-Encoding': 'gzip, deflate, br, zstd',
+            'Accept-Encoding': ACCEPT_ENCODING,
             'Connection': 'keep-alive',
             'Sec-Fetch-Dest': 'empty',
             'Sec-Fetch-Mode': 'cors',
@@ -45,8 +79,22 @@ class HybridCiesScraper:
             'sec-ch-ua-platform': '"macOS"'
         })
     
-    def setup_driver(self):
-        """Configurar WebDriver con anti-detección mejorada"""
+    def restore_cached_session(self):
+        """Reutilizar una sesión cacheada en disco (sin navegador ni arranque HTTP)"""
+        if not super().restore_cached_session():
+            return False
+        self.csrf_driver = None
+        self.http_session_ready = True
+        return True
+    
+    def invalidate_session(self):
+        """Descartar la sesión actual (en memoria y en disco)"""
+        super().invalidate_session()
+        self.http_session_ready = False
+    
+    @timed('setup_driver')
+    def create_driver(self):
+        """Crear un WebDriver con anti-detección mejorada (None si falla)"""
         try:
             chrome_options = Options()
             
@@ -113,17 +161,20 @@ class HybridCiesScraper:
                 }
             }
             chrome_options.add_experimental_option("prefs", prefs)
+            apply_page_load_strategy(chrome_options)
             
-            self.driver = webdriver.Chrome(options=chrome_options)
+            driver = launch_chrome(chrome_options)
+            CHROME_STARTS.inc(scraper='hybrid')
+            enable_resource_blocking(driver)
             
             # Scripts para ocultar automatización (más agresivos)
-            self.driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
-            self.driver.execute_script("Object.defineProperty(navigator, 'plugins', {get: () => [1, 2, 3, 4, 5]})")
-            self.driver.execute_script("Object.defineProperty(navigator, 'languages', {get: () => ['en-US', 'en']})")
-            self.driver.execute_script("Object.defineProperty(navigator, 'permissions', {get: () => ({query: () => Promise.resolve({state: 'granted'})})})")
+            driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
+            driver.execute_script("Object.defineProperty(navigator, 'plugins', {get: () => [1, 2, 3, 4, 5]})")
+            driver.execute_script("Object.defineProperty(navigator, 'languages', {get: () => ['en-US', 'en']})")
+            driver.execute_script("Object.defineProperty(navigator, 'permissions', {get: () => ({query: () => Promise.resolve({state: 'granted'})})})")
             
             # Scripts adicionales para evitar detección
-            self.driver.execute_script("""
+            driver.execute_script("""
                 Object.defineProperty(navigator, 'platform', {get: () => 'MacIntel'});
                 Object.defineProperty(navigator, 'hardwareConcurrency', {get: () => 8});
                 Object.defineProperty(navigator, 'deviceMemory', {get: () => 8});
@@ -133,17 +184,59 @@ class HybridCiesScraper:
                 Object.defineProperty(navigator, 'onLine', {get: () => true});
             """)
             
-            self.wait = WebDriverWait(self.driver, BROWSER_TIMEOUT)
-            
             logging.info("✅ WebDriver configurado correctamente")
-            return True
+            return driver
             
         except Exception as e:
             logging.error(f"Error al configurar WebDriver: {e}")
+            return None
+    
+    def setup_driver(self):
+        """Configurar un WebDriver propio (fuera del pool)"""
+        driver = self.create_driver()
+        if not driver:
+            return False
+        
+        self.use_driver(driver)
+        return True
+    
+    def use_driver(self, driver):
+        """Asociar un WebDriver a la instancia"""
+        self.driver = driver
+        self.wait = WebDriverWait(driver, BROWSER_TIMEOUT) if driver else None
+        self.cookie_bridge.attach(driver)
+    
+    @timed('warm_driver')
+    def warm_driver(self, driver):
+        """Dejar un driver del pool aparcado en la página de solicitud con CSRF token"""
+        self.use_driver(driver)
+        try:
+            navigated = self.navigate_to_solicitud_page()
+            self.cookie_bridge.mark_browser_changed()
+            if not navigated:
+                return False
+            
+            if not self.get_csrf_token_from_page():
+                logging.warning("⚠️ Driver calentado sin CSRF token")
+            
+            logging.info("🔥 Driver calentado y aparcado en la página de solicitud")
+            return True
+        finally:
+            self.use_driver(None)
+    
+    def is_driver_parked(self, driver):
+        """Health-check: el driver responde y sigue en la página de solicitud"""
+        try:
+            current_url = driver.current_url
+            return "iniciarReserva" in current_url and "aceptacion" not in current_url
+        except Exception:
             return False
     
+    @timed('random_delay')
     def random_delay(self, min_seconds=None, max_seconds=None):
-        """Delay aleatorio mejorado para simular comportamiento humano"""
+        """Delay aleatorio mejorado para simular comportamiento humano (solo con POLITE_PACING)"""
+        if not POLITE_PACING:
+            return
         if min_seconds is None:
             min_seconds = MIN_DELAY
         if max_seconds is None:
@@ -172,14 +265,14 @@ class HybridCiesScraper:
             logging.error(f"Error en clic humano: {e}")
             return False
     
+    @timed('navigate_direct')
     def navigate_direct_to_solicitud(self):
         """Navegar directamente a la página de solicitud"""
         try:
-            direct_url = "https://autorizacionillasatlanticas.xunta.gal/illasr/iniciarReserva"
+            direct_url = RESERVA_URL
             logging.info(f"🌐 Navegando directamente a: {direct_url}")
             
-            self.driver.get(direct_url)
-            self.random_delay(3, 6)
+            navigate(self.driver, direct_url, CSRF_READY)
             
             # Verificar si llegamos a la página correcta
             current_url = self.driver.current_url
@@ -197,6 +290,7 @@ class HybridCiesScraper:
             logging.error(f"Error en navegación directa: {e}")
             return False
     
+    @timed('navigate_solicitud')
     def navigate_to_solicitud_page(self):
         """Navegar hasta la página de solicitud usando estrategia híbrida"""
         try:
@@ -207,8 +301,7 @@ class HybridCiesScraper:
             # Si falla, intentar navegación tradicional
             logging.info("🔄 Intentando navegación tradicional...")
             logging.info("🌐 Navegando a la página de inicio...")
-            self.driver.get(TARGET_URL)
-            self.random_delay(3, 6)
+            navigate(self.driver, TARGET_URL, VISITANTES_READY)
             
             # Verificar si estamos en página de error
             current_url = self.driver.current_url
@@ -217,21 +310,10 @@ class HybridCiesScraper:
                 return self.handle_error_page()
             
             logging.info("🔍 Buscando enlace de Visitantes para Islas Cíes...")
-            self.random_delay(2, 4)
             
-            # Buscar elementos que contengan "Visitantes" y "Cíes"
-            visitantes_elements = self.driver.find_elements(By.XPATH, "//*[contains(text(), 'Visitantes')]")
-            
-            if not visitantes_elements:
-                logging.error("❌ No se encontraron elementos de Visitantes")
-                return False
-            
-            # Buscar el elemento correcto (generalmente el primero)
-            target_element = None
-            for element in visitantes_elements:
-                if element.is_displayed() and element.is_enabled():
-                    target_element = element
-                    break
+            # Primer elemento visible y habilitado con "Visitantes" (una sola consulta al navegador)
+            target_element = self.selectors.find(self.driver, 'hybrid.visitantes', ["//*[contains(text(), 'Visitantes')]"],
+                                                 accept="return !node.disabled;")
             
             if not target_element:
                 logging.error("❌ No se encontró elemento clickeable de Visitantes")
@@ -240,11 +322,11 @@ class HybridCiesScraper:
             # Delay antes del clic
             self.random_delay(2, 4)
             
-            # Hacer clic en Visitantes
+            # Hacer clic en Visitantes y esperar a que navegue
             if not self.human_like_click(target_element):
                 return False
             
-            self.random_delay(3, 6)
+            wait_for_url_change(self.driver, current_url)
             
             # Verificar que llegamos a la página de solicitud
             current_url = self.driver.current_url
@@ -262,6 +344,7 @@ class HybridCiesScraper:
             logging.error(f"Error en navegación: {e}")
             return False
     
+    @timed('error_page')
     def handle_error_page(self):
         """Manejar página de error"""
         try:
@@ -272,8 +355,9 @@ class HybridCiesScraper:
                 inicio_button = self.driver.find_element(By.XPATH, "//a[contains(text(), 'Ir ao inicio')]")
                 if inicio_button:
                     logging.info("🔄 Haciendo clic en 'Ir ao inicio'")
+                    previous_url = self.driver.current_url
                     self.human_like_click(inicio_button)
-                    self.random_delay(2, 4)
+                    wait_for_url_change(self.driver, previous_url)
                     
                     # Intentar navegación nuevamente
                     return self.navigate_to_solicitud_page()
@@ -282,8 +366,7 @@ class HybridCiesScraper:
             
             # Si no hay botón, intentar navegar directamente
             logging.info("🔄 Navegando directamente a la página de solicitud...")
-            self.driver.get("https://autorizacionillasatlanticas.xunta.gal/illasr/iniciarReserva")
-            self.random_delay(2, 4)
+            navigate(self.driver, RESERVA_URL, CSRF_READY)
             
             current_url = self.driver.current_url
             if "iniciarReserva" in current_url:
@@ -297,6 +380,7 @@ class HybridCiesScraper:
             logging.error(f"Error manejando página de error: {e}")
             return False
     
+    @timed('csrf')
     def get_csrf_token_from_page(self):
         """Obtener CSRF token de la página actual"""
         try:
@@ -320,6 +404,9 @@ class HybridCiesScraper:
             
             if csrf_token:
                 self.csrf_token = csrf_token
+                self.csrf_driver = self.driver
+                self.session_cached = False
+                self.cookie_bridge.mark_browser_changed()
                 logging.info(f"✅ CSRF token obtenido: {csrf_token[:20]}...")
                 return True
             else:
@@ -330,175 +417,206 @@ class HybridCiesScraper:
             logging.error(f"Error al obtener CSRF token: {e}")
             return False
     
-    def call_plazas_api(self, fecha=None):
-        """Llamar a la API de plazas con la sesión establecida"""
+    def should_try_http(self):
+        """Decidir si intentar el camino sin navegador"""
+        if self.http_session_ready or self.http_bootstrap_failed_at is None:
+            return True
+        return time.time() - self.http_bootstrap_failed_at >= HTTP_BOOTSTRAP_RETRY_INTERVAL
+    
+    @timed('http_bootstrap')
+    def bootstrap_http_session(self):
+        """Establecer sesión y CSRF token por HTTP puro"""
         try:
-            if not fecha:
-                fecha = TARGET_DATE
-            
-            # URL de la API
-            api_url = "https://autorizacionillasatlanticas.xunta.gal/illasr/recuperarPlazasTotales"
-            
-            # Datos del formulario
-            data = {
-                'fecha': fecha,
-                'numPlazas': '1',
-                'idIsla': '1',  # Islas Cíes
-                'idTipoCupo': ''
-            }
-            
-            # Headers específicos para la API
-            headers = {
-                'Content-Type': 'application/x-www-form-urlencoded; charset=UTF-8',
-                'Origin': 'https://autorizacionillasatlanticas.xunta.gal',
-                'Referer': 'https://autorizacionillasatlanticas.xunta.gal/illasr/iniciarReserva'
-            }
-            
-            # Agregar CSRF token si está disponible
-            if self.csrf_token:
-                headers['X-CSRF-TOKEN'] = self.csrf_token
-            
-            # Copiar cookies de Selenium a requests
-            selenium_cookies = self.driver.get_cookies()
-            for cookie in selenium_cookies:
-                self.session.cookies.set(cookie['name'], cookie['value'])
-            
-            logging.info(f"📡 Llamando a API de plazas para fecha: {fecha}")
-            
-            # Hacer la llamada POST
-            response = self.session.post(api_url, data=data, headers=headers)
-            
-            if response.status_code == 200:
-                try:
-                    result = response.json()
-                    logging.info(f"✅ Respuesta API recibida: {result}")
-                    return result
-                except json.JSONDecodeError:
-                    logging.error(f"Error al decodificar JSON: {response.text}")
-                    return None
-            else:
-                logging.error(f"Error en API: {response.status_code} - {response.text}")
-                return None
-                
-        except Exception as e:
-            logging.error(f"Error al llamar API de plazas: {e}")
-            return None
+            self.csrf_token = bootstrap_session(self.session)
+            self.csrf_driver = None
+            self.http_session_ready = True
+            self.http_bootstrap_failed_at = None
+            self.session_cached = False
+            self.remember_session()
+            return True
+        except SessionBootstrapError as e:
+            if e.rejected:
+                self.rejections += 1
+            logging.warning(f"⚠️ Arranque HTTP fallido, se usará Selenium: {e}")
+            self.http_session_ready = False
+            self.http_bootstrap_failed_at = time.time()
+            return False
     
-    def get_available_slots_hybrid(self):
-        """Obtener plazas usando enfoque híbrido"""
+    def get_available_slots_http(self):
+        """Obtener plazas sin navegador (sesión establecida por HTTP); los fallos de transporte se propagan"""
+        if not self.http_session_ready and not self.bootstrap_http_session():
+            return -1
+        
         try:
-            # Navegar hasta la página de solicitud
-            if not self.navigate_to_solicitud_page():
-                return -1
-            
-            # Obtener CSRF token
-            if not self.get_csrf_token_from_page():
-                logging.warning("⚠️ Continuando sin CSRF token")
-            
-            # Llamar a la API
-            api_result = self.call_plazas_api()
-            
-            if not api_result:
-                return -1
+            slots = self.extract_slots(self.call_plazas_api(), "API (HTTP puro)")
+        except Exception:
+            self.http_session_ready = False
+            raise
+        if slots == -1:
+            # Forzar un nuevo arranque de sesión en la próxima verificación
+            self.http_session_ready = False
+        return slots
+    
+    def ensure_api_session(self):
+        """Garantizar una sesión API usable: HTTP puro y, si falla, un navegador del pool"""
+        if self.http_session_ready:
+            return True
+        
+        if self.should_try_http() and self.bootstrap_http_session():
+            return True
+        
+        with self.timer.span('driver_acquire'):
+            pooled = self.driver_pool.acquire()
+        if not pooled:
+            return False
+        
+        healthy = False
+        try:
+            self.use_driver(pooled.driver)
+            if self.csrf_driver is not self.driver and not self.get_csrf_token_from_page():
+                return False
             
-            # Extraer información de plazas
-            if api_result.get('existenDatos'):
-                plazas_ocupadas = api_result.get('plazasOcupadas', '0')
-                try:
-                    slots = int(plazas_ocupadas)
-                    logging.info(f"✅ Plazas disponibles obtenidas via API híbrida: {slots}")
-                    return slots
-                except ValueError:
-                    logging.error(f"Error al convertir plazas: {plazas_ocupadas}")
-                    return -1
-            else:
-                logging.warning("API indica que no existen datos")
+            # La sesión de requests pasa a reflejar la del navegador
+            self.copy_driver_cookies()
+            self.http_session_ready = True
+            healthy = True
+            return True
+        finally:
+            self.driver_pool.release(pooled, healthy=healthy)
+            self.use_driver(None)
+    
+    def get_available_slots_hybrid(self):
+        """Obtener plazas usando enfoque híbrido; los fallos del navegador y de la API se propagan"""
+        # La sesión pasa a ser la del navegador
+        self.http_session_ready = False
+        
+        # Navegar hasta la página de solicitud (los drivers del pool ya están aparcados)
+        if not self.is_driver_parked(self.driver):
+            navigated = self.navigate_to_solicitud_page()
+            self.cookie_bridge.mark_browser_changed()
+            if not navigated:
                 return -1
-                
-        except Exception as e:
-            logging.error(f"Error en get_available_slots_hybrid: {e}")
-            return -1
+            self.csrf_driver = None
+        
+        # Obtener CSRF token (solo si no lo tenemos para este driver)
+        if (not self.csrf_token or self.csrf_driver is not self.driver) and not self.get_csrf_token_from_page():
+            logging.warning("⚠️ Continuando sin CSRF token")
+        
+        # Llamar a la API y extraer información de plazas
+        return self.extract_slots(self.call_plazas_api(), "API híbrida")
     
+    @timed_check
     def check_availability_hybrid(self):
-        """Verificar disponibilidad usando enfoque híbrido con reintentos"""
-        for attempt in range(MAX_RETRIES):
-            try:
-                logging.info(f"🚀 Iniciando verificación híbrida (intento {attempt + 1}/{MAX_RETRIES})...")
-                
-                # Configurar driver
-                if not self.setup_driver():
-                    if attempt < MAX_RETRIES - 1:
-                        logging.warning(f"⚠️ Reintentando en {RETRY_DELAY} segundos...")
-                        time.sleep(RETRY_DELAY)
-                        continue
-                    else:
-                        return None
+        """
+        Verificar disponibilidad usando enfoque híbrido (un intento, sin dormir).
+        Si falla, el resultado lleva 'retry_in': segundos hasta el reintento que decide
+        la política (None si el ritmo vuelve al planificador).
+        """
+        if not self.retry_policy.ready():
+            # Reintento diferido aún no vencido: no se gasta una verificación
+            logging.info(f"⏳ Reintento híbrido diferido ({self.retry_policy.remaining():.1f}s)")
+            result = self.failure_result('hybrid_api', self.retry_policy.last_kind, self.retry_policy.remaining())
+            result['status'] = 'retry_deferred'
+            return result
+        
+        attempt = self.retry_policy.attempts + 1
+        pooled = None
+        driver_healthy = False
+        rejections = self.rejections
+        method = 'hybrid_api'
+        self.upstream_at = None
+        try:
+            logging.info(f"🚀 Iniciando verificación híbrida (intento {attempt}/{self.retry_policy.max_attempts})...")
+            
+            # Camino rápido: sesión y CSRF por HTTP, sin navegador
+            slots = -1
+            if self.should_try_http():
+                slots = self.get_available_slots_http()
+                method = 'http_api'
+            
+            if slots == -1:
+                # Fallback: tomar prestado un driver calentado del pool
+                method = 'hybrid_api'
+                with self.timer.span('driver_acquire'):
+                    pooled = self.driver_pool.acquire()
+                if not pooled:
+                    return self.record_failure(method, 'no_driver')
+                self.use_driver(pooled.driver)
                 
                 # Obtener plazas usando enfoque híbrido
                 slots = self.get_available_slots_hybrid()
-                
-                # Si obtuvimos datos válidos, retornar resultado
-                if slots != -1:
-                    # Determinar estado
-                    if slots > 0:
-                        has_availability = True
-                        status = "available"
-                        logging.info(f"🎉 ¡PLAZAS DISPONIBLES ENCONTRADAS! ({slots} plazas)")
-                    else:
-                        has_availability = False
-                        status = "unavailable"
-                        logging.info("😔 No hay plazas disponibles")
-                    
-                    return {
-                        'date': TARGET_DATE,
-                        'available_slots': slots,
-                        'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-                        'has_availability': has_availability,
-                        'status': status,
-                        'detection_error': False,
-                        'method': 'hybrid_api',
-                        'attempt': attempt + 1
-                    }
-                
-                # Si no obtuvimos datos y no es el último intento, reintentar
-                if attempt < MAX_RETRIES - 1:
-                    logging.warning(f"⚠️ Error en detección, reintentando en {RETRY_DELAY} segundos...")
-                    time.sleep(RETRY_DELAY)
-                    continue
-                else:
-                    # Último intento fallido
-                    logging.error("❌ Todos los intentos fallaron")
-                    return {
-                        'date': TARGET_DATE,
-                        'available_slots': -1,
-                        'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-                        'has_availability': None,
-                        'status': 'error_detection',
-                        'detection_error': True,
-                        'method': 'hybrid_api',
-                        'attempt': MAX_RETRIES
-                    }
-                
-            except Exception as e:
-                logging.error(f"Error en verificación híbrida (intento {attempt + 1}): {e}")
-                if attempt < MAX_RETRIES - 1:
-                    logging.warning(f"⚠️ Reintentando en {RETRY_DELAY} segundos...")
-                    time.sleep(RETRY_DELAY)
-                    continue
-                else:
-                    return None
-            finally:
-                if self.driver:
-                    self.driver.quit()
-                    logging.info("WebDriver cerrado")
-        
-        return None
+                driver_healthy = slots != -1
+            
+            if slots == -1:
+                return self.record_failure(method, 'rejected' if self.rejections > rejections else 'no_data')
+            
+            self.retry_policy.record_success()
+            if slots > 0:
+                has_availability = True
+                status = "available"
+                logging.info(f"🎉 ¡PLAZAS DISPONIBLES ENCONTRADAS! ({slots} plazas)")
+            else:
+                has_availability = False
+                status = "unavailable"
+                logging.info("😔 No hay plazas disponibles")
+            
+            return {
+                'date': TARGET_DATE,
+                'available_slots': slots,
+                'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+                'has_availability': has_availability,
+                'status': status,
+                'detection_error': False,
+                'method': method,
+                'attempt': attempt,
+                'upstream_at': self.upstream_at
+            }
+            
+        except Exception as e:
+            logging.error(f"Error en verificación híbrida (intento {attempt}): {e}")
+            return self.record_failure(method, classify_error(e))
+        finally:
+            # Devolver el driver al pool (se recicla si la verificación falló)
+            if pooled:
+                self.driver_pool.release(pooled, healthy=driver_healthy)
+                self.use_driver(None)
+    
+    def record_failure(self, method, kind):
+        """Pasar el fallo a la política de reintentos; al agotar el presupuesto se empieza con sesión nueva"""
+        attempt = self.retry_policy.attempts + 1
+        retry_in, escalate = self.retry_policy.record_failure(kind)
+        if escalate:
+            self.invalidate_session()
+            self.csrf_token = None
+            self.csrf_driver = None
+        elif retry_in is None:
+            logging.error(f"❌ Verificación híbrida fallida ({kind}) tras {attempt} intentos")
+        return self.failure_result(method, kind, retry_in, attempt, escalate)
+    
+    def failure_result(self, method, kind, retry_in, attempt=None, escalated=False):
+        """Resultado de una verificación sin datos"""
+        return {
+            'date': TARGET_DATE,
+            'available_slots': -1,
+            'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            'has_availability': None,
+            'status': 'error_detection',
+            'detection_error': True,
+            'method': method,
+            'attempt': attempt or self.retry_policy.attempts,
+            'error_kind': kind,
+            'retry_in': retry_in,
+            'escalated': escalated
+        }
     
     def close_driver(self):
-        """Cerrar el WebDriver"""
+        """Cerrar el WebDriver y los navegadores del pool"""
+        self.selectors.flush()
         if self.driver:
             self.driver.quit()
+            self.use_driver(None)
             logging.info("WebDriver cerrado")
+        self.driver_pool.close()
 
 def test_hybrid_scraper():
     """Probar el scraper híbrido"""
@@ -518,6 +636,8 @@ def test_hybrid_scraper():
     except Exception as e:
         logging.error(f"Error en prueba: {e}")
         return False
+    finally:
+        scraper.close_driver()
 
 if __name__ == "__main__":
     # Configurar logging
@@ -4,27 +4,42 @@ Scraper optimizado para Islas Cíes usando API directa
 Basado en análisis del tráfico HAR
 """
 
-import requests
-import json
 import logging
-import time
 import random
 from datetime import datetime
-from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.chrome.options import Options
 from selenium.common.exceptions import TimeoutException, NoSuchElementException
 from config import TARGET_DATE, TARGET_URL
+from session_bootstrap import bootstrap_session, SessionBootstrapError
+from session_cache import SessionCache
+from transport import TransportSession, ACCEPT_ENCODING
+from cookie_bridge import CookieBridge
+from response_fingerprint import ResponseTracker
+from api_session import ApiSessionMixin
+from phase_timer import PhaseTimer, timed, timed_check
+from metrics import CHROME_STARTS
+from navigation_profile import apply_page_load_strategy, enable_resource_blocking, navigate
+from chrome_profile import launch_chrome
 
-class OptimizedCiesScraper:
+class OptimizedCiesScraper(ApiSessionMixin):
     def __init__(self):
-        self.session = requests.Session()
+        self.session = TransportSession()
         self.driver = None
         self.wait = None
         self.csrf_token = None
+        self.session_cache = SessionCache()
+        self.session_cached = False
+        self.cookie_bridge = CookieBridge(self.session)
+        self.response_tracker = ResponseTracker()
+        self.rejections = 0  # redirecciones a 'aceptacion' (las lee el planificador)
+        self.upstream_at = None  # hora de la última respuesta de la API
+        self.timer = PhaseTimer()
+        self.last_timings = {}
         self.setup_session()
+        self.restore_cached_session()
         
     def setup_session(self):
         """Configurar sesión HTTP con headers apropiados"""
@@ -32,7 +47,7 @@ class OptimizedCiesScraper:
             'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/138.0.0.0 Safari/537.36',
             'Accept': 'application/json, text/javascript, */*; q=0.01',
             'Accept-Language': 'en-US,en;q=0.9,es;q=0.8',
-            'Accept-Encoding': 'gzip, deflate, br, zstd',
+            'Accept-Encoding': ACCEPT_ENCODING,
             'Connection': 'keep-alive',
             'Sec-Fetch-Dest': 'empty',
             'Sec-Fetch-Mode': 'cors',
@@ -43,6 +58,12 @@ class OptimizedCiesScraper:
             'sec-ch-ua-platform': '"macOS"'
         })
     
+    def invalidate_session(self):
+        """Descartar la sesión actual (en memoria y en disco)"""
+        super().invalidate_session()
+        self.csrf_token = None
+    
+    @timed('setup_driver')
     def setup_driver(self):
         """Configurar WebDriver solo para obtener CSRF token"""
         try:
@@ -58,8 +79,11 @@ class OptimizedCiesScraper:
             chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
             chrome_options.add_experimental_option('useAutomationExtension', False)
             chrome_options.add_argument('--disable-blink-features=AutomationControlled')
+            apply_page_load_strategy(chrome_options)
             
-            self.driver = webdriver.Chrome(options=chrome_options)
+            self.driver = launch_chrome(chrome_options)
+            CHROME_STARTS.inc(scraper='optimized')
+            enable_resource_blocking(self.driver)
             self.driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
             self.wait = WebDriverWait(self.driver, 10)
             
@@ -71,21 +95,38 @@ class OptimizedCiesScraper:
             return False
     
     def get_csrf_token(self):
-        """Obtener CSRF token de la página de inicio"""
+        """Obtener CSRF token: primero por HTTP puro, Selenium solo como fallback"""
+        self.session_cached = False
+        try:
+            with self.timer.span('http_bootstrap'):
+                self.csrf_token = bootstrap_session(self.session)
+            return True
+        except SessionBootstrapError as e:
+            if e.rejected:
+                self.rejections += 1
+            logging.warning(f"⚠️ Arranque HTTP fallido, usando Selenium: {e}")
+        
+        if not self.driver and not self.setup_driver():
+            return False
+        
+        return self.get_csrf_token_selenium()
+    
+    @timed('csrf_selenium')
+    def get_csrf_token_selenium(self):
+        """Obtener CSRF token de la página de inicio con Selenium"""
         try:
             logging.info("🔍 Obteniendo CSRF token...")
             
-            # Navegar a la página de inicio
-            self.driver.get(TARGET_URL)
-            time.sleep(2)
+            # Navegar a la página de inicio (basta con el DOM parseado para leer el token)
+            navigate(self.driver, TARGET_URL)
             
             # Buscar el token CSRF en el HTML
             csrf_token = self.driver.execute_script("""
-                var token = document.querySelector('meta[name="csrf-token"]');
+                var token = document.querySelector('meta[name="_csrf"]') || document.querySelector('meta[name="csrf-token"]');
                 if (token) return token.getAttribute('content');
                 
                 // Buscar en inputs hidden
-                var input = document.querySelector('input[name="_token"]');
+                var input = document.querySelector('input[name="_csrf"]') || document.querySelector('input[name="_token"]');
                 if (input) return input.value;
                 
                 // Buscar en cualquier elemento con data-csrf
@@ -95,6 +136,11 @@ class OptimizedCiesScraper:
                 return null;
             """)
             
+            # Copiar cookies de Selenium a requests (con dominio y ruta) para que la sesión coincida con el token
+            self.cookie_bridge.attach(self.driver)
+            self.cookie_bridge.mark_browser_changed()
+            self.cookie_bridge.browser_to_session()
+            
             if csrf_token:
                 self.csrf_token = csrf_token
                 logging.info(f"✅ CSRF token obtenido: {csrf_token[:20]}...")
@@ -107,97 +153,34 @@ class OptimizedCiesScraper:
             logging.error(f"Error al obtener CSRF token: {e}")
             return False
     
-    def call_plazas_api(self, fecha=None):
-        """Llamar directamente a la API de plazas"""
-        try:
-            if not fecha:
-                fecha = TARGET_DATE
-            
-            # URL de la API
-            api_url = "https://autorizacionillasatlanticas.xunta.gal/illasr/recuperarPlazasTotales"
-            
-            # Datos del formulario
-            data = {
-                'fecha': fecha,
-                'numPlazas': '1',
-                'idIsla': '1',  # Islas Cíes
-                'idTipoCupo': ''
-            }
-            
-            # Headers específicos para la API
-            headers = {
-                'Content-Type': 'application/x-www-form-urlencoded; charset=UTF-8',
-                'Origin': 'https://autorizacionillasatlanticas.xunta.gal',
-                'Referer': 'https://autorizacionillasatlanticas.xunta.gal/illasr/iniciarReserva'
-            }
-            
-            # Agregar CSRF token si está disponible
-            if self.csrf_token:
-                headers['X-CSRF-TOKEN'] = self.csrf_token
-            
-            logging.info(f"📡 Llamando a API de plazas para fecha: {fecha}")
-            
-            # Hacer la llamada POST
-            response = self.session.post(api_url, data=data, headers=headers)
-            
-            if response.status_code == 200:
-                try:
-                    result = response.json()
-                    logging.info(f"✅ Respuesta API recibida: {result}")
-                    return result
-                except json.JSONDecodeError:
-                    logging.error(f"Error al decodificar JSON: {response.text}")
-                    return None
-            else:
-                logging.error(f"Error en API: {response.status_code} - {response.text}")
-                return None
-                
-        except Exception as e:
-            logging.error(f"Error al llamar API de plazas: {e}")
-            return None
+    def ensure_api_session(self):
+        """Garantizar que tenemos CSRF token y cookies para llamar a la API"""
+        if self.csrf_token:
+            return True
+        return self.get_csrf_token()
     
     def get_available_slots_api(self):
         """Obtener plazas disponibles usando la API directa"""
         try:
             # Obtener CSRF token si no lo tenemos
-            if not self.csrf_token:
-                if not self.get_csrf_token():
-                    return -1
-            
-            # Llamar a la API
-            api_result = self.call_plazas_api()
-            
-            if not api_result:
+            if not self.ensure_api_session():
                 return -1
             
-            # Extraer información de plazas
-            if api_result.get('existenDatos'):
-                plazas_ocupadas = api_result.get('plazasOcupadas', '0')
-                try:
-                    slots = int(plazas_ocupadas)
-                    logging.info(f"✅ Plazas disponibles obtenidas via API: {slots}")
-                    return slots
-                except ValueError:
-                    logging.error(f"Error al convertir plazas: {plazas_ocupadas}")
-                    return -1
-            else:
-                logging.warning("API indica que no existen datos")
-                return -1
+            # Llamar a la API y extraer información de plazas
+            return self.extract_slots(self.call_plazas_api(), "API")
                 
         except Exception as e:
             logging.error(f"Error en get_available_slots_api: {e}")
             return -1
     
+    @timed_check
     def check_availability_optimized(self):
         """Verificar disponibilidad usando API optimizada"""
         try:
             logging.info("🚀 Iniciando verificación optimizada...")
+            self.upstream_at = None
             
-            # Configurar driver solo para obtener CSRF token
-            if not self.setup_driver():
-                return None
-            
-            # Obtener plazas via API
+            # Obtener plazas via API (Chrome solo arranca si falla el arranque HTTP)
             slots = self.get_available_slots_api()
             
             # Determinar estado
@@ -221,7 +204,8 @@ class OptimizedCiesScraper:
                 'has_availability': has_availability,
                 'status': status,
                 'detection_error': slots == -1,
-                'method': 'api_optimized'
+                'method': 'api_optimized',
+                'upstream_at': self.upstream_at
             }
             
         except Exception as e:
@@ -229,7 +213,9 @@ class OptimizedCiesScraper:
             return None
         finally:
             if self.driver:
-                self.driver.quit()
+                with self.timer.span('quit_driver'):
+                    self.driver.quit()
+                self.driver = None
                 logging.info("WebDriver cerrado")
     
     def close_driver(self):
@@ -0,0 +1,162 @@
+"""
+Motor de selectores con orden aprendido
+Cada búsqueda evalúa todos los XPath candidatos de un grupo en una sola
+llamada execute_script (un único viaje al navegador) y devuelve el primer
+elemento que encaja. Los candidatos se ordenan con el que funcionó la última
+vez primero y después por aciertos, y se guardan los aciertos y fallos de cada
+selector para ver qué partes del sitio han cambiado.
+Los grupos llevan el prefijo del scraper ('classic.visitantes', 'hybrid.visitantes')
+y hay un único motor por proceso (get_selector_engine), así los scrapers no
+mezclan sus candidatos ni se pisan al guardar SELECTOR_STATS_FILE.
+"""
+
+import json
+import logging
+import os
+import tempfile
+import threading
+from config import SELECTOR_STATS_FILE
+from waits import wait_until
+
+# Devuelve [índice del selector, elemento] o null; 'accept' es un filtro JS opcional sobre `node`
+UNION_QUERY_SCRIPT = """
+    var selectors = arguments[0], visibleOnly = arguments[1];
+    var accept = arguments[2] ? new Function('node', arguments[2]) : null;
+    for (var i = 0; i < selectors.length; i++) {
+        var result;
+        try {
+            result = document.evaluate(selectors[i], document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+        } catch (e) {
+            continue;
+        }
+        for (var j = 0; j < result.snapshotLength; j++) {
+            var node = result.snapshotItem(j);
+            if (visibleOnly && !(node.offsetWidth || node.offsetHeight || node.getClientRects().length)) continue;
+            if (accept && !accept(node)) continue;
+            return [i, node];
+        }
+    }
+    return null;
+"""
+
+
+class SelectorEngine:
+    def __init__(self, stats_file=SELECTOR_STATS_FILE):
+        self.stats_file = stats_file
+        self.stats = self.load_stats()  # {grupo: {'last': selector, 'selectors': {selector: {'hits', 'misses'}}, 'failures'}}
+        self.dirty = False
+        self.lock = threading.Lock()  # el pool del scraper híbrido calienta navegadores en otros hilos
+
+    def load_stats(self):
+        """Cargar los aciertos guardados (vacío si no existen o son ilegibles)"""
+        if self.stats_file and os.path.exists(self.stats_file):
+            try:
+                with open(self.stats_file, 'r') as f:
+                    return json.load(f)
+            except Exception as e:
+                logging.warning(f"⚠️ Estadísticas de selectores ilegibles, se ignoran: {e}")
+        return {}
+
+    def flush(self):
+        """Guardar los aciertos pendientes de forma atómica (archivo temporal + rename)"""
+        if not self.dirty or not self.stats_file:
+            return
+        directory = os.path.dirname(os.path.abspath(self.stats_file))
+        try:
+            fd, tmp_path = tempfile.mkstemp(prefix='.selector_stats_', suffix='.tmp', dir=directory)
+            try:
+                with os.fdopen(fd, 'w') as f, self.lock:
+                    json.dump(self.stats, f, indent=2)
+                os.replace(tmp_path, self.stats_file)
+            except Exception:
+                os.unlink(tmp_path)
+                raise
+            self.dirty = False
+        except Exception as e:
+            logging.error(f"Error al guardar estadísticas de selectores: {e}")
+
+    def ordered(self, group, selectors):
+        """El último selector ganador primero, después por aciertos y por el orden original"""
+        group_stats = self.stats.get(group, {})
+        known = group_stats.get('selectors', {})
+        ranked = sorted(enumerate(selectors), key=lambda item: (
+            item[1] != group_stats.get('last'),
+            -known.get(item[1], {}).get('hits', 0),
+            item[0]
+        ))
+        return [selector for _, selector in ranked]
+
+    def record(self, group, ordered, winner):
+        """Acierto para el ganador, fallo para los evaluados antes que él (o para todos si no hubo)"""
+        tried = ordered if winner is None else ordered[:ordered.index(winner) + 1]
+        with self.lock:
+            group_stats = self.stats.setdefault(group, {'last': None, 'selectors': {}, 'failures': 0})
+            for selector in tried:
+                counts = group_stats['selectors'].setdefault(selector, {'hits': 0, 'misses': 0})
+                counts['hits' if selector == winner else 'misses'] += 1
+            if winner is None:
+                group_stats['failures'] += 1
+            else:
+                group_stats['last'] = winner
+            self.dirty = True
+
+    def find(self, driver, group, selectors, visible=True, accept=None):
+        """Primer elemento que encaja con algún selector del grupo (None si ninguno), en un solo viaje"""
+        ordered = self.ordered(group, selectors)
+        match = driver.execute_script(UNION_QUERY_SCRIPT, ordered, visible, accept)
+        winner = ordered[match[0]] if match else None
+        self.record(group, ordered, winner)
+        if winner is None:
+            logging.debug(f"Ningún selector de '{group}' encontró elementos")
+            return None
+        logging.debug(f"'{group}' encontrado con selector: {winner}")
+        return match[1]
+
+    def wait_for(self, driver, group, selectors, visible=True, accept=None, timeout=None):
+        """Como find, repitiendo la consulta hasta que aparezca o venza el plazo"""
+        ordered = self.ordered(group, selectors)
+
+        def union_match(driver):
+            return driver.execute_script(UNION_QUERY_SCRIPT, ordered, visible, accept) or False
+
+        kwargs = {} if timeout is None else {'timeout': timeout}
+        match = wait_until(driver, union_match, description=f"elementos de '{group}'", **kwargs)
+        winner = ordered[match[0]] if match else None
+        self.record(group, ordered, winner)
+        return match[1] if match else None
+
+    def hit_rates(self, group=None):
+        """{grupo: {selector: aciertos / evaluaciones}}"""
+        groups = [group] if group else list(self.stats)
+        return {
+            name: {
+                selector: counts['hits'] / (counts['hits'] + counts['misses'])
+                for selector, counts in self.stats.get(name, {}).get('selectors', {}).items()
+            }
+            for name in groups
+        }
+
+    def get_summary(self):
+        """Selector ganador y tasa de acierto de cada grupo"""
+        if not self.stats:
+            return "No hay estadísticas de selectores"
+        lines = ["🎯 Selectores (ganador actual, acierto, búsquedas fallidas):"]
+        rates = self.hit_rates()
+        for group, group_stats in sorted(self.stats.items()):
+            last = group_stats.get('last')
+            rate = f"{rates[group][last]:.0%}" if last in rates[group] else "-"
+            lines.append(f"• {group}: {last or 'ninguno'} ({rate}, {group_stats.get('failures', 0)} fallos)")
+        return "\n".join(lines)
+
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def get_selector_engine():
+    """Motor de selectores del proceso, compartido por todos los scrapers"""
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            _engine = SelectorEngine()
+        return _engine
@@ -0,0 +1,108 @@
+"""
+Arranque de sesión sin navegador
+Obtiene cookies y CSRF token con requests puro (inicio -> iniciarReserva)
+para poder llamar a la API sin lanzar Chrome
+"""
+
+import logging
+from html.parser import HTMLParser
+from config import TARGET_URL, RESERVA_URL
+from transport import DEFAULT_TIMEOUT
+
+# Cabeceras de navegación (las de la sesión son de XHR para la API)
+NAVIGATION_HEADERS = {
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,*/*;q=0.8',
+    'Sec-Fetch-Dest': 'document',
+    'Sec-Fetch-Mode': 'navigate',
+    'Sec-Fetch-User': '?1',
+    'Upgrade-Insecure-Requests': '1',
+    'X-Requested-With': None  # requests elimina las cabeceras con valor None
+}
+
+CSRF_META_NAMES = ('_csrf', 'csrf-token')
+CSRF_INPUT_NAMES = ('_csrf', '_token')
+
+
+class SessionBootstrapError(Exception):
+    """No se pudo establecer la sesión por HTTP"""
+
+    def __init__(self, message, rejected=False):
+        super().__init__(message)
+        self.rejected = rejected  # el sitio redirigió a la página de aceptación
+
+
+class CsrfTokenParser(HTMLParser):
+    """Extrae el CSRF token de meta tags, inputs ocultos o atributos data-csrf"""
+
+    def __init__(self):
+        super().__init__()
+        self.token = None
+        self.header_name = None
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+
+        if tag == 'meta':
+            name = attrs.get('name')
+            if name == '_csrf_header' and attrs.get('content'):
+                self.header_name = attrs['content']
+            elif name in CSRF_META_NAMES and attrs.get('content') and not self.token:
+                self.token = attrs['content']
+        elif tag == 'input' and attrs.get('name') in CSRF_INPUT_NAMES and attrs.get('value') and not self.token:
+            self.token = attrs['value']
+        elif attrs.get('data-csrf') and not self.token:
+            self.token = attrs['data-csrf']
+
+
+def parse_csrf_token(html):
+    """Devolver (token, nombre_cabecera) encontrados en el HTML"""
+    parser = CsrfTokenParser()
+    parser.feed(html)
+    parser.close()
+    return parser.token, parser.header_name
+
+
+def is_error_response(response):
+    """Verificar si la respuesta (o alguna redirección) acabó en la página de aceptación"""
+    if "aceptacion" in response.url:
+        return True
+    return any("aceptacion" in (r.headers.get('Location') or r.url) for r in response.history)
+
+
+def bootstrap_session(session, timeout=DEFAULT_TIMEOUT):
+    """
+    Establecer cookies y obtener el CSRF token sin navegador.
+    Devuelve el token o lanza SessionBootstrapError.
+    """
+    logging.info("🌐 Estableciendo sesión por HTTP (sin navegador)...")
+
+    try:
+        response = session.get(TARGET_URL, headers={**NAVIGATION_HEADERS, 'Sec-Fetch-Site': 'none'},
+                               timeout=timeout, allow_redirects=True)
+        if is_error_response(response):
+            raise SessionBootstrapError("Redirigido a página de aceptación en inicio", rejected=True)
+        response.raise_for_status()
+
+        response = session.get(RESERVA_URL, headers={**NAVIGATION_HEADERS, 'Sec-Fetch-Site': 'same-origin', 'Referer': TARGET_URL},
+                               timeout=timeout, allow_redirects=True)
+        if is_error_response(response):
+            raise SessionBootstrapError("Redirigido a página de aceptación en iniciarReserva", rejected=True)
+        response.raise_for_status()
+
+        if "iniciarReserva" not in response.url:
+            raise SessionBootstrapError(f"URL inesperada tras iniciarReserva: {response.url}")
+
+    except SessionBootstrapError:
+        raise
+    except Exception as e:
+        raise SessionBootstrapError(f"Error HTTP en el arranque de sesión: {e}") from e
+
+    token, header_name = parse_csrf_token(response.text)
+    if not token:
+        raise SessionBootstrapError("No se encontró CSRF token en iniciarReserva")
+
+    if header_name and header_name != 'X-CSRF-TOKEN':
+        logging.info(f"ℹ️ El sitio declara la cabecera CSRF '{header_name}'")
+
+    logging.info(f"✅ Sesión HTTP establecida ({len(session.cookies)} cookies, CSRF {token[:20]}...)")
+    return token
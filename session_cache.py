@@ -0,0 +1,116 @@
+"""
+Caché en disco de sesiones HTTP (cookies + CSRF token)
+Permite reutilizar una sesión válida entre reinicios y reintentos
+"""
+
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from config import SESSION_CACHE_FILE, SESSION_CACHE_TTL
+
+
+class SessionCache:
+    def __init__(self, cache_file=SESSION_CACHE_FILE, ttl=SESSION_CACHE_TTL):
+        self.cache_file = cache_file
+        self.ttl = ttl
+        self.lock = threading.RLock()  # el motor asíncrono consulta desde varios hilos
+        self.entries = self.load_entries()
+
+    def load_entries(self):
+        """Cargar la caché desde archivo"""
+        if os.path.exists(self.cache_file):
+            try:
+                with open(self.cache_file, 'r') as f:
+                    return json.load(f)
+            except Exception as e:
+                logging.warning(f"⚠️ Caché de sesión ilegible, se ignora: {e}")
+        return {}
+
+    def save_entries(self):
+        """Guardar la caché de forma atómica (archivo temporal + rename)"""
+        directory = os.path.dirname(os.path.abspath(self.cache_file))
+        try:
+            with self.lock:
+                fd, tmp_path = tempfile.mkstemp(prefix='.session_cache_', suffix='.tmp', dir=directory)
+                try:
+                    with os.fdopen(fd, 'w') as f:
+                        json.dump(self.entries, f, indent=2)
+                        f.flush()
+                        os.fsync(f.fileno())
+                    os.chmod(tmp_path, 0o600)  # contiene cookies de sesión
+                    os.replace(tmp_path, self.cache_file)
+                except Exception:
+                    os.unlink(tmp_path)
+                    raise
+        except Exception as e:
+            logging.error(f"Error al guardar caché de sesión: {e}")
+
+    def get(self, origin):
+        """Obtener la entrada de un origen si existe y no ha caducado"""
+        entry = self.entries.get(origin)
+        if not entry:
+            return None
+
+        age = time.time() - entry.get('created_at', 0)
+        if age >= self.ttl:
+            logging.info(f"⌛ Sesión en caché caducada ({age:.0f}s)")
+            self.invalidate(origin)
+            return None
+
+        return entry
+
+    def store(self, origin, session, csrf_token):
+        """Guardar cookies, CSRF token y user agent de una sesión"""
+        cookies = [
+            {
+                'name': cookie.name,
+                'value': cookie.value,
+                'domain': cookie.domain,
+                'path': cookie.path,
+                'secure': cookie.secure,
+                'expires': cookie.expires
+            }
+            for cookie in session.cookies
+        ]
+
+        with self.lock:
+            self.entries[origin] = {
+                'cookies': cookies,
+                'csrf_token': csrf_token,
+                'user_agent': session.headers.get('User-Agent'),
+                'created_at': time.time()
+            }
+            self.save_entries()
+        logging.info(f"💾 Sesión guardada en caché ({len(cookies)} cookies)")
+
+    def restore(self, origin, session):
+        """Cargar en la sesión la entrada válida de un origen; devuelve el CSRF token o None"""
+        entry = self.get(origin)
+        if not entry:
+            return None
+
+        for cookie in entry['cookies']:
+            session.cookies.set(
+                cookie['name'], cookie['value'],
+                domain=cookie.get('domain') or '', path=cookie.get('path') or '/',
+                secure=cookie.get('secure', False), expires=cookie.get('expires')
+            )
+
+        if entry.get('user_agent'):
+            session.headers['User-Agent'] = entry['user_agent']
+
+        age = time.time() - entry['created_at']
+        logging.info(f"♻️ Sesión restaurada desde caché ({age:.0f}s de antigüedad)")
+        return entry.get('csrf_token')
+
+    def invalidate(self, origin):
+        """Eliminar la entrada de un origen"""
+        with self.lock:
+            removed = self.entries.pop(origin, None) is not None
+            if removed:
+                self.save_entries()
+        if removed:
+            logging.info("🗑️ Sesión en caché invalidada")
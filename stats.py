@@ -8,11 +8,13 @@ import os
 from datetime import datetime, timedelta
 from collections import defaultdict
 import logging
+from config import ALERT_LATENCY_SAMPLES
 
 class BotStats:
     def __init__(self, stats_file="bot_stats.json"):
         self.stats_file = stats_file
         self.stats = self.load_stats()
+        self.dirty = False  # hay contadores en memoria pendientes de guardar
         self.current_hour = datetime.now().replace(minute=0, second=0, microsecond=0)
         self.hourly_stats = defaultdict(lambda: {
             'attempts': 0,
@@ -40,7 +42,8 @@ class BotStats:
             'availability_found_count': 0,
             'total_errors': 0,
             'start_date': datetime.now().isoformat(),
-            'hourly_data': {}
+            'hourly_data': {},
+            'per_date': {}
         }
     
     def save_stats(self):
@@ -48,11 +51,12 @@ class BotStats:
         try:
             with open(self.stats_file, 'w') as f:
                 json.dump(self.stats, f, indent=2)
+            self.dirty = False
         except Exception as e:
             logging.error(f"Error al guardar estadísticas: {e}")
     
-    def record_attempt(self, available_slots, had_error=False):
-        """Registrar un intento de verificación"""
+    def record_attempt(self, available_slots, had_error=False, per_date=None):
+        """Registrar un intento de verificación (per_date: {fecha: plazas} si se vigilan varias fechas)"""
         now = datetime.now()
         current_hour = now.replace(minute=0, second=0, microsecond=0)
         
@@ -70,6 +74,28 @@ class BotStats:
             self.stats['total_errors'] += 1
         
         # Actualizar estadísticas por hora
+        hour_stats = self.get_hour_stats(current_hour)
+        hour_stats['attempts'] += 1
+        hour_stats['total_slots'] += available_slots
+        hour_stats['max_slots'] = max(hour_stats['max_slots'], available_slots)
+        hour_stats['min_slots'] = min(hour_stats['min_slots'], available_slots)
+        hour_stats['end_time'] = now.isoformat()
+        
+        if available_slots > 0:
+            hour_stats['availability_found'] += 1
+        
+        if had_error:
+            hour_stats['errors'] += 1
+        
+        # Actualizar estadísticas por fecha vigilada
+        if per_date:
+            self.record_per_date(per_date, now)
+        
+        # Guardar estadísticas
+        self.save_stats()
+    
+    def get_hour_stats(self, current_hour):
+        """Contadores de una hora (se crean si no existen)"""
         hour_key = current_hour.isoformat()
         if hour_key not in self.stats['hourly_data']:
             self.stats['hourly_data'][hour_key] = {
@@ -82,23 +108,132 @@ class BotStats:
                 'start_time': current_hour.isoformat(),
                 'end_time': current_hour.isoformat()
             }
+        return self.stats['hourly_data'][hour_key]
+    
+    def record_unchanged(self):
+        """Contar una verificación cuyo resultado no cambió (sin escribir a disco)"""
+        now = datetime.now()
+        
+        self.stats['total_attempts'] += 1
+        self.stats['unchanged_checks'] = self.stats.get('unchanged_checks', 0) + 1
         
-        hour_stats = self.stats['hourly_data'][hour_key]
+        hour_stats = self.get_hour_stats(now.replace(minute=0, second=0, microsecond=0))
         hour_stats['attempts'] += 1
-        hour_stats['total_slots'] += available_slots
-        hour_stats['max_slots'] = max(hour_stats['max_slots'], available_slots)
-        hour_stats['min_slots'] = min(hour_stats['min_slots'], available_slots)
+        hour_stats['unchanged'] = hour_stats.get('unchanged', 0) + 1
         hour_stats['end_time'] = now.isoformat()
         
-        if available_slots > 0:
-            hour_stats['availability_found'] += 1
+        self.dirty = True
+    
+    def flush(self):
+        """Guardar los contadores pendientes, si los hay"""
+        if self.dirty:
+            self.save_stats()
+    
+    def record_timings(self, timings):
+        """Acumular los tiempos por fase de una verificación (se guardan con el siguiente guardado)"""
+        if not timings:
+            return
         
-        if had_error:
-            hour_stats['errors'] += 1
+        now = datetime.now()
+        hour_stats = self.get_hour_stats(now.replace(minute=0, second=0, microsecond=0))
+        for phases in (self.stats.setdefault('phase_timings', {}), hour_stats.setdefault('phases', {})):
+            for phase, seconds in timings.items():
+                phase_stats = phases.setdefault(phase, {'count': 0, 'total': 0.0, 'max': 0.0})
+                phase_stats['count'] += 1
+                phase_stats['total'] = round(phase_stats['total'] + seconds, 4)
+                phase_stats['max'] = max(phase_stats['max'], seconds)
+        
+        self.dirty = True
+    
+    def get_phase_summary(self, limit=8):
+        """Fases con más tiempo acumulado (media y máximo por verificación)"""
+        phases = self.stats.get('phase_timings', {})
+        if not phases:
+            return "No hay tiempos por fase"
+        
+        ordered = sorted(phases.items(), key=lambda item: item[1]['total'], reverse=True)[:limit]
+        lines = ["⏱️ Tiempo por fase (media / máx):"]
+        for phase, data in ordered:
+            lines.append(f"• {phase}: {data['total'] / data['count']:.2f}s / {data['max']:.2f}s ({data['count']} veces)")
+        return "\n".join(lines)
+    
+    def record_alert_latency(self, summary):
+        """Guardar el tiempo hasta la alerta de una transición (últimas ALERT_LATENCY_SAMPLES muestras por etapa y canal)"""
+        latency = self.stats.setdefault('alert_latency', {})
+        observations = dict(summary['stages'], **summary['channels'])
+        for name, seconds in observations.items():
+            samples = latency.setdefault(name, [])
+            samples.append(round(seconds, 3))
+            del samples[:-ALERT_LATENCY_SAMPLES]
         
-        # Guardar estadísticas
         self.save_stats()
     
+    def get_alert_latency_summary(self):
+        """Tiempo hasta la alerta por etapa y canal (p50 / p95 / máx)"""
+        latency = self.stats.get('alert_latency', {})
+        if not latency:
+            return "No hay alertas medidas"
+        
+        rows = []
+        for name, samples in latency.items():
+            ordered = sorted(samples)
+            p50 = ordered[len(ordered) // 2]
+            p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+            rows.append((p50, f"• {name}: {p50:.1f}s / {p95:.1f}s / {ordered[-1]:.1f}s ({len(ordered)} alertas)"))
+        
+        lines = ["🚨 Tiempo hasta la alerta (p50 / p95 / máx):"]
+        lines.extend(line for _, line in sorted(rows))
+        return "\n".join(lines)
+    
+    def record_per_date(self, per_date, now):
+        """Actualizar los contadores de cada fecha vigilada"""
+        dates_stats = self.stats.setdefault('per_date', {})
+        
+        for date_key, slots in per_date.items():
+            date_stats = dates_stats.setdefault(date_key, {
+                'attempts': 0,
+                'errors': 0,
+                'availability_found': 0,
+                'max_slots': 0,
+                'last_slots': None,
+                'last_check': None
+            })
+            date_stats['attempts'] += 1
+            date_stats['last_check'] = now.isoformat()
+            
+            if slots == -1:
+                date_stats['errors'] += 1
+                continue
+            
+            date_stats['last_slots'] = slots
+            date_stats['max_slots'] = max(date_stats['max_slots'], slots)
+            if slots > 0:
+                date_stats['availability_found'] += 1
+    
+    def get_per_date_summary(self):
+        """Resumen de las fechas vigiladas"""
+        dates_stats = self.stats.get('per_date', {})
+        if not dates_stats:
+            return "No hay datos por fecha"
+        
+        lines = []
+        for date_key, data in dates_stats.items():
+            last_slots = data['last_slots'] if data['last_slots'] is not None else 'N/A'
+            lines.append(f"📅 {date_key}: {last_slots} plazas (máx {data['max_slots']}, "
+                         f"disponible {data['availability_found']}/{data['attempts']}, errores {data['errors']})")
+        return "\n".join(lines)
+    
+    def get_summary(self):
+        """Resumen global más el detalle por fecha vigilada"""
+        summary = self.get_global_summary()
+        if self.stats.get('per_date'):
+            summary += "\n\n" + self.get_per_date_summary()
+        if self.stats.get('phase_timings'):
+            summary += "\n\n" + self.get_phase_summary()
+        if self.stats.get('alert_latency'):
+            summary += "\n\n" + self.get_alert_latency_summary()
+        return summary
+    
     def get_hourly_summary(self, hour=None):
         """Obtener resumen de una hora específica"""
         if hour is None:
@@ -149,7 +284,8 @@ class BotStats:
 📈 Promedio de plazas: {avg_slots:.1f}
 🏆 Máximo de plazas encontradas: {self.stats['max_slots_found']}
 ✅ Veces con disponibilidad: {self.stats['availability_found_count']}
-❌ Total de errores: {self.stats['total_errors']}"""
+❌ Total de errores: {self.stats['total_errors']}
+💤 Verificaciones sin cambios: {self.stats.get('unchanged_checks', 0)}"""
     
     def cleanup_old_data(self, days_to_keep=7):
         """Limpiar datos antiguos (más de X días)"""
@@ -168,6 +304,16 @@ class BotStats:
         for key in old_keys:
             del self.stats['hourly_data'][key]
         
+        # Limpiar fechas vigiladas ya pasadas
+        per_date = self.stats.get('per_date', {})
+        for date_key in list(per_date):
+            try:
+                if datetime.strptime(date_key[:10], '%d/%m/%Y') < cutoff_hour:
+                    del per_date[date_key]
+                    old_keys.append(date_key)
+            except ValueError:
+                continue
+        
         if old_keys:
             logging.info(f"Limpiados {len(old_keys)} registros antiguos")
             self.save_stats()
@@ -0,0 +1,237 @@
+"""
+Cadena de estrategias de verificación con fallback automático
+Prueba primero la estrategia más barata que esté sana (API pura, después
+híbrida, después el flujo HTML completo) y pasa a la siguiente si falla.
+Cada estrategia tiene su circuit breaker:
+- closed: se usa con normalidad
+- open: tras CIRCUIT_FAILURE_THRESHOLD fallos seguidos se salta durante CIRCUIT_COOLDOWN segundos
+- half_open: pasado el enfriamiento se deja pasar una verificación de prueba;
+  si sale bien se cierra, si falla se vuelve a abrir
+También guarda la latencia reciente de cada estrategia.
+"""
+
+import logging
+import statistics
+import time
+from collections import deque
+from datetime import datetime
+from config import TARGET_DATE, SCRAPER_STRATEGIES, CIRCUIT_FAILURE_THRESHOLD, CIRCUIT_COOLDOWN, STRATEGY_LATENCY_WINDOW
+from metrics import STRATEGY_CHECKS, STRATEGY_SECONDS, CIRCUIT_STATE
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}  # valor del gauge cies_circuit_state
+
+
+class CircuitBreaker:
+    def __init__(self, name, failure_threshold=CIRCUIT_FAILURE_THRESHOLD, cooldown=CIRCUIT_COOLDOWN, clock=time.monotonic):
+        self.name = name
+        self.failure_threshold = max(1, failure_threshold)
+        self.cooldown = cooldown
+        self.clock = clock
+        self.state = CLOSED
+        self.failures = 0  # fallos seguidos
+        self.opened_at = None
+        self.trips = 0
+        CIRCUIT_STATE.set(STATE_VALUES[CLOSED], strategy=name)
+
+    def set_state(self, state):
+        if state != self.state:
+            logging.info(f"🔌 Circuito '{self.name}': {self.state} -> {state}")
+        self.state = state
+        CIRCUIT_STATE.set(STATE_VALUES[state], strategy=self.name)
+
+    def allow(self):
+        """¿Se puede usar la estrategia ahora? Pasado el enfriamiento, el circuito queda a prueba"""
+        if self.state == OPEN and self.clock() - self.opened_at >= self.cooldown:
+            self.set_state(HALF_OPEN)
+        return self.state != OPEN
+
+    def record_success(self):
+        self.failures = 0
+        self.set_state(CLOSED)
+
+    def record_failure(self):
+        self.failures += 1
+        if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+            self.opened_at = self.clock()
+            self.trips += 1
+            self.set_state(OPEN)
+
+    def remaining_cooldown(self):
+        """Segundos hasta que el circuito abierto admita una prueba"""
+        if self.state != OPEN:
+            return 0
+        return max(0, self.cooldown - (self.clock() - self.opened_at))
+
+
+class Strategy:
+    """Una forma de verificar: factory() crea el scraper la primera vez; check(scraper) devuelve el resultado"""
+
+    def __init__(self, name, factory, check):
+        self.name = name
+        self.factory = factory
+        self.check = check
+        self.scraper = None
+
+    def get_scraper(self):
+        if self.scraper is None:
+            self.scraper = self.factory()
+        return self.scraper
+
+    def run(self):
+        return self.check(self.get_scraper())
+
+    def close(self):
+        if self.scraper is not None:
+            self.scraper.close_driver()
+
+
+def build_strategy(name):
+    """Estrategias conocidas: 'api', 'hybrid' y 'html' (los scrapers se importan solo si se usan)"""
+    if name == 'api':
+        from scraper_optimized import OptimizedCiesScraper
+        return Strategy('api', OptimizedCiesScraper, lambda scraper: scraper.check_availability_optimized())
+    if name == 'hybrid':
+        from scraper_hybrid import HybridCiesScraper
+        return Strategy('hybrid', HybridCiesScraper, lambda scraper: scraper.check_availability_hybrid())
+    if name == 'html':
+        from scraper import CiesScraper
+        return Strategy('html', CiesScraper, lambda scraper: scraper.check_availability())
+    raise ValueError(f"Estrategia desconocida: '{name}' (usa api, hybrid o html)")
+
+
+def is_success(result):
+    """Una estrategia acierta si devuelve plazas (aunque sean 0)"""
+    return result is not None and not result.get('detection_error')
+
+
+class StrategyChain:
+    def __init__(self, strategies=None, failure_threshold=CIRCUIT_FAILURE_THRESHOLD, cooldown=CIRCUIT_COOLDOWN,
+                 latency_window=STRATEGY_LATENCY_WINDOW, clock=time.monotonic):
+        """
+        strategies: lista de Strategy en orden de preferencia (por defecto SCRAPER_STRATEGIES, p. ej. 'api,hybrid,html')
+        """
+        if strategies is None:
+            strategies = [build_strategy(name.strip()) for name in SCRAPER_STRATEGIES.split(',') if name.strip()]
+        if not strategies:
+            raise ValueError("La cadena necesita al menos una estrategia")
+        self.strategies = strategies
+        self.breakers = {s.name: CircuitBreaker(s.name, failure_threshold, cooldown, clock) for s in strategies}
+        self.latencies = {s.name: deque(maxlen=latency_window) for s in strategies}
+        self.clock = clock
+        self.last_strategy = None
+        self.last_timings = {}
+
+    @property
+    def rejections(self):
+        """Redirecciones a 'aceptacion' sumadas de todos los scrapers creados (las lee el planificador)"""
+        return sum(s.scraper.rejections for s in self.strategies if s.scraper is not None)
+
+    def run_strategy(self, strategy):
+        """Ejecutar una estrategia midiendo su latencia; las excepciones cuentan como fallo"""
+        start = self.clock()
+        try:
+            result = strategy.run()
+        except Exception as e:
+            logging.error(f"Error en la estrategia '{strategy.name}': {e}")
+            result = None
+        if result is not None and result.get('status') == 'retry_deferred':
+            return result  # no hubo intento: no cuenta para la latencia
+        elapsed = self.clock() - start
+        self.latencies[strategy.name].append(elapsed)
+        STRATEGY_SECONDS.observe(elapsed, strategy=strategy.name)
+        return result
+
+    def check_availability(self):
+        """
+        Verificar con la primera estrategia sana que dé datos; el resultado lleva 'strategy'.
+        Si todas fallan devuelve el último resultado con error (o None), con el 'retry_in'
+        más cercano que haya pedido alguna estrategia.
+        Si ninguna llegó a intentarlo (circuitos abiertos o reintentos diferidos) devuelve
+        un resultado 'circuit_open' con el 'retry_in' hasta que alguna vuelva a estar disponible.
+        """
+        last_result = None
+        attempted = False
+        retries = []
+        for strategy in self.strategies:
+            breaker = self.breakers[strategy.name]
+            if not breaker.allow():
+                logging.debug(f"Estrategia '{strategy.name}' saltada: circuito abierto ({breaker.remaining_cooldown():.0f}s)")
+                continue
+
+            logging.info(f"🧭 Verificando con la estrategia '{strategy.name}'...")
+            result = self.run_strategy(strategy)
+            self.last_strategy = strategy.name
+            self.last_timings = getattr(strategy.scraper, 'last_timings', {}) or {}
+
+            if is_success(result):
+                breaker.record_success()
+                STRATEGY_CHECKS.inc(strategy=strategy.name, outcome='ok')
+                result['strategy'] = strategy.name
+                return result
+
+            if result is not None and result.get('status') == 'retry_deferred':
+                # La estrategia espera su reintento: no es un fallo nuevo para el circuito
+                retries.append(result['retry_in'])
+                continue
+
+            attempted = True
+            breaker.record_failure()
+            STRATEGY_CHECKS.inc(strategy=strategy.name, outcome='failed')
+            logging.warning(f"⚠️ La estrategia '{strategy.name}' no obtuvo datos, pasando a la siguiente")
+            if result is not None:
+                result['strategy'] = strategy.name
+                last_result = result
+                if result.get('retry_in') is not None:
+                    retries.append(result['retry_in'])
+
+        if not attempted:
+            return self.waiting_result(retries)
+        if last_result is not None and retries:
+            last_result['retry_in'] = min(retries)
+        return last_result
+
+    def waiting_result(self, retries):
+        """Resultado sin intento: ninguna estrategia disponible hasta 'retry_in' (no es un error nuevo)"""
+        waits = retries + [b.remaining_cooldown() for b in self.breakers.values() if b.state == OPEN]
+        retry_in = min(waits) if waits else None
+        if all(b.state == OPEN for b in self.breakers.values()):
+            logging.error("❌ Todas las estrategias tienen el circuito abierto")
+        logging.warning(f"⏳ Ninguna estrategia disponible; siguiente intento en {retry_in or 0:.0f}s")
+        return {
+            'date': TARGET_DATE,
+            'available_slots': -1,
+            'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            'has_availability': None,
+            'status': 'circuit_open',
+            'detection_error': True,
+            'strategy': None,
+            'retry_in': retry_in
+        }
+
+    def latency_summary(self, name):
+        """{'samples', 'p50', 'max'} de la latencia reciente de una estrategia (None sin muestras)"""
+        samples = list(self.latencies[name])
+        if not samples:
+            return None
+        return {'samples': len(samples), 'p50': statistics.median(samples), 'max': max(samples)}
+
+    def get_summary(self):
+        """Estado del circuito y latencia reciente de cada estrategia"""
+        lines = ["🧭 Estrategias (circuito, latencia p50/máx):"]
+        for strategy in self.strategies:
+            breaker = self.breakers[strategy.name]
+            latency = self.latency_summary(strategy.name)
+            timing = f"{latency['p50']:.2f}s/{latency['max']:.2f}s" if latency else "sin datos"
+            lines.append(f"• {strategy.name}: {breaker.state} ({breaker.trips} aperturas), {timing}")
+        return "\n".join(lines)
+
+    def close_driver(self):
+        """Cerrar los navegadores de todas las estrategias creadas"""
+        for strategy in self.strategies:
+            try:
+                strategy.close()
+            except Exception as e:
+                logging.error(f"Error cerrando la estrategia '{strategy.name}': {e}")
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Script de prueba del tiempo hasta la alerta (alert_latency.py)
+Usa el calendario real de cies_manual_flow.har y un notificador falso
+"""
+
+import logging
+import os
+import sys
+import tempfile
+import time
+from datetime import date
+
+# Agregar el directorio actual al path para importar módulos
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from alert_latency import AlertTrace, format_alert_latency
+from async_engine import AsyncQueryEngine
+from query_matrix import QueryKey
+from scraper_hybrid import HybridCiesScraper
+from scraper_optimized import OptimizedCiesScraper
+from session_cache import SessionCache
+from stats import BotStats
+from test_calendar_sweep import FakeApiScraper, load_har_calendar
+import metrics
+
+# Configurar logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+
+class FakeNotifier:
+    """Canales con retardos fijos; el de WhatsApp falla"""
+
+    def __init__(self):
+        self.delays = {'telegram': 0.02, 'email': 0.05, 'whatsapp': 0.01}
+
+    def send(self, channel):
+        time.sleep(self.delays[channel])
+        return channel != 'whatsapp'
+
+    def send_alert(self, availability_data, trace=None):
+        success_count = 0
+        for channel in ('telegram', 'email', 'whatsapp'):
+            if self.send(channel):
+                success_count += 1
+                if trace:
+                    trace.delivered(channel)
+        return success_count > 0
+
+def test_alert_trace():
+    """Las etapas y entregas se miden desde la respuesta upstream"""
+    trace = AlertTrace(time.monotonic() - 0.1)
+    trace.mark('detected')
+    trace.mark('enqueued')
+    assert FakeNotifier().send_alert({}, trace=trace)
+
+    summary = trace.summary()
+    assert set(summary['stages']) == {'detected', 'enqueued'}
+    assert set(summary['channels']) == {'telegram', 'email'}  # WhatsApp no confirmó
+    assert 0.1 <= summary['stages']['detected'] <= summary['stages']['enqueued']
+    assert summary['first_delivery'] == summary['channels']['telegram']
+    assert summary['channels']['email'] - summary['channels']['telegram'] >= 0.05
+
+    text = format_alert_latency(summary)
+    assert text.startswith('detectado') and text.index('telegram') < text.index('email')
+    assert format_alert_latency(AlertTrace().summary()) == 'sin entregas'
+
+    logging.info(f"✅ Tiempo hasta la alerta: {text}")
+    return True
+
+def test_engine_received_at():
+    """El motor guarda cuándo llegaron las respuestas de cada barrido"""
+    scraper = FakeApiScraper(load_har_calendar())
+    engine = AsyncQueryEngine(scraper, concurrency=2)
+    key = (QueryKey('1', '1', ''), 2025, 8)
+
+    before = time.monotonic()
+    engine.run_batch([(key, [date(2025, 8, 24)])])
+    first = engine.received_at[key]
+    assert before <= first <= time.monotonic()
+
+    # Un barrido sin cambios también actualiza la hora de recepción
+    engine.run_batch([(key, [date(2025, 8, 24)])])
+    assert engine.received_at[key] > first
+    engine.close()
+
+    logging.info("✅ Hora de recepción registrada por barrido")
+    return True
+
+class FakeApiResponse:
+    """Respuesta 200 de recuperarPlazasTotales con 3 plazas"""
+    url = 'https://cies.test/illasr/recuperarPlazasTotales'
+    history = []
+    status_code = 200
+    content = b'{"existenDatos": true, "plazasOcupadas": "3"}'
+    text = content.decode()
+
+def test_api_result_upstream_at():
+    """Los scrapers de API devuelven la hora de la respuesta de plazas"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for scraper in (OptimizedCiesScraper(), HybridCiesScraper()):
+            scraper.session_cache = SessionCache(os.path.join(tmp_dir, 'session_cache.json'))
+            scraper.csrf_token = 'token'
+            scraper.http_session_ready = True
+            scraper.session.post = lambda url, **kwargs: FakeApiResponse()
+
+            before = time.monotonic()
+            result = (scraper.check_availability_optimized() if isinstance(scraper, OptimizedCiesScraper)
+                      else scraper.check_availability_hybrid())
+            assert result['available_slots'] == 3
+            assert before <= result['upstream_at'] <= time.monotonic()
+
+    logging.info("✅ Hora de la respuesta upstream en el resultado de los scrapers de API")
+    return True
+
+def test_stats_and_metrics():
+    """BotStats guarda muestras acotadas y las métricas las observan por canal"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        stats = BotStats(os.path.join(tmp_dir, 'stats.json'))
+        for seconds in range(1, 251):
+            stats.record_alert_latency({'stages': {'detected': 0.2}, 'channels': {'telegram': float(seconds)}, 'first_delivery': float(seconds)})
+
+        latency = BotStats(os.path.join(tmp_dir, 'stats.json')).stats['alert_latency']
+        assert len(latency['telegram']) == 200 and latency['telegram'][0] == 51.0
+
+        summary = stats.get_alert_latency_summary()
+        assert summary.splitlines()[1].startswith('• detected: 0.2s')
+        assert '• telegram: 151.0s / 241.0s / 250.0s (200 alertas)' in summary
+        assert 'Tiempo hasta la alerta' in stats.get_summary()
+
+    metrics.record_alert_latency({'stages': {'detected': 0.3}, 'channels': {'email': 4.0}, 'first_delivery': 4.0})
+    text = metrics.REGISTRY.render()
+    assert 'cies_alert_stage_seconds_bucket{stage="detected",le="0.5"} 1' in text
+    assert 'cies_time_to_alert_seconds_bucket{channel="email",le="2.0"} 0' in text
+    assert 'cies_time_to_alert_seconds_bucket{channel="email",le="5.0"} 1' in text
+
+    logging.info("✅ Tiempos hasta la alerta agregados en estadísticas y métricas")
+    return True
+
+if __name__ == "__main__":
+    test_alert_trace()
+    test_engine_received_at()
+    test_api_result_upstream_at()
+    test_stats_and_metrics()
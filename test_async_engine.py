@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Script de prueba para el motor asíncrono de consultas
+Usa el calendario real de cies_manual_flow.har con llamadas simuladas lentas
+"""
+
+import logging
+import sys
+import os
+import threading
+import time
+from datetime import date
+
+# Agregar el directorio actual al path para importar módulos
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from async_engine import AsyncQueryEngine
+from query_matrix import QueryKey
+from test_calendar_sweep import FakeApiScraper, load_har_calendar
+
+# Configurar logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+
+class SlowApiScraper(FakeApiScraper):
+    """Cada petición de plazas tarda `delay` segundos; registra el máximo de peticiones en vuelo"""
+
+    def __init__(self, calendar_text, delay=0.2):
+        super().__init__(calendar_text)
+        self.delay = delay
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    def call_plazas_api(self, fecha=None, **params):
+        with self.lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            time.sleep(self.delay)
+            return super().call_plazas_api(fecha, **params)
+        finally:
+            with self.lock:
+                self.in_flight -= 1
+
+    def extract_slots(self, api_result, source):
+        return -1 if api_result is None else super().extract_slots(api_result, source)
+
+def test_bounded_concurrency():
+    """Las confirmaciones se lanzan en paralelo sin superar el límite"""
+    scraper = SlowApiScraper(load_har_calendar())
+    engine = AsyncQueryEngine(scraper, concurrency=3)
+    batch = [((QueryKey('1', '1', ''), 2025, 8), [date(2025, 8, d) for d in range(24, 32)])]
+
+    start = time.time()
+    results = engine.run_batch(batch)
+    elapsed = time.time() - start
+    engine.close()
+
+    availability = results[(QueryKey('1', '1', ''), 2025, 8)]
+    assert len(scraper.plazas_calls) == 8
+    assert scraper.max_in_flight == 3
+    assert availability[date(2025, 8, 24)]['available_slots'] == 4
+    assert elapsed < 8 * scraper.delay
+
+    logging.info(f"✅ 8 confirmaciones en {elapsed:.2f}s con {scraper.max_in_flight} en vuelo")
+    return True
+
+def test_request_deadline():
+    """Una petición que supera el plazo se abandona y el día queda sin confirmar"""
+    scraper = SlowApiScraper(load_har_calendar(), delay=1.0)
+    engine = AsyncQueryEngine(scraper, concurrency=2, request_deadline=0.2)
+    batch = [((QueryKey('1', '1', ''), 2025, 8), [date(2025, 8, 16)])]
+
+    results = engine.run_batch(batch)
+    engine.close()
+
+    availability = results[(QueryKey('1', '1', ''), 2025, 8)]
+    assert engine.stats['timeouts'] == 1
+    assert availability[date(2025, 8, 16)]['available_slots'] == -1
+
+    logging.info("✅ Petición lenta abandonada tras el plazo")
+    return True
+
+if __name__ == "__main__":
+    test_bounded_concurrency()
+    test_request_deadline()
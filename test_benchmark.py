@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Script de prueba de la suite de benchmarks (benchmark.py)
+Mide un scraper HTTP mínimo contra el servidor de replay, sin navegador
+"""
+
+import logging
+import sys
+import os
+
+# Agregar el directorio actual al path para importar módulos
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import session_bootstrap
+from benchmark import percentile, bench_scraper, compare_with_baseline
+from har_replay_server import ReplayState, start_replay_server
+from test_har_replay import free_port, replay_origin
+from transport import TransportSession
+
+# Configurar logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+
+class HttpOnlyScraper:
+    """Scraper mínimo: arranque de sesión una vez y una petición de plazas por verificación"""
+
+    def __init__(self, origin):
+        self.origin = origin
+        self.session = TransportSession()
+        self.csrf_token = None
+
+    def check(self):
+        if not self.csrf_token:
+            self.csrf_token = session_bootstrap.bootstrap_session(self.session)
+        response = self.session.post(
+            f"{self.origin}/illasr/recuperarPlazasTotales",
+            data={'fecha': '02/08/2025', 'numPlazas': '1', 'idIsla': '1', 'idTipoCupo': ''},
+            headers={'X-CSRF-TOKEN': self.csrf_token}
+        )
+        slots = int(response.json()['plazasOcupadas'])
+        return {'available_slots': slots, 'detection_error': False}
+
+def test_percentile():
+    """Percentiles con interpolación lineal"""
+    values = [0.1, 0.2, 0.3, 0.4, 0.5]
+    assert percentile(values, 50) == 0.3
+    assert abs(percentile(values, 95) - 0.48) < 1e-9
+    assert percentile([0.7], 99) == 0.7
+    assert percentile([], 50) is None
+
+    logging.info("✅ Percentiles correctos")
+    return True
+
+def test_compare_with_baseline():
+    """Solo se señalan las métricas que empeoran más que la tolerancia"""
+    baseline = {'scrapers': {'optimized': {'p50': 0.10, 'p95': 0.20, 'requests_per_check': 1.0, 'chrome_peak_rss_mb': None}}}
+    results = {'scrapers': {'optimized': {'p50': 0.11, 'p95': 0.30, 'requests_per_check': 1.0, 'chrome_peak_rss_mb': 300.0},
+                            'hybrid': {'p50': 5.0}}}
+
+    regressions = compare_with_baseline(results, baseline, tolerance=0.2)
+    assert regressions == [('optimized', 'p95', 0.20, 0.30)]
+
+    logging.info("✅ Comparación con la línea base correcta")
+    return True
+
+def test_bench_http_scraper():
+    """Métricas de un scraper HTTP contra el replay: 3 peticiones en frío y 1 en caliente"""
+    server = start_replay_server(ReplayState(), port=free_port())
+
+    try:
+        with replay_origin(server.origin):
+            metrics = bench_scraper(
+                factory=lambda: HttpOnlyScraper(server.origin),
+                check=lambda scraper: scraper.check(),
+                iterations=6,
+                origin=server.origin
+            )
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    assert metrics['errors'] == 0
+    assert metrics['cold_start'] > 0
+    assert metrics['p50'] <= metrics['p95'] <= metrics['p99']
+    # Frío: inicio + iniciarReserva + plazas; después una sola petición por verificación
+    assert metrics['requests_per_check'] == (3 + 5 * 1) / 6
+    assert metrics['python_peak_rss_mb'] > 0
+
+    logging.info(f"✅ Benchmark HTTP: p50 {metrics['p50'] * 1000:.1f}ms, {metrics['requests_per_check']:.2f} peticiones/verificación")
+    return True
+
+if __name__ == "__main__":
+    test_percentile()
+    test_compare_with_baseline()
+    test_bench_http_scraper()
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Script de prueba para el barrido mensual con recuperarCalendario
+Usa la respuesta real guardada en cies_manual_flow.har
+"""
+
+import json
+import logging
+import sys
+import os
+from datetime import date
+
+# Agregar el directorio actual al path para importar módulos
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from async_engine import AsyncQueryEngine
+from calendar_sweep import parse_calendar_response, is_bookable
+
+HAR_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cies_manual_flow.har')
+
+# Configurar logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+
+def load_har_calendar():
+    """Obtener el cuerpo de recuperarCalendario del HAR"""
+    with open(HAR_FILE) as f:
+        har = json.load(f)
+    for entry in har['log']['entries']:
+        if entry['request']['url'].endswith('recuperarCalendario'):
+            return entry['response']['content']['text']
+    return None
+
+class FakeApiScraper:
+    """Scraper falso que responde con los datos del HAR y cuenta las llamadas"""
+
+    def __init__(self, calendar_text):
+        self.calendar_text = calendar_text
+        self.plazas_calls = []
+
+    def ensure_api_session(self):
+        return True
+
+    def call_calendario_api(self, ano, mes, **params):
+        return json.loads(self.calendar_text)
+
+    def call_plazas_api(self, fecha=None, **params):
+        self.plazas_calls.append(fecha)
+        return {'existenDatos': True, 'plazasOcupadas': '4'}
+
+    def extract_slots(self, api_result, source):
+        return int(api_result['plazasOcupadas'])
+
+def test_parse_calendar_response():
+    """Probar la conversión de fechas epoch a días locales"""
+    days = parse_calendar_response(load_har_calendar())
+
+    assert len(days) == 31
+    assert min(days) == date(2025, 8, 1)
+    assert max(days) == date(2025, 8, 31)
+    assert days[date(2025, 8, 2)] == '2'
+    assert is_bookable(days[date(2025, 8, 16)])
+    assert not is_bookable(days[date(2025, 8, 2)])
+
+    logging.info("✅ Calendario de agosto 2025 parseado correctamente")
+    return True
+
+def test_sweep_month_only_queries_bookable_days():
+    """Probar que solo se consulta recuperarPlazasTotales para días reservables"""
+    scraper = FakeApiScraper(load_har_calendar())
+    engine = AsyncQueryEngine(scraper)
+    availability = engine.run_batch([((None, 2025, 8), None)])[(None, 2025, 8)]
+    engine.close()
+
+    bookable = [d for d, info in availability.items() if info['bookable']]
+    assert len(scraper.plazas_calls) == len(bookable)
+    assert '16/08/2025' in scraper.plazas_calls
+    assert availability[date(2025, 8, 16)]['available_slots'] == 4
+    assert availability[date(2025, 8, 2)]['available_slots'] == 0
+
+    logging.info(f"✅ Barrido con 1 petición de calendario + {len(scraper.plazas_calls)} de plazas")
+    return True
+
+if __name__ == "__main__":
+    test_parse_calendar_response()
+    test_sweep_month_only_queries_bookable_days()
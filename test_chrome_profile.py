@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Script de prueba de los perfiles de Chrome en RAM (chrome_profile.py)
+Trabaja en un directorio temporal y con un Chrome falso: no abre el navegador
+"""
+
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+
+# Agregar el directorio actual al path para importar módulos
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import chrome_profile
+from chrome_profile import ProfileManager, PROFILE_PREFIX, TEMPLATE_NAME, launch_chrome
+from selenium.webdriver.chrome.options import Options
+
+# Configurar logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+
+def dead_pid():
+    """Un PID que no corresponde a ningún proceso"""
+    pid = 999999
+    while chrome_profile.pid_alive(pid):
+        pid -= 1
+    return pid
+
+def test_template_cloned_per_driver():
+    """La plantilla se crea una vez; cada navegador recibe su copia y se borra al liberarla"""
+    with tempfile.TemporaryDirectory() as root:
+        profiles = ProfileManager(root=root)
+        first = profiles.new_profile()
+        second = profiles.new_profile()
+
+        assert first != second and os.path.basename(first).startswith(f"{PROFILE_PREFIX}{os.getpid()}-")
+        with open(os.path.join(first, 'Default', 'Preferences')) as f:
+            assert json.load(f)['browser']['check_default_browser'] is False
+        assert os.path.exists(os.path.join(second, 'First Run'))
+
+        profiles.release(first)
+        assert not os.path.exists(first) and os.path.isdir(profiles.template)
+        profiles.release_all()
+        assert not os.path.exists(second)
+
+    logging.info("✅ Plantilla clonada por navegador")
+    return True
+
+def test_cleanup_stale_profiles():
+    """Solo se borran los perfiles de procesos muertos; nunca la plantilla ni los de procesos vivos"""
+    with tempfile.TemporaryDirectory() as root:
+        profiles = ProfileManager(root=root)
+        active = profiles.new_profile()
+        orphan = os.path.join(root, f"{PROFILE_PREFIX}{dead_pid()}-abcd1234")
+        idle_spare = os.path.join(root, f"{PROFILE_PREFIX}1-old00000")  # PID 1 siempre existe
+        for path in (orphan, idle_spare):
+            os.makedirs(path)
+        past = time.time() - 7 * 24 * 3600
+        os.utime(idle_spare, (past, past))  # otro bot con una reserva sin usar desde hace días
+
+        assert profiles.cleanup_stale() == 1
+        assert not os.path.exists(orphan)
+        assert os.path.exists(idle_spare) and os.path.exists(active)
+        assert os.path.isdir(os.path.join(root, TEMPLATE_NAME))
+
+    logging.info("✅ Perfiles huérfanos eliminados")
+    return True
+
+def test_launch_uses_cached_binaries_and_releases_profile():
+    """launch_chrome pone binario y perfil; quit() borra el perfil; los binarios se resuelven una vez"""
+    chrome_profile.resolve_binaries.cache_clear()
+    lookups = []
+    original_which = chrome_profile.shutil.which
+    original_chrome = chrome_profile.webdriver.Chrome
+
+    class FakeChrome:
+        def __init__(self, service=None, options=None):
+            self.options = options
+            self.quitted = False
+
+        def quit(self):
+            self.quitted = True
+
+    def fake_which(name):
+        lookups.append(name)
+        return {'chromium': '/usr/bin/chromium', 'chromedriver': '/usr/bin/chromedriver'}.get(name)
+
+    chrome_profile.shutil.which = fake_which
+    chrome_profile.webdriver.Chrome = FakeChrome
+    try:
+        with tempfile.TemporaryDirectory() as root:
+            profiles = ProfileManager(root=root)
+            drivers = [launch_chrome(Options(), profiles) for _ in range(3)]
+
+            assert drivers[0].options.binary_location == '/usr/bin/chromium'
+            assert f'--user-data-dir={drivers[0].profile_dir}' in drivers[0].options.arguments
+            assert lookups.count('chromedriver') == 1  # caché por proceso
+
+            drivers[0].quit()
+            assert drivers[0].quitted and not os.path.exists(drivers[0].profile_dir)
+            assert os.path.exists(drivers[1].profile_dir)
+            profiles.release_all()
+    finally:
+        chrome_profile.shutil.which = original_which
+        chrome_profile.webdriver.Chrome = original_chrome
+        chrome_profile.resolve_binaries.cache_clear()
+
+    logging.info("✅ Binarios en caché y perfil liberado al cerrar")
+    return True
+
+if __name__ == "__main__":
+    test_template_cloned_per_driver()
+    test_cleanup_stale_profiles()
+    test_launch_uses_cached_binaries_and_releases_profile()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Script de prueba para el puente de cookies Selenium <-> requests
+Usa un driver falso que cuenta los round trips
+"""
+
+import logging
+import sys
+import os
+
+# Agregar el directorio actual al path para importar módulos
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import requests
+from cookie_bridge import CookieBridge
+
+# Configurar logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+
+HOST = 'autorizacionillasatlanticas.xunta.gal'
+
+class FakeDriver:
+    """Driver falso con un jar de cookies y contador de llamadas a get_cookies()"""
+
+    def __init__(self):
+        self.current_url = f"https://{HOST}/illasr/iniciarReserva"
+        self.cookies = [
+            {'name': 'JSESSIONID', 'value': 'raiz', 'domain': HOST, 'path': '/', 'secure': True, 'httpOnly': True},
+            {'name': 'JSESSIONID', 'value': 'illasr', 'domain': HOST, 'path': '/illasr', 'secure': True, 'httpOnly': True}
+        ]
+        self.get_cookies_calls = 0
+
+    def get_cookies(self):
+        self.get_cookies_calls += 1
+        return [dict(c) for c in self.cookies]
+
+    def add_cookie(self, cookie):
+        self.cookies = [c for c in self.cookies if (c['name'], c['path']) != (cookie['name'], cookie['path'])]
+        self.cookies.append(dict(cookie, domain=cookie.get('domain', HOST)))
+
+def test_sync_only_when_browser_changed():
+    """Solo se lee el navegador tras usarlo y se conservan dominio y ruta"""
+    session = requests.Session()
+    bridge = CookieBridge(session)
+    driver = FakeDriver()
+    bridge.attach(driver)
+
+    assert bridge.browser_to_session()
+    for _ in range(10):
+        bridge.browser_to_session()  # polls de la API sin tocar el navegador
+
+    assert driver.get_cookies_calls == 1
+    assert session.cookies.get('JSESSIONID', path='/illasr') == 'illasr'
+    assert session.cookies.get('JSESSIONID', path='/') == 'raiz'
+
+    bridge.mark_browser_changed()
+    assert not bridge.browser_to_session()  # releído pero sin cambios
+    assert driver.get_cookies_calls == 2
+
+    logging.info(f"✅ Sincronización incremental: {bridge.stats}")
+    return True
+
+def test_session_cookies_reach_browser():
+    """Las cookies que fija la API llegan al navegador en el siguiente uso"""
+    session = requests.Session()
+    bridge = CookieBridge(session)
+    driver = FakeDriver()
+    bridge.attach(driver)
+    bridge.browser_to_session()
+
+    session.cookies.set('JSESSIONID', 'renovada', domain=HOST, path='/illasr')
+    bridge.attach(None)
+    bridge.attach(driver)
+
+    pushed = {(c['name'], c['path']): c['value'] for c in driver.cookies}
+    assert pushed[('JSESSIONID', '/illasr')] == 'renovada'
+    assert pushed[('JSESSIONID', '/')] == 'raiz'
+
+    logging.info("✅ Cookies de la API enviadas al navegador")
+    return True
+
+if __name__ == "__main__":
+    test_sync_only_when_browser_changed()
+    test_session_cookies_reach_browser()
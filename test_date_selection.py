@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Script de prueba de la selección directa de fecha (datepicker.py)
+Usa un driver falso con un calendario en Python: no abre Chrome
+"""
+
+import logging
+import os
+import sys
+from datetime import date
+
+# Agregar el directorio actual al path para importar módulos
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from datepicker import SELECT_DATE_SCRIPT, parse_target_date
+from dom_snapshot import SNAPSHOT_SCRIPT
+from scraper import CiesScraper
+from selector_engine import SelectorEngine, UNION_QUERY_SCRIPT
+from waits import AJAX_IDLE_SCRIPT
+
+# Configurar logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+
+class FakeDriver:
+    """Calendario mínimo: el script de selección escribe la fecha en el campo (o falla con `error`)"""
+
+    def __init__(self, error=None, shown_date=None, value_format='{day:02d}/{month:02d}/{year}', jquery=False):
+        self.error = error
+        self.shown_date = shown_date  # fecha que acaba en el campo aunque se pida otra
+        self.value_format = value_format  # dateFormat del datepicker
+        self.jquery = jquery  # jQuery UI devuelve la fecha elegida con getDate
+        self.value = ''
+        self.current_url = 'http://127.0.0.1:8765/illasr/iniciarReserva'
+        self.selections = []
+        self.snapshots = 0
+
+    def execute_script(self, script, *args):
+        if script == UNION_QUERY_SCRIPT:
+            return [0, 'campo de fecha']
+        if script == AJAX_IDLE_SCRIPT:
+            return True
+        if script == SELECT_DATE_SCRIPT:
+            _, day, month, year = args
+            self.selections.append((day, month, year))
+            if self.error:
+                return {'method': 'arrows', 'value': self.value, 'error': self.error}
+            self.value = self.shown_date or self.value_format.format(day=day, month=month, year=year)
+            if self.jquery:
+                return {'method': 'api', 'value': self.value, 'selected': [year, month, day], 'error': None}
+            return {'method': 'arrows', 'value': self.value, 'error': None}
+        assert script == SNAPSHOT_SCRIPT
+        self.snapshots += 1
+        # La instantánea solo lee #fecha/#fechaEntrada: con otro campo no ve la fecha
+        return {'url': self.current_url, 'error_page': False, 'slots': 3, 'slots_text': 'Prazas libres: 3',
+                'slots_selector': 0, 'date': None, 'tides': []}
+
+    def find_element(self, by, value):
+        return 'texto de plazas'
+
+def build_scraper(driver):
+    scraper = CiesScraper()
+    scraper.driver = driver
+    scraper.selectors = SelectorEngine(stats_file=None)
+    scraper.explore_page_structure = lambda: True
+    return scraper
+
+def test_parse_target_date():
+    """Fechas DD/MM/YYYY o date"""
+    assert parse_target_date('02/08/2025') == date(2025, 8, 2)
+    assert parse_target_date(date(2026, 7, 15)) == date(2026, 7, 15)
+
+    logging.info("✅ Fechas interpretadas")
+    return True
+
+def test_any_watch_date():
+    """Cualquier fecha se selecciona con un solo script y se verifica con una lectura"""
+    for target in ('02/08/2025', '15/07/2026', '31/12/2026'):
+        driver = FakeDriver()
+        scraper = build_scraper(driver)
+        assert scraper.select_target_date(target)
+        assert len(driver.selections) == 1
+
+    # Otro dateFormat en el campo: con jQuery UI la fecha se comprueba con getDate
+    assert build_scraper(FakeDriver(value_format='{year}-{month:02d}-{day:02d}', jquery=True)).select_target_date('02/08/2025')
+
+    logging.info("✅ Fechas seleccionadas sin recorrer el calendario mes a mes")
+    return True
+
+def test_slots_read_from_selection_snapshot():
+    """get_available_slots reutiliza la instantánea de select_target_date: una sola lectura de la página"""
+    driver = FakeDriver()
+    scraper = build_scraper(driver)
+    assert scraper.select_target_date('02/08/2025')
+    reads = driver.snapshots
+    assert scraper.get_available_slots(scraper.last_snapshot) == 3
+    assert driver.snapshots == reads
+
+    logging.info("✅ Plazas leídas de la misma instantánea")
+    return True
+
+def test_selection_failures():
+    """Día no disponible o fecha distinta en el campo: la selección falla"""
+    assert not build_scraper(FakeDriver(error='día no disponible en el calendario')).select_target_date('28/02/2026')
+    assert not build_scraper(FakeDriver(shown_date='01/08/2025')).select_target_date('02/08/2025')
+
+    # Sin jQuery UI solo vale el formato del sitio: día y mes invertidos no pasan por la fecha pedida
+    assert not build_scraper(FakeDriver(shown_date='08/02/2025')).select_target_date('02/08/2025')
+    assert not build_scraper(FakeDriver(value_format='{year}-{month:02d}-{day:02d}')).select_target_date('02/08/2025')
+
+    logging.info("✅ Fallos de selección detectados")
+    return True
+
+if __name__ == "__main__":
+    test_parse_target_date()
+    test_any_watch_date()
+    test_slots_read_from_selection_snapshot()
+    test_selection_failures()
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Script de prueba de la instantánea de la página (dom_snapshot.py)
+Usa un driver falso que devuelve instantáneas preparadas: no abre Chrome
+"""
+
+import logging
+import os
+import sys
+
+# Agregar el directorio actual al path para importar módulos
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from dom_snapshot import SNAPSHOT_SCRIPT, format_tides
+from scraper import CiesScraper, SLOTS_SELECTORS
+from selector_engine import SelectorEngine
+
+# Configurar logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+
+def build_snapshot(**overrides):
+    snapshot = {
+        'url': 'http://127.0.0.1:8765/illasr/iniciarReserva', 'error_page': False,
+        'slots': 4, 'slots_text': 'Prazas libres: 4', 'slots_selector': 0, 'date': '02/08/2025',
+        'tides': [{'tipo': 'baixamar', 'hora': '16:53'}, {'tipo': 'preamar', 'hora': '10:44'}]
+    }
+    snapshot.update(overrides)
+    return snapshot
+
+class FakeDriver:
+    """Devuelve las instantáneas en orden y cuenta los comandos WebDriver"""
+
+    def __init__(self, *snapshots):
+        self.snapshots = list(snapshots)
+        self.commands = []
+
+    def execute_script(self, script, *args):
+        self.commands.append('execute_script')
+        assert script == SNAPSHOT_SCRIPT
+        return self.snapshots.pop(0)
+
+    def save_screenshot(self, path):
+        self.commands.append('save_screenshot')
+        return True
+
+def build_scraper(driver):
+    scraper = CiesScraper()
+    scraper.driver = driver
+    scraper.selectors = SelectorEngine(stats_file=None)
+    return scraper
+
+def test_slots_in_one_roundtrip():
+    """Plazas, fecha y mareas con un solo comando WebDriver"""
+    driver = FakeDriver(build_snapshot())
+    scraper = build_scraper(driver)
+
+    assert scraper.get_available_slots() == 4
+    assert driver.commands == ['execute_script']
+    assert scraper.last_snapshot['date'] == '02/08/2025'
+    assert format_tides(scraper.last_snapshot['tides']) == 'preamar 10:44 · baixamar 16:53'
+
+    # El selector que acertó queda registrado en el motor de selectores
+    winner = scraper.selectors.ordered('classic.slots', SLOTS_SELECTORS)[0]
+    assert scraper.selectors.hit_rates('classic.slots')['classic.slots'][winner] == 1.0
+
+    logging.info("✅ Plazas leídas en un solo viaje al navegador")
+    return True
+
+def test_missing_and_unparsable_slots():
+    """Sin texto de plazas o sin número: error de detección (-1)"""
+    missing = FakeDriver(build_snapshot(slots=None, slots_text=None, slots_selector=None))
+    assert build_scraper(missing).get_available_slots() == -1
+    assert missing.commands == ['execute_script', 'save_screenshot']
+
+    unparsable = FakeDriver(build_snapshot(slots=None, slots_text='Prazas libres: -'))
+    assert build_scraper(unparsable).get_available_slots() == -1
+
+    logging.info("✅ Errores de detección")
+    return True
+
+def test_error_page_from_snapshot():
+    """La página de error se detecta con la misma instantánea y se maneja"""
+    scraper = build_scraper(FakeDriver(build_snapshot(error_page=True), build_snapshot(slots=0, slots_text='Prazas libres: 0')))
+    handled = []
+    scraper.handle_error_page = lambda: handled.append(True) or True
+
+    assert scraper.get_available_slots() == 0
+    assert handled == [True]
+    assert scraper.check_and_handle_error_page(build_snapshot())  # sin error no hace nada
+
+    logging.info("✅ Página de error detectada desde la instantánea")
+    return True
+
+if __name__ == "__main__":
+    test_slots_in_one_roundtrip()
+    test_missing_and_unparsable_slots()
+    test_error_page_from_snapshot()
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Script de prueba del servidor de replay (har_replay_server.py)
+Arranca el servidor en un puerto libre y ejecuta el arranque de sesión
+y las llamadas a la API como lo hacen los scrapers, sin tocar el sitio real
+"""
+
+import importlib
+import logging
+import socket
+import sys
+import os
+from contextlib import contextmanager
+from datetime import date
+
+# Agregar el directorio actual al path para importar módulos
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import config
+import session_bootstrap
+from har_replay_server import ReplayState, start_replay_server, SESSION_COOKIE
+from calendar_sweep import build_availability
+from test_calendar_sweep import load_har_calendar
+from transport import TransportSession
+
+# Configurar logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+
+def free_port():
+    with socket.socket() as probe:
+        probe.bind(('127.0.0.1', 0))
+        return probe.getsockname()[1]
+
+@contextmanager
+def replay_origin(origin):
+    """
+    Apuntar config al replay mientras dura el bloque. config (y session_bootstrap,
+    que copia sus URLs) pueden estar ya importados por otras pruebas, así que se
+    recargan con SITE_ORIGIN fijado y se vuelven a recargar al salir.
+    """
+    previous = os.environ.get('SITE_ORIGIN')
+    os.environ['SITE_ORIGIN'] = origin
+    try:
+        importlib.reload(config)
+        importlib.reload(session_bootstrap)
+        assert config.SITE_ORIGIN == origin and session_bootstrap.TARGET_URL.startswith(origin)
+        yield
+    finally:
+        if previous is None:
+            os.environ.pop('SITE_ORIGIN', None)
+        else:
+            os.environ['SITE_ORIGIN'] = previous
+        importlib.reload(config)
+        importlib.reload(session_bootstrap)
+
+def post_api(session, token, url, data):
+    headers = {'X-CSRF-TOKEN': token, 'Referer': config.RESERVA_URL,
+               'Content-Type': 'application/x-www-form-urlencoded; charset=UTF-8'}
+    return session.post(url, data=data, headers=headers)
+
+def plazas(session, token, fecha):
+    data = {'fecha': fecha, 'numPlazas': '1', 'idIsla': '1', 'idTipoCupo': ''}
+    return post_api(session, token, config.PLAZAS_API_URL, data)
+
+def test_replay_flow():
+    """Sesión, calendario y plazas con cambios de estado programados"""
+    state = ReplayState()
+    server = start_replay_server(state, port=free_port())
+    session = TransportSession()
+
+    try:
+        with replay_origin(server.origin):
+            token = session_bootstrap.bootstrap_session(session)
+
+            # Calendario de agosto de 2025 tal cual está en el HAR
+            response = post_api(session, token, config.CALENDARIO_API_URL,
+                                {'numPlazas': '1', 'idIsla': '1', 'idTipoCupo': '', 'ano': '2025', 'mes': '8'})
+            assert build_availability(response.json()) == build_availability(load_har_calendar())
+            state.apply('close', date='02/08/2025')
+
+            response = plazas(session, token, '02/08/2025')
+            assert response.json()['plazasOcupadas'] == '0'
+            assert response.json()['fecha'] == '02/08/2025'
+
+            # Se abren plazas: el calendario y la API de plazas lo reflejan
+            state.apply('open', date='02/08/2025', slots=4)
+            assert plazas(session, token, '02/08/2025').json()['plazasOcupadas'] == '4'
+            response = post_api(session, token, config.CALENDARIO_API_URL,
+                                {'numPlazas': '1', 'idIsla': '1', 'idTipoCupo': '', 'ano': '2025', 'mes': '8'})
+            assert build_availability(response.json())[date(2025, 8, 2)]['bookable']
+
+            # Token rotado -> 403 hasta volver a arrancar la sesión
+            state.apply('rotate_csrf')
+            assert plazas(session, token, '02/08/2025').status_code == 403
+            token = session_bootstrap.bootstrap_session(session)
+            assert plazas(session, token, '02/08/2025').status_code == 200
+
+            # Ventana de rechazo: todo acaba en aceptacion
+            state.apply('reject', duration=60)
+            assert session_bootstrap.is_error_response(plazas(session, token, '02/08/2025'))
+            try:
+                session_bootstrap.bootstrap_session(session)
+                assert False, "El arranque debería fallar durante el rechazo"
+            except session_bootstrap.SessionBootstrapError as e:
+                assert e.rejected
+            state.reject_until = 0
+
+            # Sin cookie de sesión la API redirige a aceptacion
+            assert session_bootstrap.is_error_response(plazas(TransportSession(), token, '02/08/2025'))
+
+            # Sesiones caducadas: aceptacion (nunca un 500) hasta volver a arrancar la sesión
+            state.apply('expire_sessions')
+            assert state.csrf_token(session.cookies.get(SESSION_COOKIE)) is None
+            assert session_bootstrap.is_error_response(plazas(session, token, '02/08/2025'))
+            token = session_bootstrap.bootstrap_session(session)
+            assert plazas(session, token, '02/08/2025').status_code == 200
+
+        logging.info(f"✅ Flujo de replay correcto: {dict(state.requests)}")
+        return True
+    finally:
+        server.shutdown()
+        server.server_close()
+
+def test_scheduled_events():
+    """Los eventos del escenario se aplican al llegar su momento"""
+    state = ReplayState()
+    state.schedule(0, 'open', date='10/08/2025', slots=2)
+    state.schedule(3600, 'close', date='10/08/2025')
+
+    state.run_due_events()
+    assert state.plazas_payload(date(2025, 8, 10))['plazasOcupadas'] == '2'
+    assert len(state.events) == 1
+
+    logging.info("✅ Eventos programados aplicados a su tiempo")
+    return True
+
+if __name__ == "__main__":
+    test_scheduled_events()
+    test_replay_flow()
@@ -6,6 +6,7 @@ Script de prueba para el scraper híbrido
 import logging
 import sys
 import os
+import time
 
 # Agregar el directorio actual al path para importar módulos
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
@@ -56,9 +57,43 @@ def test_hybrid_scraper():
         logging.error(f"Error en la prueba: {e}")
         return False
     finally:
-        if scraper.driver:
-            scraper.driver.quit()
-            logging.info("WebDriver cerrado")
+        scraper.close_driver()
+
+def test_driver_pool_reuse():
+    """Probar que el pool reutiliza el navegador calentado entre verificaciones"""
+    scraper = HybridCiesScraper()
+    
+    try:
+        logging.info("🧪 Probando reutilización del pool de navegadores...")
+        
+        timings = []
+        for i in range(3):
+            start = time.time()
+            result = scraper.check_availability_hybrid()
+            elapsed = time.time() - start
+            timings.append(elapsed)
+            
+            if not result:
+                logging.error(f"❌ Verificación {i + 1} sin resultado")
+                return False
+            
+            logging.info(f"⏱️ Verificación {i + 1}: {elapsed:.2f}s ({result['available_slots']} plazas)")
+        
+        stats = scraper.driver_pool.stats
+        logging.info(f"📊 Estadísticas del pool: {stats}")
+        
+        if stats['created'] == 1:
+            logging.info("✅ Un solo Chrome para todas las verificaciones")
+        else:
+            logging.warning(f"⚠️ Se crearon {stats['created']} navegadores")
+        
+        return True
+        
+    except Exception as e:
+        logging.error(f"Error en la prueba del pool: {e}")
+        return False
+    finally:
+        scraper.close_driver()
 
 def test_navigation_only():
     """Probar solo la navegación"""
@@ -119,6 +154,14 @@ def main():
     else:
         logging.error("❌ Prueba 2: Scraper híbrido - FALLÓ")
     
+    # Prueba 3: Reutilización del pool de navegadores
+    logging.info("=" * 50)
+    logging.info("PRUEBA 3: Pool de navegadores")
+    if test_driver_pool_reuse():
+        logging.info("✅ Prueba 3: Pool de navegadores - PASÓ")
+    else:
+        logging.error("❌ Prueba 3: Pool de navegadores - FALLÓ")
+    
     logging.info("🎉 Pruebas del scraper híbrido completadas")
 
 if __name__ == "__main__":
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Script de prueba del endpoint de métricas Prometheus (metrics.py)
+"""
+
+import logging
+import sys
+import os
+import threading
+from urllib.request import urlopen
+
+# Agregar el directorio actual al path para importar módulos
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import metrics
+from metrics import MetricsRegistry, MetricsServer
+
+# Configurar logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+
+def test_text_format():
+    """Contadores, gauges e histogramas en formato de texto de Prometheus"""
+    registry = MetricsRegistry()
+    checks = registry.counter('cies_checks_total', "Verificaciones", ['outcome'])
+    failures = registry.gauge('cies_consecutive_failures', "Fallos seguidos")
+    latency = registry.histogram('cies_check_phase_seconds', "Fases", ['phase'], buckets=(0.5, 1))
+
+    checks.inc(outcome='unavailable')
+    checks.inc(outcome='unavailable')
+    checks.inc(outcome='error')
+    state = {'failures': 3}
+    failures.set_function(lambda: state['failures'])
+    latency.observe(0.2, phase='api_plazas')
+    latency.observe(0.7, phase='api_plazas')
+    latency.observe(4.0, phase='api_plazas')
+
+    text = registry.render()
+    assert '# TYPE cies_checks_total counter' in text
+    assert 'cies_checks_total{outcome="unavailable"} 2' in text
+    assert 'cies_checks_total{outcome="error"} 1' in text
+    assert 'cies_consecutive_failures 3' in text
+    assert 'cies_check_phase_seconds_bucket{phase="api_plazas",le="0.5"} 1' in text
+    assert 'cies_check_phase_seconds_bucket{phase="api_plazas",le="1.0"} 2' in text
+    assert 'cies_check_phase_seconds_bucket{phase="api_plazas",le="+Inf"} 3' in text
+    assert 'cies_check_phase_seconds_count{phase="api_plazas"} 3' in text
+
+    # Las funciones se leen en cada scrape
+    state['failures'] = 0
+    assert 'cies_consecutive_failures 0' in registry.render()
+
+    try:
+        checks.inc(result='ok')
+        assert False, "Etiquetas incorrectas deberían fallar"
+    except ValueError:
+        pass
+
+    logging.info("✅ Formato de texto correcto")
+    return True
+
+def test_endpoint():
+    """El endpoint sirve las métricas globales del bot"""
+    server = MetricsServer(('127.0.0.1', 0), metrics.REGISTRY)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    try:
+        metrics.record_check('unavailable', {'total': 1.3, 'api_plazas': 0.2})
+
+        @metrics.timed_send('telegram')
+        def send():
+            return True
+        send()
+
+        with urlopen(f"http://127.0.0.1:{server.server_address[1]}/metrics", timeout=5) as response:
+            content_type = response.headers['Content-Type']
+            text = response.read().decode('utf-8')
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    assert content_type.startswith('text/plain; version=0.0.4')
+    assert 'cies_checks_total{outcome="unavailable"} 1' in text
+    assert 'cies_check_phase_seconds_count{phase="total"} 1' in text
+    assert 'cies_notifier_send_seconds_count{channel="telegram",outcome="ok"} 1' in text
+    assert 'process_resident_memory_bytes ' in text
+
+    logging.info("✅ Endpoint /metrics operativo")
+    return True
+
+if __name__ == "__main__":
+    test_text_format()
+    test_endpoint()
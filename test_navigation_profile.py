@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Script de prueba del perfil de navegación (navigation_profile.py)
+Usa un driver falso: no abre Chrome
+"""
+
+import logging
+import os
+import sys
+
+# Agregar el directorio actual al path para importar módulos
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from selenium.webdriver.chrome.options import Options
+from selenium.common.exceptions import NoSuchElementException
+from navigation_profile import (apply_page_load_strategy, blocked_url_patterns, enable_resource_blocking,
+                                parse_resource_types, navigate, page_parsed, CSRF_READY)
+
+# Configurar logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+
+class FakeDriver:
+    """Registra los comandos CDP y las navegaciones; el DOM se parsea tras `parse_after` consultas"""
+
+    def __init__(self, parse_after=2, has_csrf=True):
+        self.cdp_commands = []
+        self.current_url = 'about:blank'
+        self.parse_after = parse_after
+        self.has_csrf = has_csrf
+        self.state_queries = 0
+
+    def execute_cdp_cmd(self, command, params):
+        self.cdp_commands.append((command, params))
+        return {}
+
+    def get(self, url):
+        self.current_url = url
+        self.state_queries = 0
+
+    def execute_script(self, script):
+        self.state_queries += 1
+        return 'interactive' if self.state_queries > self.parse_after else 'loading'
+
+    def find_element(self, by, selector):
+        if '_csrf' in selector and not self.has_csrf:
+            raise NoSuchElementException(selector)
+        return object()
+
+def test_blocked_patterns():
+    """Los tipos y hosts configurados se traducen en patrones de Network.setBlockedURLs"""
+    assert parse_resource_types('image+font+desconocido') == ('image', 'font')
+
+    patterns = blocked_url_patterns(('image',), hosts=('google-analytics.com',))
+    assert '*.png*' in patterns and '*.woff*' not in patterns
+    assert '*://*.google-analytics.com/*' in patterns
+    assert not any('.js' in pattern for pattern in patterns)  # los scripts propios son necesarios
+
+    driver = FakeDriver()
+    assert enable_resource_blocking(driver, patterns)
+    assert [command for command, _ in driver.cdp_commands] == ['Network.enable', 'Network.setBlockedURLs']
+    assert driver.cdp_commands[1][1] == {'urls': patterns}
+
+    logging.info(f"✅ {len(blocked_url_patterns())} patrones bloqueados por defecto")
+    return True
+
+def test_page_load_strategy():
+    """La estrategia se fija en las opciones; una no válida cae en 'eager'"""
+    assert apply_page_load_strategy(Options(), 'none').page_load_strategy == 'none'
+    assert apply_page_load_strategy(Options(), 'rapida').page_load_strategy == 'eager'
+
+    logging.info("✅ Estrategia de carga configurada")
+    return True
+
+def test_navigate_conditions():
+    """navigate espera la condición del paso y devuelve False si no se cumple"""
+    driver = FakeDriver(parse_after=2)
+    assert navigate(driver, 'http://127.0.0.1/illasr/inicio', page_parsed, timeout=2)
+    assert driver.state_queries == 3
+
+    assert navigate(FakeDriver(), 'http://127.0.0.1/illasr/iniciarReserva', CSRF_READY, timeout=2)
+    assert navigate(FakeDriver(), 'http://127.0.0.1/illasr/aceptacion', CSRF_READY, timeout=2)
+    assert not navigate(FakeDriver(has_csrf=False), 'http://127.0.0.1/illasr/iniciarReserva', CSRF_READY, timeout=1)
+
+    logging.info("✅ Navegación con condiciones de lectura por paso")
+    return True
+
+if __name__ == "__main__":
+    test_blocked_patterns()
+    test_page_load_strategy()
+    test_navigate_conditions()
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Script de prueba de los tiempos por fase (phase_timer.py)
+"""
+
+import logging
+import os
+import sys
+import tempfile
+import threading
+import time
+
+# Agregar el directorio actual al path para importar módulos
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from phase_timer import PhaseTimer, timed, timed_check, format_timings
+from stats import BotStats
+
+# Configurar logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+
+class FakeScraper:
+    """Scraper falso con fases instrumentadas como las de los scrapers reales"""
+
+    def __init__(self):
+        self.timer = PhaseTimer()
+        self.last_timings = {}
+
+    @timed('csrf')
+    def get_csrf(self):
+        time.sleep(0.02)
+
+    @timed('api_plazas')
+    def call_api(self):
+        time.sleep(0.01)
+
+    @timed_check
+    def check(self, fail=False):
+        self.get_csrf()
+        self.call_api()
+        self.call_api()
+        self.timer.sleep('retry_delay', 0.01)
+        return None if fail else {'available_slots': 0}
+
+def test_timed_check():
+    """Las fases se acumulan por nombre y se adjuntan al resultado"""
+    scraper = FakeScraper()
+    result = scraper.check()
+    timings = result['timings']
+
+    assert set(timings) == {'total', 'csrf', 'api_plazas', 'retry_delay'}
+    assert timings['api_plazas'] >= 0.02  # dos llamadas suman
+    assert timings['total'] >= timings['csrf'] + timings['api_plazas'] + timings['retry_delay']
+
+    # El timer se reinicia en cada verificación; sin resultado quedan en last_timings
+    assert scraper.check(fail=True) is None
+    assert scraper.last_timings['api_plazas'] < 0.1
+
+    logging.info(f"✅ Fases medidas: {format_timings(timings)}")
+    return True
+
+def test_threads():
+    """Varios hilos pueden medir la misma fase a la vez"""
+    timer = PhaseTimer()
+
+    def work():
+        for _ in range(100):
+            timer.add('api_calendario', 0.001)
+
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert abs(timer.snapshot()['api_calendario'] - 0.4) < 1e-6
+
+    logging.info("✅ Medición concurrente correcta")
+    return True
+
+def test_bot_stats_aggregation():
+    """BotStats acumula recuento, total y máximo por fase (global y por hora)"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        stats = BotStats(os.path.join(tmp_dir, 'stats.json'))
+        stats.record_timings({'total': 1.0, 'csrf': 0.4})
+        stats.record_timings({'total': 3.0, 'api_plazas': 0.2})
+        assert stats.dirty
+
+        phases = stats.stats['phase_timings']
+        assert phases['total'] == {'count': 2, 'total': 4.0, 'max': 3.0}
+        assert phases['csrf']['count'] == 1
+        assert stats.get_current_hour_summary()['phases']['total']['count'] == 2
+
+        summary = stats.get_phase_summary()
+        assert summary.splitlines()[1].startswith('• total: 2.00s / 3.00s')
+
+        stats.flush()
+        assert BotStats(os.path.join(tmp_dir, 'stats.json')).stats['phase_timings']['total']['max'] == 3.0
+
+    logging.info("✅ Tiempos por fase agregados en las estadísticas")
+    return True
+
+if __name__ == "__main__":
+    test_timed_check()
+    test_threads()
+    test_bot_stats_aggregation()
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Script de prueba para el planificador adaptativo de verificaciones
+Usa un reloj simulado: no espera de verdad
+"""
+
+import logging
+import sys
+import os
+
+# Agregar el directorio actual al path para importar módulos
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from poll_scheduler import PollScheduler
+
+# Configurar logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+def make_scheduler(clock, **kwargs):
+    params = dict(base_interval=10, min_interval=2, max_interval=300, backoff_factor=2,
+                  reject_penalty=2, jitter=0, fast_window=60, hourly_budget=0, clock=clock)
+    params.update(kwargs)
+    return PollScheduler(**params)
+
+def test_backoff_on_errors_and_rejections():
+    """Los errores duplican la espera y 'aceptacion' penaliza el doble"""
+    clock = FakeClock()
+    scheduler = make_scheduler(clock)
+
+    scheduler.record_cycle(ok=False)
+    assert scheduler.next_delay() == 20
+    scheduler.record_cycle(ok=False, rejected=True)
+    assert scheduler.next_delay() == 80
+    for _ in range(10):
+        scheduler.record_cycle(ok=False)
+    assert scheduler.next_delay() == 300
+
+    scheduler.record_cycle(ok=True)
+    assert scheduler.next_delay() == 10
+
+    logging.info("✅ Backoff exponencial con tope y recuperación")
+    return True
+
+def test_fast_window_after_change():
+    """Tras un cambio se verifica al intervalo mínimo durante la ventana rápida"""
+    clock = FakeClock()
+    scheduler = make_scheduler(clock)
+
+    scheduler.record_cycle(ok=True, changed=True)
+    assert scheduler.next_delay() == 2
+    clock.now += 61
+    assert scheduler.next_delay() == 10
+
+    logging.info("✅ Ventana rápida tras cambio")
+    return True
+
+def test_hourly_budget():
+    """El presupuesto marca el ritmo sostenible y bloquea al agotarse"""
+    clock = FakeClock()
+    scheduler = make_scheduler(clock, hourly_budget=120)
+
+    scheduler.record_cycle(ok=True, requests=4)
+    assert scheduler.next_delay() == 120  # 3600 * 4 / 120
+    assert scheduler.sustained_interval() == 120 and "cada 120s" in scheduler.describe()
+
+    # Ráfaga en ventana rápida hasta agotar el presupuesto
+    scheduler.record_cycle(ok=True, requests=4, changed=True)
+    for _ in range(28):
+        clock.now += 2
+        scheduler.record_cycle(ok=True, requests=4)
+    delay = scheduler.next_delay()
+    assert scheduler.reason == "presupuesto horario"
+    assert abs(delay - (3600 - clock.now)) < 1e-6
+
+    logging.info(f"✅ Presupuesto horario respetado (espera {delay:.0f}s)")
+    return True
+
+def test_deferred_retry():
+    """Un reintento diferido marca la espera sin jitter extra, salvo que el backoff de un rechazo pida más"""
+    clock = FakeClock()
+    scheduler = make_scheduler(clock, base_interval=1, min_interval=1, jitter=0.5)
+
+    # Error: backoff 2s (+/-50%) frente a un reintento a 3s -> manda el reintento
+    scheduler.record_cycle(ok=False, retry_in=3)
+    assert scheduler.next_delay() == 3
+    assert scheduler.reason == "reintento diferido"
+
+    # 'aceptacion': backoff 2^3 = 8s (+/-50%) -> el reintento rápido no lo adelanta
+    scheduler.record_cycle(ok=False, rejected=True, retry_in=3)
+    assert 4 <= scheduler.next_delay() <= 12
+    assert scheduler.reason.startswith("backoff")
+
+    scheduler.record_cycle(ok=True, retry_in=3)
+    assert 0.5 <= scheduler.next_delay() <= 1.5
+    assert scheduler.reason == "intervalo normal"
+
+    logging.info("✅ Reintento diferido entregado al planificador sin saltarse el backoff")
+    return True
+
+if __name__ == "__main__":
+    test_backoff_on_errors_and_rejections()
+    test_fast_window_after_change()
+    test_hourly_budget()
+    test_deferred_retry()
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Script de prueba para la matriz de consultas (islas x plazas x cupos)
+"""
+
+import logging
+import sys
+import os
+from datetime import date
+
+# Agregar el directorio actual al path para importar módulos
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from query_matrix import parse_watchers, QueryPlanner, QueryKey, check_watchers
+from test_watchlist import FakeCalendarScraper
+
+# Configurar logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+
+TODAY = date(2025, 7, 1)
+
+class RecordingScraper(FakeCalendarScraper):
+    """Registra los parámetros de cada barrido de calendario"""
+
+    def __init__(self):
+        super().__init__()
+        self.calendar_params = []
+
+    def call_calendario_api(self, ano, mes, **params):
+        self.calendar_params.append((ano, mes, params.get('num_plazas')))
+        return super().call_calendario_api(ano, mes)
+
+def test_matrix_expansion():
+    """Probar la expansión islas x plazas x cupos"""
+    watchers = parse_watchers("02/08/2025|1|1+4|+A", "", "1", "1", "")
+    queries = watchers[0].queries
+
+    assert len(queries) == 4
+    assert QueryKey('1', '4', 'A') in queries
+    assert QueryKey('1', '1', '') in queries
+
+    logging.info(f"✅ Matriz expandida: {watchers[0].describe()}")
+    return True
+
+def test_shared_queries_are_deduplicated():
+    """Dos vigilantes con la misma consulta y mes comparten un único barrido"""
+    watchers = parse_watchers("08/2025@sab|1|4;02/08/2025|1|4", "", "1", "1", "")
+    planner = QueryPlanner(watchers)
+    scraper = RecordingScraper()
+
+    results = check_watchers(scraper, planner, today=TODAY)
+
+    assert scraper.calendar_params == [(2025, 8, '4')]
+    shared = [r for r in results if r['date'] == '02/08/2025']
+    assert len(shared) == 1 and len(shared[0]['watchers']) == 2
+
+    logging.info(f"✅ {len(results)} resultados con {len(scraper.calendar_params)} barrido upstream")
+    return True
+
+def test_budget_rotation():
+    """Con presupuesto limitado la matriz se reparte entre ciclos"""
+    watchers = parse_watchers("02/08/2025|1|1+2+3+4", "", "1", "1", "")
+    planner = QueryPlanner(watchers, max_sweeps_per_cycle=3)
+
+    seen = []
+    for _ in range(4):
+        seen.extend(key[0].num_plazas for key, _ in planner.next_batch(today=TODAY))
+
+    assert seen[:4] == ['1', '2', '3', '4']
+    assert seen.count('1') == 3
+
+    logging.info(f"✅ Rotación de la matriz: {seen}")
+    return True
+
+if __name__ == "__main__":
+    test_matrix_expansion()
+    test_shared_queries_are_deduplicated()
+    test_budget_rotation()
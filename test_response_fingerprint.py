@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Script de prueba para la detección de cambios en las respuestas de la API
+Usa el calendario real de cies_manual_flow.har
+"""
+
+import json
+import logging
+import sys
+import os
+from datetime import date
+
+# Agregar el directorio actual al path para importar módulos
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from response_fingerprint import ResponseTracker
+from async_engine import AsyncQueryEngine
+from query_matrix import QueryKey
+from test_calendar_sweep import load_har_calendar
+
+# Configurar logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+
+class CountingParser:
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, content):
+        self.calls += 1
+        return json.loads(content)
+
+class TrackedApiScraper:
+    """Scraper falso que pasa las respuestas crudas por un ResponseTracker"""
+
+    def __init__(self, calendar_text):
+        self.calendar_text = calendar_text
+        self.plazas_body = b'{"existenDatos": true, "plazasOcupadas": "0"}'
+        self.tracker = ResponseTracker()
+        self.extract_calls = 0
+
+    def ensure_api_session(self):
+        return True
+
+    def call_calendario_api(self, ano, mes, **params):
+        key = ResponseTracker.make_key('recuperarCalendario', {'ano': ano, 'mes': mes})
+        return self.tracker.parse(key, self.calendar_text, json.loads)[0]
+
+    def call_plazas_api(self, fecha=None, **params):
+        key = ResponseTracker.make_key('recuperarPlazasTotales', {'fecha': fecha})
+        return self.tracker.parse(key, self.plazas_body, json.loads)[0]
+
+    def extract_slots(self, api_result, source):
+        self.extract_calls += 1
+        return int(api_result['plazasOcupadas'])
+
+def test_parse_only_on_change():
+    """El parser solo se ejecuta cuando cambia el cuerpo normalizado"""
+    tracker = ResponseTracker()
+    parser = CountingParser()
+    key = ResponseTracker.make_key('recuperarPlazasTotales', {'fecha': '02/08/2025'})
+
+    first, changed = tracker.parse(key, b'{"plazasOcupadas": "0"}', parser)
+    assert changed
+    second, changed = tracker.parse(key, b'{"plazasOcupadas": "0"}\n', parser)
+    assert not changed and second is first
+    third, changed = tracker.parse(key, b'{"plazasOcupadas": "3"}', parser)
+    assert changed and third['plazasOcupadas'] == '3'
+
+    assert parser.calls == 2
+    assert tracker.stats == {'changed': 2, 'unchanged': 1}
+
+    logging.info("✅ Respuestas idénticas reutilizadas sin parsear")
+    return True
+
+def test_engine_skips_unchanged_sweeps():
+    """Un barrido con las mismas respuestas reutiliza la disponibilidad anterior"""
+    scraper = TrackedApiScraper(load_har_calendar())
+    engine = AsyncQueryEngine(scraper, concurrency=2)
+    key = (QueryKey('1', '1', ''), 2025, 8)
+    batch = [(key, [date(2025, 8, 16), date(2025, 8, 24)])]
+
+    first = engine.run_batch(batch)[key]
+    extract_calls = scraper.extract_calls
+    second = engine.run_batch(batch)[key]
+
+    assert second is first
+    assert scraper.extract_calls == extract_calls
+    assert not engine.day_changed(key, date(2025, 8, 16))
+
+    scraper.plazas_body = b'{"existenDatos": true, "plazasOcupadas": "2"}'
+    third = engine.run_batch(batch)[key]
+    engine.close()
+
+    assert third[date(2025, 8, 16)]['available_slots'] == 2
+    assert engine.day_changed(key, date(2025, 8, 16))
+    assert not engine.day_changed(key, date(2025, 8, 2))
+
+    logging.info(f"✅ Barridos sin cambios omitidos: {engine.stats['unchanged_sweeps']}")
+    return True
+
+if __name__ == "__main__":
+    test_parse_only_on_change()
+    test_engine_skips_unchanged_sweeps()
@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Script de prueba de la política de reintentos sin bloqueo (retry_policy.py)
+Usa un reloj simulado y un scraper híbrido sin navegador: no espera de verdad
+"""
+
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+
+# Agregar el directorio actual al path para importar módulos
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from requests.exceptions import ConnectionError as RequestsConnectionError
+from selenium.common.exceptions import WebDriverException
+from retry_policy import RetryPolicy, classify_error
+from scraper_hybrid import HybridCiesScraper
+from session_cache import SessionCache
+from query_matrix import DEFAULT_QUERY, QueryPlanner, Watcher
+from watchlist import WatchList
+
+# Configurar logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+def make_policy(clock, **kwargs):
+    params = dict(max_attempts=3, base_delay=2, max_delay=60, jitter=0, error_budget=0, budget_window=300, clock=clock)
+    params.update(kwargs)
+    return RetryPolicy(**params)
+
+def test_classify_error():
+    """Timeouts y conexiones son transitorios; Chrome caído es 'browser'; bugs no se reintentan"""
+    assert classify_error(RequestsConnectionError("reset")) == 'transient'
+    assert classify_error(TimeoutError()) == 'transient'
+    assert classify_error(WebDriverException("chrome not reachable")) == 'browser'
+    assert classify_error(KeyError('plazasOcupadas')) == 'fatal'
+    assert classify_error(json.JSONDecodeError("Expecting value", "<html>", 0)) == 'no_data'
+
+    logging.info("✅ Errores clasificados")
+    return True
+
+def test_backoff_with_cap_and_deferral():
+    """El reintento se difiere (no se duerme), se dobla y se agota en max_attempts"""
+    clock = FakeClock()
+    policy = make_policy(clock)
+
+    assert policy.record_failure('no_data') == (2, False)
+    assert not policy.ready() and policy.remaining() == 2
+    clock.now += 2
+    assert policy.ready()
+    assert policy.record_failure('transient') == (4, False)
+
+    # Tercer fallo seguido: sin reintento rápido, el ritmo vuelve al planificador
+    assert policy.record_failure('transient') == (None, False)
+    assert policy.ready() and policy.attempts == 0
+
+    # 'aceptacion' suma más pasos y el tope se respeta
+    rejected_in, _ = policy.record_failure('rejected')
+    assert rejected_in == 8
+    capped = make_policy(clock, max_attempts=10, max_delay=10)
+    for _ in range(5):
+        retry_in, _ = capped.record_failure('rejected')
+    assert retry_in == 10
+
+    # Los errores de programación no se reintentan en seguida; un éxito lo reinicia todo
+    assert make_policy(clock).record_failure('fatal') == (None, False)
+    policy.record_success()
+    assert policy.ready() and policy.steps == 0
+
+    logging.info("✅ Backoff exponencial con tope, diferido al planificador")
+    return True
+
+def test_jitter_bounds():
+    """El jitter queda dentro de +/- la fracción configurada"""
+    clock = FakeClock()
+    delays = []
+    for _ in range(50):
+        policy = make_policy(clock, jitter=0.5)
+        delays.append(policy.record_failure('transient')[0])
+    assert all(1 <= delay <= 3 for delay in delays)
+    assert len(set(delays)) > 1
+
+    logging.info("✅ Jitter acotado")
+    return True
+
+def test_error_budget_escalates():
+    """Agotar el presupuesto de la ventana escala y reinicia la cuenta; fuera de la ventana no cuenta"""
+    clock = FakeClock()
+    policy = make_policy(clock, max_attempts=100, error_budget=4, budget_window=60)
+
+    for _ in range(3):
+        clock.now += 10
+        assert policy.record_failure('no_data')[1] is False
+    clock.now += 10
+    assert policy.record_failure('no_data') == (None, True)
+    assert policy.escalations == 1 and policy.budget_used() == 0
+
+    # Fallos espaciados más que la ventana nunca agotan el presupuesto
+    for _ in range(6):
+        clock.now += 61
+        assert policy.record_failure('no_data')[1] is False
+
+    logging.info("✅ Presupuesto de errores por ventana")
+    return True
+
+def test_hybrid_check_does_not_sleep():
+    """Un fallo del scraper híbrido vuelve enseguida con 'retry_in' y el siguiente intento se difiere"""
+    scraper = HybridCiesScraper()
+    scraper.should_try_http = lambda: False
+    scraper.driver_pool.acquire = lambda: None  # sin navegadores disponibles
+
+    start = time.monotonic()
+    result = scraper.check_availability_hybrid()
+    assert time.monotonic() - start < 1
+    assert result['detection_error'] and result['error_kind'] == 'no_driver'
+    assert result['retry_in'] is not None and result['retry_in'] > 0
+
+    deferred = scraper.check_availability_hybrid()
+    assert deferred['status'] == 'retry_deferred'
+    assert scraper.retry_policy.attempts == 1
+
+    logging.info(f"✅ Verificación híbrida sin esperas (reintento en {result['retry_in']:.1f}s)")
+    return True
+
+class NotJsonResponse:
+    """Respuesta 200 de la API con una página HTML en lugar de JSON"""
+    url = 'https://cies.test/illasr/recuperarPlazasTotales'
+    history = []
+    status_code = 200
+    content = b'<html>Mantenimiento</html>'
+    text = content.decode()
+
+def api_scraper(tmp_dir, post):
+    """Scraper híbrido con sesión HTTP lista y session.post falso"""
+    scraper = HybridCiesScraper()
+    scraper.session_cache = SessionCache(os.path.join(tmp_dir, 'session_cache.json'))
+    scraper.csrf_token = 'token'
+    scraper.http_session_ready = True
+    scraper.session.post = post
+    return scraper
+
+def refuse(url, **kwargs):
+    raise RequestsConnectionError("connection refused")
+
+def test_api_errors_reach_policy():
+    """Los fallos de transporte y las respuestas que no son JSON llegan clasificados a la política"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        result = api_scraper(tmp_dir, refuse).check_availability_hybrid()
+        assert result['error_kind'] == 'transient' and result['retry_in'] is not None
+
+        result = api_scraper(tmp_dir, lambda url, **kwargs: NotJsonResponse()).check_availability_hybrid()
+        assert result['error_kind'] == 'no_data'
+
+    logging.info("✅ Errores de la API clasificados por la política de reintentos")
+    return True
+
+def test_optimized_monitor_uses_policy():
+    """El bot optimizado pasa los errores del ciclo a la política y su reintento al planificador"""
+    from main_optimized import OptimizedCiesMonitor
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        monitor = OptimizedCiesMonitor()
+        monitor.scraper = api_scraper(tmp_dir, refuse)
+        monitor.engine.scraper = monitor.scraper
+        monitor.planner = QueryPlanner([Watcher(WatchList.from_spec("02/08/2099"), [DEFAULT_QUERY])])
+
+        assert monitor.check_availability()
+        assert isinstance(monitor.engine.errors[0], RequestsConnectionError)
+        assert monitor.scraper.retry_policy.attempts == 1
+        assert monitor.scraper.retry_policy.last_kind == 'transient'
+        assert monitor.scheduler.retry_at is not None
+        monitor.engine.close()
+
+    logging.info("✅ Reintento del bot optimizado decidido por la política")
+    return True
+
+if __name__ == "__main__":
+    test_classify_error()
+    test_backoff_with_cap_and_deferral()
+    test_jitter_bounds()
+    test_error_budget_escalates()
+    test_hybrid_check_does_not_sleep()
+    test_api_errors_reach_policy()
+    test_optimized_monitor_uses_policy()
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Script de prueba del motor de selectores (selector_engine.py)
+Usa un driver falso que resuelve la consulta unión en Python: no abre Chrome
+"""
+
+import json
+import logging
+import os
+import sys
+import tempfile
+
+# Agregar el directorio actual al path para importar módulos
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from selector_engine import SelectorEngine, UNION_QUERY_SCRIPT, get_selector_engine
+
+# Configurar logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+
+SLOTS_SELECTORS = [
+    "//div[contains(text(), 'Prazas libres:')]",
+    "//span[contains(text(), 'Prazas libres:')]",
+    "//*[contains(text(), 'Prazas libres:')]"
+]
+
+class FakeDriver:
+    """Solo existen los selectores de `present`; cuenta los viajes al navegador"""
+
+    def __init__(self, present):
+        self.present = present
+        self.calls = 0
+
+    def execute_script(self, script, selectors, visible, accept):
+        assert script == UNION_QUERY_SCRIPT
+        self.calls += 1
+        for i, selector in enumerate(selectors):
+            if selector in self.present:
+                return [i, f"elemento de {selector}"]
+        return None
+
+def test_single_roundtrip_and_learned_order():
+    """Una llamada por búsqueda; el ganador pasa a evaluarse primero"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        engine = SelectorEngine(os.path.join(tmp_dir, 'selectors.json'))
+        driver = FakeDriver(present={SLOTS_SELECTORS[2]})
+
+        assert engine.find(driver, 'slots', SLOTS_SELECTORS) == f"elemento de {SLOTS_SELECTORS[2]}"
+        assert driver.calls == 1
+        assert engine.ordered('slots', SLOTS_SELECTORS)[0] == SLOTS_SELECTORS[2]
+
+        # La segunda búsqueda acierta con el primer candidato evaluado
+        engine.find(driver, 'slots', SLOTS_SELECTORS)
+        rates = engine.hit_rates('slots')['slots']
+        assert rates[SLOTS_SELECTORS[2]] == 1.0
+        assert rates[SLOTS_SELECTORS[0]] == 0.0 and rates[SLOTS_SELECTORS[1]] == 0.0
+        assert engine.stats['slots']['selectors'][SLOTS_SELECTORS[0]]['misses'] == 1  # no se volvió a evaluar
+
+        # Un cambio de diseño: falla en un solo viaje y se cuenta
+        assert engine.find(FakeDriver(present=set()), 'slots', SLOTS_SELECTORS) is None
+        assert engine.stats['slots']['failures'] == 1
+
+        # El orden aprendido sobrevive a un reinicio
+        engine.flush()
+        restored = SelectorEngine(os.path.join(tmp_dir, 'selectors.json'))
+        assert restored.ordered('slots', SLOTS_SELECTORS)[0] == SLOTS_SELECTORS[2]
+        assert 'slots' in restored.get_summary()
+
+    logging.info(f"✅ Orden aprendido: {engine.get_summary().splitlines()[1]}")
+    return True
+
+def test_wait_for():
+    """wait_for repite la consulta unión hasta que aparece el elemento"""
+    engine = SelectorEngine(stats_file=None)
+    driver = FakeDriver(present=set())
+    original = driver.execute_script
+
+    def appears_on_third_call(*args):
+        if driver.calls == 2:
+            driver.present = {SLOTS_SELECTORS[1]}
+        return original(*args)
+
+    driver.execute_script = appears_on_third_call
+    assert engine.wait_for(driver, 'slots', SLOTS_SELECTORS, timeout=2) == f"elemento de {SLOTS_SELECTORS[1]}"
+    assert driver.calls == 3
+    assert engine.wait_for(FakeDriver(present=set()), 'calendar', ['//div'], timeout=0.3) is None
+
+    logging.info("✅ Espera con consulta unión")
+    return True
+
+def test_scrapers_share_engine_without_mixing_groups():
+    """Clásico e híbrido usan el mismo motor con grupos propios; un flush guarda los dos"""
+    from scraper import CiesScraper
+    from scraper_hybrid import HybridCiesScraper
+
+    classic, hybrid = CiesScraper(), HybridCiesScraper()
+    engine = get_selector_engine()
+    assert classic.selectors is engine and hybrid.selectors is engine
+
+    original_file, original_stats = engine.stats_file, engine.stats
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        engine.stats_file, engine.stats = os.path.join(tmp_dir, 'selectors.json'), {}
+        try:
+            engine.find(FakeDriver(present={'//a'}), 'classic.visitantes', ['//a', '//b'])
+            engine.find(FakeDriver(present={'//b'}), 'hybrid.visitantes', ['//b'])
+            engine.flush()
+            with open(engine.stats_file) as f:
+                saved = json.load(f)
+        finally:
+            engine.stats_file, engine.stats = original_file, original_stats
+
+    assert saved['classic.visitantes']['last'] == '//a'
+    assert saved['hybrid.visitantes']['last'] == '//b'
+
+    logging.info("✅ Un motor por proceso y grupos por scraper")
+    return True
+
+if __name__ == "__main__":
+    test_single_roundtrip_and_learned_order()
+    test_wait_for()
+    test_scrapers_share_engine_without_mixing_groups()
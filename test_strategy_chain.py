@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Script de prueba de la cadena de estrategias (strategy_chain.py)
+Usa estrategias falsas y un reloj manual: no abre Chrome ni hace peticiones
+"""
+
+import logging
+import os
+import sys
+
+# Agregar el directorio actual al path para importar módulos
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from strategy_chain import StrategyChain, Strategy, CircuitBreaker, CLOSED, OPEN, HALF_OPEN
+
+# Configurar logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+class FakeScraper:
+    """Devuelve las plazas de `outcomes` en orden (-1 = error de detección, Exception = fallo)"""
+
+    def __init__(self, clock, outcomes, duration):
+        self.clock = clock
+        self.outcomes = list(outcomes)
+        self.duration = duration
+        self.calls = 0
+        self.rejections = 0
+        self.last_timings = {'total': duration}
+        self.closed = False
+
+    def check(self):
+        self.calls += 1
+        self.clock.now += self.duration
+        outcome = self.outcomes.pop(0) if self.outcomes else 0
+        if isinstance(outcome, Exception):
+            raise outcome
+        return {'date': '02/08/2025', 'available_slots': outcome, 'detection_error': outcome == -1,
+                'has_availability': outcome > 0 if outcome != -1 else None}
+
+    def close_driver(self):
+        self.closed = True
+
+def build_chain(clock, **outcomes):
+    """Estrategias api (0.2s), hybrid (2s) y html (10s) con sus resultados"""
+    scrapers = {}
+    strategies = []
+    for name, duration in (('api', 0.2), ('hybrid', 2), ('html', 10)):
+        scrapers[name] = FakeScraper(clock, outcomes.get(name, []), duration)
+        strategies.append(Strategy(name, lambda scraper=scrapers[name]: scraper, lambda scraper: scraper.check()))
+    return StrategyChain(strategies, failure_threshold=2, cooldown=60, clock=clock), scrapers
+
+def test_cheapest_healthy_first():
+    """La API responde: ni el híbrido ni el HTML llegan a usarse"""
+    clock = FakeClock()
+    chain, scrapers = build_chain(clock, api=[3])
+
+    result = chain.check_availability()
+    assert result['available_slots'] == 3 and result['strategy'] == 'api'
+    assert scrapers['hybrid'].calls == 0 and scrapers['html'].calls == 0
+    assert chain.last_timings == {'total': 0.2}
+
+    logging.info("✅ Se usa la estrategia más barata")
+    return True
+
+def test_fallback_and_circuit_breaker():
+    """La API falla: se cae al híbrido; tras dos fallos la API se salta hasta el enfriamiento"""
+    clock = FakeClock()
+    chain, scrapers = build_chain(clock, api=[-1, RuntimeError("sin CSRF"), 5], hybrid=[0, 0, 0])
+
+    assert chain.check_availability()['strategy'] == 'hybrid'
+    assert chain.breakers['api'].state == CLOSED
+    assert chain.check_availability()['strategy'] == 'hybrid'
+    assert chain.breakers['api'].state == OPEN
+
+    # Circuito abierto: la API no se intenta
+    chain.check_availability()
+    assert scrapers['api'].calls == 2 and scrapers['hybrid'].calls == 3
+
+    # Pasado el enfriamiento se deja pasar una prueba y, al acertar, se cierra
+    clock.now += 60
+    assert chain.breakers['api'].allow() and chain.breakers['api'].state == HALF_OPEN
+    result = chain.check_availability()
+    assert result['strategy'] == 'api' and result['available_slots'] == 5
+    assert chain.breakers['api'].state == CLOSED
+
+    logging.info("✅ Fallback y circuit breaker")
+    return True
+
+def test_half_open_failure_reopens():
+    """Un fallo en la prueba vuelve a abrir el circuito sin esperar al umbral"""
+    clock = FakeClock()
+    breaker = CircuitBreaker('api', failure_threshold=3, cooldown=30, clock=clock)
+    for _ in range(3):
+        breaker.record_failure()
+    assert not breaker.allow()
+
+    clock.now += 30
+    assert breaker.allow() and breaker.state == HALF_OPEN
+    breaker.record_failure()
+    assert breaker.state == OPEN and breaker.trips == 2
+    assert breaker.remaining_cooldown() == 30
+
+    logging.info("✅ La prueba fallida reabre el circuito")
+    return True
+
+def test_all_failing_and_latency():
+    """Si todo falla se devuelve el último error; las latencias quedan por estrategia"""
+    clock = FakeClock()
+    chain, scrapers = build_chain(clock, api=[-1], hybrid=[-1], html=[-1])
+
+    result = chain.check_availability()
+    assert result['detection_error'] and result['strategy'] == 'html'
+    assert chain.latency_summary('api')['p50'] == 0.2
+    assert chain.latency_summary('html')['max'] == 10
+    assert 'hybrid: closed' in chain.get_summary()
+
+    chain.close_driver()
+    assert all(scraper.closed for scraper in scrapers.values())
+
+    logging.info(f"✅ Latencias:\n{chain.get_summary()}")
+    return True
+
+def test_all_circuits_open_keeps_monitor_alive():
+    """Con todos los circuitos abiertos la cadena pide esperar y el monitor sigue vivo"""
+    from main import CiesMonitor
+
+    clock = FakeClock()
+    chain, scrapers = build_chain(clock, api=[-1] * 2, hybrid=[-1] * 2, html=[-1] * 2)
+    chain.check_availability()
+    chain.check_availability()
+    assert all(breaker.state == OPEN for breaker in chain.breakers.values())
+
+    # Sin intento: resultado 'circuit_open' con la espera hasta el primer circuito a prueba
+    clock.now += 10
+    result = chain.check_availability()
+    assert result['status'] == 'circuit_open' and result['detection_error']
+    assert result['retry_in'] == chain.breakers['api'].remaining_cooldown() < 60
+    assert sum(scraper.calls for scraper in scrapers.values()) == 6
+
+    monitor = CiesMonitor()
+    monitor.scraper = chain
+    for _ in range(monitor.max_errors + 1):
+        assert monitor.check_availability()
+    assert monitor.consecutive_errors == 0
+
+    # La siguiente verificación se programa para cuando el circuito admita una prueba
+    assert abs(monitor.scheduler.next_delay() - result['retry_in']) < 1
+    assert monitor.scheduler.reason == "reintento diferido"
+
+    logging.info(f"✅ Circuitos abiertos: siguiente intento en {result['retry_in']:.1f}s sin detener el bot")
+    return True
+
+if __name__ == "__main__":
+    test_cheapest_healthy_first()
+    test_fallback_and_circuit_breaker()
+    test_half_open_failure_reopens()
+    test_all_failing_and_latency()
+    test_all_circuits_open_keeps_monitor_alive()
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Script de prueba para la capa de transporte HTTP
+Levanta un servidor local: no necesita conexión a internet
+"""
+
+import gzip
+import json
+import logging
+import sys
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Agregar el directorio actual al path para importar módulos
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import requests
+import transport
+from transport import TransportSession, ACCEPT_ENCODING
+
+# Configurar logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # keep-alive
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        if self.path == '/lento':
+            time.sleep(2)
+
+        body = gzip.compress(json.dumps({
+            'existenDatos': True,
+            'accept_encoding': self.headers.get('Accept-Encoding')
+        }).encode())
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Encoding', 'gzip')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+def start_server():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+def test_keep_alive_and_timing():
+    """Las peticiones reutilizan la conexión y registran los tiempos por fase"""
+    server, base_url = start_server()
+    session = TransportSession(http2=False)
+
+    try:
+        first = session.post(f"{base_url}/api", data={'fecha': '02/08/2025'})
+        second = session.post(f"{base_url}/api", data={'fecha': '02/08/2025'})
+    finally:
+        server.shutdown()
+
+    assert first.json()['existenDatos'] is True
+    assert first.json()['accept_encoding'] == ACCEPT_ENCODING
+    assert first.timing['reused'] is False and second.timing['reused'] is True
+    assert {'dns', 'connect', 'ttfb', 'total'} <= set(first.timing)
+
+    summary = session.timing_summary()
+    assert summary['requests'] == 2 and summary['reused'] == 1
+
+    logging.info(f"✅ Tiempos: {first.timing}")
+    return True
+
+def test_falls_back_to_next_address():
+    """Si la primera dirección resuelta no responde se prueba la siguiente, como hace urllib3"""
+    server, base_url = start_server()
+    port = server.server_address[1]
+    session = TransportSession(http2=False)
+    original_getaddrinfo = transport.socket.getaddrinfo
+
+    def fake_getaddrinfo(host, port, *args):
+        if host != 'cies.test':
+            return original_getaddrinfo(host, port, *args)
+        # El servidor solo escucha en IPv4: la dirección IPv6 se rechaza (o no existe en la máquina)
+        return [
+            (transport.socket.AF_INET6, transport.socket.SOCK_STREAM, 6, '', ('::1', port, 0, 0)),
+            (transport.socket.AF_INET, transport.socket.SOCK_STREAM, 6, '', ('127.0.0.1', port))
+        ]
+
+    transport.socket.getaddrinfo = fake_getaddrinfo
+    try:
+        response = session.post(f"http://cies.test:{port}/api", data={})
+    finally:
+        transport.socket.getaddrinfo = original_getaddrinfo
+        server.shutdown()
+
+    assert response.json()['existenDatos'] is True
+    assert response.timing['address'] == '127.0.0.1'
+
+    logging.info(f"✅ Conectado a la segunda dirección: {response.timing}")
+    return True
+
+def test_default_read_timeout():
+    """Una respuesta que no llega se corta con el plazo de lectura por defecto"""
+    server, base_url = start_server()
+    session = TransportSession(timeout=(1, 0.5), http2=False)
+
+    try:
+        session.post(f"{base_url}/lento", data={})
+        raise AssertionError("La petición debía agotar el plazo")
+    except requests.exceptions.ReadTimeout:
+        logging.info("✅ Petición colgada cortada por el plazo de lectura")
+    finally:
+        server.shutdown()
+    return True
+
+if __name__ == "__main__":
+    test_keep_alive_and_timing()
+    test_falls_back_to_next_address()
+    test_default_read_timeout()
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Script de prueba de las esperas por condición (waits.py)
+Usa un driver falso cuyo estado cambia al cabo de un tiempo: no abre Chrome
+"""
+
+import logging
+import os
+import sys
+import time
+
+# Agregar el directorio actual al path para importar módulos
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from selenium.webdriver.common.by import By
+from waits import wait_until, wait_for_url_change, wait_for_url, wait_for_any_element, wait_for_ajax_idle
+
+# Configurar logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+
+class FakeElement:
+    def __init__(self, displayed=True):
+        self.displayed = displayed
+
+    def is_displayed(self):
+        return self.displayed
+
+class FakeDriver:
+    """La URL, los elementos y las peticiones AJAX cambian `delay` segundos después de crearse"""
+
+    def __init__(self, delay=0.3):
+        self.ready_at = time.monotonic() + delay
+
+    @property
+    def ready(self):
+        return time.monotonic() >= self.ready_at
+
+    @property
+    def current_url(self):
+        return 'http://127.0.0.1/illasr/iniciarReserva' if self.ready else 'http://127.0.0.1/illasr/inicio'
+
+    def find_elements(self, by, selector):
+        if selector == 'oculto':
+            return [FakeElement(displayed=False)]
+        return [FakeElement()] if self.ready and selector == 'calendario' else []
+
+    def execute_script(self, script):
+        return self.ready  # jQuery.active llega a 0 cuando el driver está listo
+
+def test_waits_return_as_soon_as_condition_holds():
+    """Cada espera vuelve poco después de que se cumpla su condición, no tras un plazo fijo"""
+    driver = FakeDriver(delay=0.3)
+    start = time.monotonic()
+    assert wait_for_url_change(driver, 'http://127.0.0.1/illasr/inicio', timeout=5).endswith('iniciarReserva')
+    elapsed = time.monotonic() - start
+    assert 0.3 <= elapsed < 0.6
+
+    assert wait_for_url(FakeDriver(delay=0.1), 'aceptacion', 'iniciarReserva', timeout=5)
+    assert wait_for_any_element(FakeDriver(delay=0.1), [(By.XPATH, 'oculto'), (By.XPATH, 'calendario')], timeout=5)
+    assert wait_for_ajax_idle(FakeDriver(delay=0.1), timeout=5)
+
+    logging.info(f"✅ Cambio de URL detectado en {elapsed:.2f}s")
+    return True
+
+def test_waits_time_out_without_raising():
+    """Si la condición no se cumple devuelven None/False en lugar de lanzar"""
+    driver = FakeDriver(delay=60)
+    assert wait_for_url(driver, 'aceptacion', timeout=0.3) is None
+    assert wait_for_any_element(driver, [(By.XPATH, 'oculto')], timeout=0.3) is None
+    assert wait_for_ajax_idle(driver, timeout=0.3) is False
+    assert wait_until(driver, lambda driver: 'valor', timeout=0.3) == 'valor'
+
+    logging.info("✅ Plazos vencidos sin excepciones")
+    return True
+
+if __name__ == "__main__":
+    test_waits_return_as_soon_as_condition_holds()
+    test_waits_time_out_without_raising()
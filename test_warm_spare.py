@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Script de prueba del navegador de reserva precalentado (warm_spare.py)
+Usa drivers falsos con un arranque simulado: no abre Chrome
+"""
+
+import logging
+import os
+import sys
+import threading
+import time
+
+# Agregar el directorio actual al path para importar módulos
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from scraper import CiesScraper
+from warm_spare import WarmSpare
+
+# Configurar logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+
+LAUNCH_SECONDS = 0.3
+
+class FakeDriver:
+    def __init__(self, name):
+        self.name = name
+        self.alive = True
+        self.quit_event = threading.Event()
+
+    @property
+    def window_handles(self):
+        if not self.alive:
+            raise RuntimeError("chrome not reachable")
+        return ['main']
+
+    def quit(self):
+        self.alive = False
+        self.quit_event.set()
+
+class FakeFactory:
+    """Cada llamada tarda LAUNCH_SECONDS, como un arranque de Chrome"""
+
+    def __init__(self):
+        self.launched = []
+
+    def __call__(self):
+        time.sleep(LAUNCH_SECONDS)
+        driver = FakeDriver(f"chrome-{len(self.launched) + 1}")
+        self.launched.append(driver)
+        return driver
+
+def wait_ready(spare, timeout=2):
+    deadline = time.monotonic() + timeout
+    while not spare.ready and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return spare.ready
+
+def test_swap_and_async_refill():
+    """take() entrega la reserva al instante y lanza otra en segundo plano"""
+    factory = FakeFactory()
+    spare = WarmSpare(factory, health_check=lambda driver: driver.window_handles, enabled=True, wait=0)
+    spare.refill()
+    assert wait_ready(spare)
+
+    start = time.monotonic()
+    driver = spare.take()
+    assert time.monotonic() - start < LAUNCH_SECONDS / 3
+    assert driver.name == 'chrome-1'
+
+    # La reposición no bloquea: la siguiente reserva aparece al rato
+    assert not spare.ready
+    assert wait_ready(spare)
+    assert spare.stats['swaps'] == 1 and spare.stats['launched'] == 2
+
+    spare.close()
+    assert not factory.launched[1].alive
+
+    logging.info("✅ Intercambio instantáneo y reposición asíncrona")
+    return True
+
+def test_dead_spare_and_disabled():
+    """Una reserva muerta se descarta; desactivada no lanza nada"""
+    factory = FakeFactory()
+    spare = WarmSpare(factory, health_check=lambda driver: driver.window_handles, enabled=True, wait=0)
+    spare.refill()
+    assert wait_ready(spare)
+    factory.launched[0].alive = False
+    assert spare.take() is None
+    assert spare.stats['misses'] == 1
+    spare.close()
+
+    disabled = WarmSpare(FakeFactory(), enabled=False)
+    disabled.refill()
+    assert disabled.take() is None and not disabled.ready
+
+    logging.info("✅ Reserva muerta descartada y modo desactivado")
+    return True
+
+def test_take_waits_for_launch_in_progress():
+    """Si la reserva se está lanzando, take() la espera (hasta `wait`) en lugar de arrancar otra"""
+    spare = WarmSpare(FakeFactory(), enabled=True, wait=2)
+    spare.refill()
+    driver = spare.take()
+    assert driver is not None and driver.name == 'chrome-1'
+    spare.close()
+
+    logging.info("✅ Espera a la reserva en lanzamiento")
+    return True
+
+def test_reset_browser_swaps_spare():
+    """reset_browser cambia al navegador de reserva sin arranque en frío y cierra el anterior aparte"""
+    factory = FakeFactory()
+    scraper = CiesScraper()
+    scraper.spare = WarmSpare(factory, health_check=lambda driver: driver.window_handles, enabled=True, wait=0)
+    old_driver = FakeDriver('chrome-viejo')
+    scraper.use_driver(old_driver)
+    scraper.spare.refill()
+    assert wait_ready(scraper.spare)
+
+    start = time.monotonic()
+    assert scraper.reset_browser()
+    elapsed = time.monotonic() - start
+    assert elapsed < LAUNCH_SECONDS / 3
+    assert scraper.driver.name == 'chrome-1'
+    assert old_driver.quit_event.wait(1)
+
+    scraper.close_driver()
+    logging.info(f"✅ Reset con la reserva en {elapsed * 1000:.1f} ms")
+    return True
+
+def test_setup_driver_uses_spare():
+    """setup_driver toma la reserva lista en lugar de arrancar en frío, y la repone"""
+    factory = FakeFactory()
+    scraper = CiesScraper()
+    scraper.create_driver = factory
+    scraper.spare = WarmSpare(factory, health_check=lambda driver: driver.window_handles, enabled=True, wait=0)
+
+    # Sin reserva: arranque en frío y reposición en segundo plano
+    assert scraper.setup_driver()
+    assert scraper.driver.name == 'chrome-1'
+    assert wait_ready(scraper.spare)
+
+    start = time.monotonic()
+    assert scraper.setup_driver()
+    elapsed = time.monotonic() - start
+    assert elapsed < LAUNCH_SECONDS / 3
+    assert scraper.driver.name == 'chrome-2'
+    assert wait_ready(scraper.spare)
+
+    scraper.close_driver()
+    logging.info(f"✅ setup_driver con la reserva en {elapsed * 1000:.1f} ms")
+    return True
+
+if __name__ == "__main__":
+    test_swap_and_async_refill()
+    test_dead_spare_and_disabled()
+    test_take_waits_for_launch_in_progress()
+    test_reset_browser_swaps_spare()
+    test_setup_driver_uses_spare()
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Script de prueba para la lista de fechas vigiladas y su planificación por meses
+"""
+
+import logging
+import sys
+import os
+from datetime import date
+
+# Agregar el directorio actual al path para importar módulos
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from watchlist import WatchList
+from query_matrix import DEFAULT_QUERY, QueryPlanner, Watcher, check_watchers
+
+# Configurar logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+
+class FakeCalendarScraper:
+    """Scraper falso: todos los días reservables con 2 plazas, cuenta peticiones"""
+
+    def __init__(self):
+        self.calendar_calls = []
+
+    def ensure_api_session(self):
+        return True
+
+    def call_calendario_api(self, ano, mes, **params):
+        from calendar import monthrange
+        from datetime import datetime
+        from calendar_sweep import SITE_TZ
+        self.calendar_calls.append((ano, mes))
+        return [
+            {'date': str(int(datetime(ano, mes, d, tzinfo=SITE_TZ).timestamp() * 1000)), 'disponible': '1'}
+            for d in range(1, monthrange(ano, mes)[1] + 1)
+        ]
+
+    def call_plazas_api(self, fecha=None, **params):
+        return {'existenDatos': True, 'plazasOcupadas': '2'}
+
+    def extract_slots(self, api_result, source):
+        return int(api_result['plazasOcupadas'])
+
+def test_parse_watch_list():
+    """Probar fechas sueltas, rangos, meses y filtros de días"""
+    watch_list = WatchList.from_spec("02/08/2025, 08/2025@sab, 30/08/2025-02/09/2025")
+    dates = watch_list.dates(today=date(2025, 7, 1))
+
+    assert date(2025, 8, 2) in dates
+    assert date(2025, 8, 9) in dates  # sábado
+    assert date(2025, 8, 10) not in dates  # domingo fuera de rangos
+    assert date(2025, 9, 2) in dates
+    assert len(dates) == len(set(dates))
+
+    # Las fechas pasadas se descartan
+    assert watch_list.dates(today=date(2025, 9, 1)) == [date(2025, 9, 1), date(2025, 9, 2)]
+
+    logging.info(f"✅ Lista vigilada: {watch_list.describe()}")
+    return True
+
+def test_plan_one_sweep_per_month():
+    """Probar que cada mes se barre una sola vez por ciclo"""
+    watch_list = WatchList.from_spec("08/2025@sab+dom, 01/09/2025-03/09/2025")
+    scraper = FakeCalendarScraper()
+
+    results = check_watchers(scraper, QueryPlanner([Watcher(watch_list, [DEFAULT_QUERY])]), today=date(2025, 7, 1))
+
+    assert sorted(scraper.calendar_calls) == [(2025, 8), (2025, 9)]  # barridos en paralelo
+    assert len(results) == len(watch_list.dates(today=date(2025, 7, 1)))
+    assert all(r['available_slots'] == 2 for r in results)
+
+    logging.info(f"✅ {len(results)} fechas verificadas con {len(scraper.calendar_calls)} peticiones de calendario")
+    return True
+
+if __name__ == "__main__":
+    test_parse_watch_list()
+    test_plan_one_sweep_per_month()
@@ -0,0 +1,267 @@
+"""
+Capa de transporte HTTP compartida por los scrapers y el notificador
+- Plazos explícitos de conexión y lectura en todas las peticiones
+- Pool keep-alive dimensionado para el motor asíncrono
+- Solo se anuncian las codificaciones que urllib3 sabe descomprimir
+- HTTP/2 opcional con httpx (HTTP2_ENABLED=True y `pip install httpx[http2]`)
+- Tiempos por petición: DNS, conexión TCP, TLS, TTFB y total
+"""
+
+import http.client
+import logging
+import socket
+import threading
+import time
+from collections import deque
+from types import SimpleNamespace
+
+import requests
+from requests.adapters import HTTPAdapter, BaseAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.exceptions import ConnectTimeoutError
+from urllib3.util.connection import allowed_gai_family
+from urllib3.util.request import ACCEPT_ENCODING as URLLIB3_ACCEPT_ENCODING
+from urllib3.util.retry import Retry
+
+from config import HTTP_CONNECT_TIMEOUT, HTTP_TIMEOUT, HTTP_CONNECT_RETRIES, HTTP_POOL_MAXSIZE, HTTP2_ENABLED, HTTP_TIMING_HISTORY
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+DEFAULT_TIMEOUT = (HTTP_CONNECT_TIMEOUT, HTTP_TIMEOUT)
+
+# gzip y deflate siempre; br y zstd solo si están instalados brotli/zstandard
+ACCEPT_ENCODING = ", ".join(encoding.strip() for encoding in URLLIB3_ACCEPT_ENCODING.split(','))
+
+# Cabeceras de conexión que HTTP/2 prohíbe
+HOP_BY_HOP_HEADERS = {'connection', 'keep-alive', 'proxy-connection', 'transfer-encoding', 'upgrade'}
+
+# Tiempos de la petición en curso en este hilo (los rellenan las conexiones)
+_current = threading.local()
+
+
+def current_timing():
+    return getattr(_current, 'timing', None)
+
+
+class TimedConnectionMixin:
+    """Mide la resolución DNS y la conexión TCP de cada conexión nueva"""
+
+    def _new_conn(self):
+        timing = current_timing()
+        host = self._dns_host
+        start = time.perf_counter()
+        try:
+            # Resolver aquí para medir el DNS y conectar directamente a las IPs obtenidas
+            addresses = [info[4][0] for info in socket.getaddrinfo(host, self.port, allowed_gai_family(), socket.SOCK_STREAM)]
+        except OSError:
+            addresses = []
+        addresses = addresses or [host]  # sin direcciones, urllib3 vuelve a resolver y reporta el error
+        resolved = time.perf_counter()
+        if timing is not None:
+            timing['dns'] = resolved - start
+            timing['reused'] = False
+
+        # Como urllib3.util.connection.create_connection: probar cada dirección
+        # (IPv6 y luego IPv4, varios registros A) hasta que una conecte
+        error = None
+        for address in addresses:
+            attempt = time.perf_counter()
+            self._dns_host = address
+            try:
+                conn = super()._new_conn()
+            except ConnectTimeoutError as e:  # también NewConnectionError
+                error = e
+                logging.debug(f"No se pudo conectar a {host} en {address}: {e}")
+                continue
+            finally:
+                self._dns_host = host
+            self._connected_at = time.perf_counter()
+            if timing is not None:
+                timing['connect'] = self._connected_at - attempt
+                timing['failed_connect'] = attempt - resolved  # direcciones que no respondieron
+                timing['address'] = address
+            return conn
+
+        raise error
+
+
+class TimedHTTPConnection(TimedConnectionMixin, HTTPConnection):
+    pass
+
+
+class TimedHTTPSConnection(TimedConnectionMixin, HTTPSConnection):
+    def connect(self):
+        super().connect()
+        timing = current_timing()
+        if timing is not None:
+            # Desde que el socket conectó (sin contar direcciones que fallaron antes)
+            timing['tls'] = time.perf_counter() - self._connected_at
+
+
+class TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = TimedHTTPConnection
+
+
+class TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = TimedHTTPSConnection
+
+
+class TimedHTTPAdapter(HTTPAdapter):
+    """Adaptador HTTP/1.1 con pool keep-alive y medición de tiempos"""
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            'http': TimedHTTPConnectionPool,
+            'https': TimedHTTPSConnectionPool
+        }
+
+    def send(self, request, **kwargs):
+        timing = {'dns': 0.0, 'connect': 0.0, 'failed_connect': 0.0, 'tls': 0.0, 'reused': True, 'http_version': 'HTTP/1.1'}
+        _current.timing = timing
+        start = time.perf_counter()
+        try:
+            response = super().send(request, **kwargs)
+        finally:
+            _current.timing = None
+
+        # Hasta las cabeceras de respuesta, descontando el establecimiento de la conexión
+        setup = timing['dns'] + timing['failed_connect'] + timing['connect'] + timing['tls']
+        timing['ttfb'] = max(0.0, time.perf_counter() - start - setup)
+        response.timing = timing
+        return response
+
+
+class Http2Adapter(BaseAdapter):
+    """
+    Adaptador HTTP/2 sobre httpx. requests sigue gestionando cookies,
+    redirecciones y cabeceras; httpx solo transporta la petición.
+    """
+
+    def __init__(self, pool_maxsize=HTTP_POOL_MAXSIZE):
+        super().__init__()
+        # Lanza ImportError si falta el paquete h2
+        self.client = httpx.Client(
+            http2=True,
+            follow_redirects=False,
+            limits=httpx.Limits(max_connections=pool_maxsize, max_keepalive_connections=pool_maxsize)
+        )
+
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        connect_timeout, read_timeout = timeout if isinstance(timeout, tuple) else (timeout, timeout)
+        headers = [(k, v) for k, v in request.headers.items() if k.lower() not in HOP_BY_HOP_HEADERS]
+
+        start = time.perf_counter()
+        try:
+            h2_response = self.client.request(
+                request.method, request.url, headers=headers, content=request.body,
+                timeout=httpx.Timeout(read_timeout, connect=connect_timeout)
+            )
+        except httpx.ConnectTimeout as e:
+            raise requests.exceptions.ConnectTimeout(e, request=request)
+        except httpx.TimeoutException as e:
+            raise requests.exceptions.ReadTimeout(e, request=request)
+        except httpx.HTTPError as e:
+            raise requests.exceptions.ConnectionError(e, request=request)
+        finally:
+            # Las cookies son cosa de la sesión de requests
+            self.client.cookies.clear()
+
+        response = requests.Response()
+        response.status_code = h2_response.status_code
+        response.reason = h2_response.reason_phrase
+        response.url = request.url
+        response.request = request
+        response.connection = self
+
+        response.headers = CaseInsensitiveDict()
+        message = http.client.HTTPMessage()
+        for name, value in h2_response.headers.multi_items():
+            message[name] = value
+            response.headers[name] = f"{response.headers[name]}, {value}" if name in response.headers else value
+        response.encoding = get_encoding_from_headers(response.headers)
+
+        # requests extrae las Set-Cookie de raw._original_response.msg
+        response.raw = SimpleNamespace(
+            _original_response=SimpleNamespace(msg=message),
+            release_conn=lambda: None,
+            close=lambda: None
+        )
+        response._content = h2_response.content
+        response._content_consumed = True
+        response.timing = {'ttfb': time.perf_counter() - start, 'http_version': h2_response.http_version}
+        return response
+
+    def close(self):
+        self.client.close()
+
+
+def build_adapter(pool_maxsize=HTTP_POOL_MAXSIZE, http2=HTTP2_ENABLED):
+    """Adaptador HTTP/2 si se pide y está disponible; si no, HTTP/1.1 con keep-alive"""
+    if http2:
+        if httpx is None:
+            logging.warning("⚠️ HTTP2_ENABLED requiere httpx[http2]; se usa HTTP/1.1")
+        else:
+            try:
+                return Http2Adapter(pool_maxsize)
+            except ImportError as e:
+                logging.warning(f"⚠️ HTTP/2 no disponible ({e}); se usa HTTP/1.1")
+
+    # Solo se reintentan los fallos de conexión: un POST ya enviado no se repite
+    retries = Retry(total=None, connect=HTTP_CONNECT_RETRIES, read=0, status=0, other=0,
+                    redirect=None, backoff_factor=0.2, raise_on_status=False)
+    return TimedHTTPAdapter(pool_connections=4, pool_maxsize=pool_maxsize, max_retries=retries)
+
+
+class TransportSession(requests.Session):
+    """Sesión de requests con plazos por defecto, pool ajustado y registro de tiempos"""
+
+    def __init__(self, timeout=DEFAULT_TIMEOUT, pool_maxsize=HTTP_POOL_MAXSIZE, http2=HTTP2_ENABLED):
+        super().__init__()
+        self.timeout = timeout
+        self.timings = deque(maxlen=HTTP_TIMING_HISTORY)
+        self.request_count = 0  # peticiones upstream totales (presupuesto del planificador)
+
+        adapter = build_adapter(pool_maxsize, http2)
+        self.mount('https://', adapter)
+        self.mount('http://', adapter)
+        self.headers['Accept-Encoding'] = ACCEPT_ENCODING
+
+    def request(self, method, url, **kwargs):
+        # Nunca sin plazo: una petición colgada bloquearía todo el ciclo del monitor
+        if kwargs.get('timeout') is None:
+            kwargs['timeout'] = self.timeout
+
+        self.request_count += 1
+        start = time.perf_counter()
+        response = super().request(method, url, **kwargs)
+
+        timing = dict(getattr(response, 'timing', None) or {})
+        timing.update(method=method, url=url, status=response.status_code, total=time.perf_counter() - start)
+        response.timing = timing
+        self.timings.append(timing)
+
+        logging.debug(
+            f"⏱️ {method} {url} {response.status_code}: total {timing['total'] * 1000:.0f}ms "
+            f"(dns {timing.get('dns', 0) * 1000:.0f}, tcp {timing.get('connect', 0) * 1000:.0f}, "
+            f"tls {timing.get('tls', 0) * 1000:.0f}, ttfb {timing.get('ttfb', 0) * 1000:.0f})"
+        )
+        return response
+
+    def timing_summary(self):
+        """Media y máximo por fase de las últimas peticiones (segundos)"""
+        summary = {}
+        timings = list(self.timings)
+        for phase in ('dns', 'connect', 'tls', 'ttfb', 'total'):
+            values = [t[phase] for t in timings if phase in t]
+            if values:
+                summary[phase] = {'avg': sum(values) / len(values), 'max': max(values)}
+        summary['requests'] = len(timings)
+        summary['reused'] = sum(1 for t in timings if t.get('reused'))
+        return summary
@@ -0,0 +1,69 @@
+"""
+Esperas por condición para el flujo de Selenium
+Cada paso vuelve en cuanto se cumple su condición (se comprueba cada
+WAIT_POLL_INTERVAL segundos) en lugar de dormir un tiempo fijo.
+Las esperas no lanzan excepciones: devuelven el valor de la condición,
+o None si vence el plazo, y el llamador decide qué hacer.
+Las pausas aleatorias entre acciones (random_delay de los scrapers) son
+una política de cortesía aparte que solo se aplica con POLITE_PACING.
+"""
+
+import logging
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.common.exceptions import TimeoutException, StaleElementReferenceException
+from config import WAIT_POLL_INTERVAL, WAIT_TIMEOUT
+
+# Sin documento a medio parsear ni peticiones jQuery en curso
+AJAX_IDLE_SCRIPT = """
+    if (document.readyState === 'loading') return false;
+    return !(window.jQuery && window.jQuery.active > 0);
+"""
+
+
+def wait_until(driver, condition, timeout=WAIT_TIMEOUT, description=None):
+    """Esperar un predicado driver -> valor; devuelve el valor o None si vence el plazo"""
+    try:
+        return WebDriverWait(driver, timeout, poll_frequency=WAIT_POLL_INTERVAL,
+                             ignored_exceptions=(StaleElementReferenceException,)).until(condition)
+    except TimeoutException:
+        if description:
+            logging.warning(f"⏱️ Sin {description} tras {timeout}s")
+        return None
+
+
+def wait_for_url_change(driver, previous_url, timeout=WAIT_TIMEOUT):
+    """Esperar a que la URL deje de ser previous_url (tras un clic que navega); devuelve la nueva"""
+    if wait_until(driver, EC.url_changes(previous_url), timeout, "cambio de URL"):
+        return driver.current_url
+    return None
+
+
+def wait_for_url(driver, *fragments, timeout=WAIT_TIMEOUT):
+    """Esperar a que la URL contenga alguno de los fragmentos; devuelve la URL"""
+    def url_matches(driver):
+        url = driver.current_url
+        return url if any(fragment in url for fragment in fragments) else False
+    return wait_until(driver, url_matches, timeout, f"URL con {' o '.join(fragments)}")
+
+
+def wait_for_element(driver, locator, visible=False, timeout=WAIT_TIMEOUT):
+    """Esperar a un elemento (By, selector), presente o además visible; devuelve el elemento"""
+    condition = EC.visibility_of_element_located(locator) if visible else EC.presence_of_element_located(locator)
+    return wait_until(driver, condition, timeout, f"elemento {locator[1]}")
+
+
+def wait_for_any_element(driver, locators, visible=True, timeout=WAIT_TIMEOUT):
+    """Esperar al primer elemento que aparezca de una lista de (By, selector); devuelve el elemento"""
+    def first_match(driver):
+        for by, selector in locators:
+            for element in driver.find_elements(by, selector):
+                if not visible or element.is_displayed():
+                    return element
+        return False
+    return wait_until(driver, first_match, timeout, f"ninguno de {len(locators)} selectores")
+
+
+def wait_for_ajax_idle(driver, timeout=WAIT_TIMEOUT):
+    """Esperar a que no queden peticiones jQuery en curso"""
+    return bool(wait_until(driver, lambda driver: driver.execute_script(AJAX_IDLE_SCRIPT), timeout, "AJAX en reposo"))
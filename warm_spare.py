@@ -0,0 +1,119 @@
+"""
+Navegador de reserva precalentado
+Mantiene un WebDriver ya lanzado y en reposo para cambiarlo por el actual
+cuando hay que resetear el navegador (página de 'aceptacion'): el reset pasa
+de un arranque en frío de Chrome a un simple intercambio. La reserva se
+repone en un hilo en segundo plano. Se puede desactivar (WARM_SPARE=False)
+en máquinas con poca memoria, porque supone un Chrome más en marcha.
+"""
+
+import logging
+import threading
+import time
+from config import WARM_SPARE, WARM_SPARE_WAIT
+
+
+def quit_in_background(driver):
+    """Cerrar un driver sin esperar a que chromedriver termine"""
+    def quit_driver():
+        try:
+            driver.quit()
+        except Exception as e:
+            logging.debug(f"Error cerrando el navegador anterior: {e}")
+    threading.Thread(target=quit_driver, name='quit-driver', daemon=True).start()
+
+
+class WarmSpare:
+    def __init__(self, factory, health_check=None, enabled=WARM_SPARE, wait=WARM_SPARE_WAIT):
+        """
+        factory: callable sin argumentos que devuelve un WebDriver nuevo (o None si falla)
+        health_check: callable(driver) -> bool que indica si la reserva sigue viva tras el reposo
+        wait: segundos que take() espera a una reserva que se está lanzando
+        """
+        self.factory = factory
+        self.health_check = health_check
+        self.enabled = enabled
+        self.wait = wait
+        self._spare = None
+        self._filling = False
+        self._closed = False
+        self._lock = threading.Condition()
+        self.stats = {'launched': 0, 'swaps': 0, 'misses': 0, 'failures': 0}
+
+    def refill(self):
+        """Lanzar una reserva en segundo plano si no hay ninguna (ni se está lanzando)"""
+        with self._lock:
+            if not self.enabled or self._closed or self._spare is not None or self._filling:
+                return
+            self._filling = True
+        threading.Thread(target=self._fill, name='warm-spare', daemon=True).start()
+
+    def _fill(self):
+        driver = None
+        try:
+            driver = self.factory()
+        except Exception as e:
+            logging.warning(f"⚠️ No se pudo lanzar el navegador de reserva: {e}")
+
+        with self._lock:
+            self._filling = False
+            if driver is None:
+                self.stats['failures'] += 1
+            elif self._closed:
+                self._quit(driver)
+            else:
+                self._spare = driver
+                self.stats['launched'] += 1
+                logging.info("🔥 Navegador de reserva listo")
+            self._lock.notify_all()
+
+    def take(self):
+        """
+        Sacar la reserva (espera hasta `wait` segundos si se está lanzando) y reponerla.
+        Devuelve None si no hay reserva: el llamador arranca un navegador en frío.
+        """
+        if not self.enabled:
+            return None
+        with self._lock:
+            deadline = time.monotonic() + self.wait
+            while self._spare is None and self._filling and not self._closed:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._lock.wait(remaining)
+            driver, self._spare = self._spare, None
+        if driver and self.health_check and not self.is_healthy(driver):
+            logging.warning("⚠️ El navegador de reserva ya no responde, se descarta")
+            self._quit(driver)
+            driver = None
+        with self._lock:
+            self.stats['swaps' if driver else 'misses'] += 1
+        self.refill()
+        return driver
+
+    def is_healthy(self, driver):
+        try:
+            return bool(self.health_check(driver))
+        except Exception:
+            return False
+
+    @property
+    def ready(self):
+        with self._lock:
+            return self._spare is not None
+
+    def _quit(self, driver):
+        try:
+            driver.quit()
+        except Exception as e:
+            logging.debug(f"Error cerrando el navegador de reserva: {e}")
+
+    def close(self):
+        """Cerrar la reserva y no reponerla más (una reserva en lanzamiento se cierra al terminar)"""
+        with self._lock:
+            self._closed = True
+            driver, self._spare = self._spare, None
+            self._lock.notify_all()
+        if driver:
+            self._quit(driver)
+            logging.info("Navegador de reserva cerrado")
@@ -0,0 +1,139 @@
+"""
+Lista de fechas vigiladas
+Admite fechas sueltas, rangos y meses completos con filtro de días de la semana,
+y planifica las consultas agrupando por (año, mes) para barrer cada mes una vez por ciclo
+
+Formato (entradas separadas por comas):
+    02/08/2025                    fecha suelta
+    01/08/2025-15/08/2025         rango de fechas
+    08/2025                       mes completo
+    08/2025@sab+dom               cualquier sábado o domingo de agosto
+"""
+
+from collections import OrderedDict
+from datetime import date, datetime, timedelta
+from calendar import monthrange
+from calendar_sweep import format_fecha
+
+WEEKDAYS = {
+    'lun': 0, 'mon': 0,
+    'mar': 1, 'tue': 1,
+    'mie': 2, 'mié': 2, 'wed': 2,
+    'jue': 3, 'thu': 3,
+    'vie': 4, 'fri': 4,
+    'sab': 5, 'sáb': 5, 'sat': 5,
+    'dom': 6, 'sun': 6
+}
+
+WEEKDAY_LABELS = ['lun', 'mar', 'mié', 'jue', 'vie', 'sáb', 'dom']
+
+
+def parse_date(text):
+    """Convertir DD/MM/YYYY en date"""
+    return datetime.strptime(text.strip(), '%d/%m/%Y').date()
+
+
+class WatchEntry:
+    """Una entrada de la lista: rango de fechas [start, end] y filtro opcional de días"""
+
+    def __init__(self, start, end=None, weekdays=None):
+        self.start = start
+        self.end = end or start
+        self.weekdays = frozenset(weekdays) if weekdays else None
+
+        if self.end < self.start:
+            raise ValueError(f"Rango de fechas invertido: {format_fecha(self.start)}-{format_fecha(self.end)}")
+
+    @classmethod
+    def from_spec(cls, spec):
+        """Crear una entrada desde su texto (ver formato en el módulo)"""
+        spec = spec.strip()
+        weekdays = None
+
+        if '@' in spec:
+            spec, weekday_spec = spec.split('@', 1)
+            weekdays = set()
+            for name in weekday_spec.split('+'):
+                name = name.strip().lower()
+                if name not in WEEKDAYS:
+                    raise ValueError(f"Día de la semana desconocido: '{name}'")
+                weekdays.add(WEEKDAYS[name])
+
+        if '-' in spec:
+            start_text, end_text = spec.split('-', 1)
+            return cls(parse_date(start_text), parse_date(end_text), weekdays)
+
+        if spec.count('/') == 1:
+            month, year = (int(part) for part in spec.split('/'))
+            return cls(date(year, month, 1), date(year, month, monthrange(year, month)[1]), weekdays)
+
+        return cls(parse_date(spec), weekdays=weekdays)
+
+    def dates(self):
+        """Fechas incluidas en la entrada"""
+        current = self.start
+        while current <= self.end:
+            if self.weekdays is None or current.weekday() in self.weekdays:
+                yield current
+            current += timedelta(days=1)
+
+    def describe(self):
+        text = format_fecha(self.start)
+        if self.end != self.start:
+            text += f"-{format_fecha(self.end)}"
+        if self.weekdays:
+            text += " (" + "+".join(WEEKDAY_LABELS[d] for d in sorted(self.weekdays)) + ")"
+        return text
+
+
+class WatchList:
+    def __init__(self, entries):
+        self.entries = list(entries)
+
+    @classmethod
+    def from_spec(cls, spec):
+        """Crear la lista desde texto con entradas separadas por comas"""
+        entries = [WatchEntry.from_spec(part) for part in spec.split(',') if part.strip()]
+        if not entries:
+            raise ValueError("La lista de fechas vigiladas está vacía")
+        return cls(entries)
+
+    def dates(self, today=None):
+        """Fechas vigiladas ordenadas y sin duplicados, descartando las ya pasadas"""
+        today = today or date.today()
+        return sorted({d for entry in self.entries for d in entry.dates() if d >= today})
+
+    def plan(self, today=None):
+        """Agrupar las fechas por (año, mes): un barrido de calendario por grupo"""
+        months = OrderedDict()
+        for d in self.dates(today):
+            months.setdefault((d.year, d.month), []).append(d)
+        return months
+
+    def describe(self):
+        return ", ".join(entry.describe() for entry in self.entries)
+
+
+def build_date_result(day, available_slots, method, calendar_status=None):
+    """Resultado por fecha con la misma forma que el de los scrapers"""
+    if available_slots == -1:
+        has_availability = None
+        status = "error_detection"
+    elif available_slots > 0:
+        has_availability = True
+        status = "available"
+    else:
+        has_availability = False
+        status = "unavailable"
+
+    return {
+        'date': format_fecha(day),
+        'available_slots': available_slots,
+        'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        'has_availability': has_availability,
+        'status': status,
+        'detection_error': available_slots == -1,
+        'method': method,
+        'calendar_status': calendar_status
+    }
+